@@ -0,0 +1,135 @@
+import math
+from array import array
+from typing import Dict, Any, Iterable, List, Optional
+
+from .units import convert_temperature, convert_wind, parse_humidity, validate_temp_unit
+
+
+def _require(module: str):
+    """Importa una dependencia opcional del modo masivo con un mensaje de instalación claro"""
+    try:
+        return __import__(module, fromlist=['_'])
+    except ImportError as e:
+        raise ImportError(
+            f"'{module}' es necesario para esta exportación. "
+            f"Instalar con: pip install pygoogleweather[bulk]"
+        ) from e
+
+
+class WeatherResultSet:
+    """
+    Contenedor columnar de lecturas del clima para análisis masivo.
+
+    Guarda las lecturas numéricas crudas (°F, viento en su unidad original,
+    humedad en %) en arrays contiguos de float64. Las conversiones de unidades
+    se aplican de forma vectorizada al exportar, y las columnas crudas se
+    exportan a NumPy sin copiar memoria. Mientras existan esas vistas los
+    arrays no pueden crecer: agregar lecturas lanza BufferError.
+
+    Ejemplo:
+        readings = await scraper.get_readings_many(cities)
+        results = WeatherResultSet.from_readings(readings, cities=cities)
+        df = results.to_pandas(temp_unit='C', wind_unit='kmh')
+    """
+
+    def __init__(self):
+        self.city: List[Optional[str]] = []
+        self.lang: List[Optional[str]] = []
+        self.location: List[str] = []
+        self.condition: List[str] = []
+        self._temperature_f = array('d')
+        self._humidity = array('d')
+        self._wind_value = array('d')
+        self._wind_is_mph = array('d')
+
+    def add(self, readings: Dict[str, Any], city: Optional[str] = None, lang: Optional[str] = None) -> None:
+        """Agrega las lecturas crudas de una consulta (ver WeatherScraper.get_readings)"""
+        self.city.append(city)
+        self.lang.append(lang)
+        self.location.append(readings['location'])
+        self.condition.append(readings['condition'])
+        self._temperature_f.append(readings['temperature_f'])
+        humidity = parse_humidity(readings['humidity'])
+        self._humidity.append(math.nan if humidity is None else humidity)
+        wind_value = readings['wind_value']
+        self._wind_value.append(math.nan if wind_value is None else wind_value)
+        self._wind_is_mph.append(1.0 if readings['wind_is_mph'] else 0.0)
+
+    @classmethod
+    def from_readings(
+        cls,
+        readings: Iterable[Any],
+        cities: Optional[Iterable[str]] = None,
+        lang: Optional[str] = None
+    ) -> 'WeatherResultSet':
+        """
+        Construye el contenedor a partir de una lista de lecturas, como la de
+        get_readings_many. Las posiciones con excepciones se omiten.
+        """
+        result_set = cls()
+        cities = list(cities) if cities is not None else None
+        for i, item in enumerate(readings):
+            if isinstance(item, BaseException):
+                continue
+            result_set.add(item, city=cities[i] if cities is not None else None, lang=lang)
+        return result_set
+
+    def __len__(self) -> int:
+        return len(self.location)
+
+    def temperature(self, temp_unit: str = 'C'):
+        """Temperaturas como array de NumPy; en 'F' es una vista sin copia"""
+        np = _require('numpy')
+        validate_temp_unit(temp_unit)
+        temp_f = np.frombuffer(self._temperature_f, dtype=np.float64)
+        return convert_temperature(temp_f, temp_unit)
+
+    def humidity(self):
+        """Humedad (%) como vista de NumPy sin copia"""
+        np = _require('numpy')
+        return np.frombuffer(self._humidity, dtype=np.float64)
+
+    def wind(self, wind_unit: str = 'kmh'):
+        """Velocidad del viento convertida a 'kmh' o 'mph' de forma vectorizada"""
+        np = _require('numpy')
+        values = np.frombuffer(self._wind_value, dtype=np.float64)
+        is_mph = np.frombuffer(self._wind_is_mph, dtype=np.float64)
+        return convert_wind(values, is_mph, wind_unit)
+
+    def to_numpy(self, temp_unit: str = 'C', wind_unit: str = 'kmh') -> Dict[str, Any]:
+        """Columnas como dict de arrays de NumPy"""
+        np = _require('numpy')
+        return {
+            'city': np.array(self.city, dtype=object),
+            'lang': np.array(self.lang, dtype=object),
+            'location': np.array(self.location, dtype=object),
+            'condition': np.array(self.condition, dtype=object),
+            'temperature': self.temperature(temp_unit),
+            'humidity': self.humidity(),
+            'wind': self.wind(wind_unit)
+        }
+
+    def to_pandas(self, temp_unit: str = 'C', wind_unit: str = 'kmh'):
+        """DataFrame de pandas construido sin copiar los arrays cuando pandas lo permite"""
+        pd = _require('pandas')
+        columns = self.to_numpy(temp_unit, wind_unit)
+        return pd.DataFrame(columns, copy=False)
+
+    def to_arrow(self, temp_unit: str = 'C', wind_unit: str = 'kmh'):
+        """Tabla de Arrow; los arrays float64 se envuelven sin copiar"""
+        pa = _require('pyarrow')
+        columns = self.to_numpy(temp_unit, wind_unit)
+        return pa.table({
+            'city': pa.array(self.city, type=pa.string()),
+            'lang': pa.array(self.lang, type=pa.string()),
+            'location': pa.array(self.location, type=pa.string()),
+            'condition': pa.array(self.condition, type=pa.string()),
+            'temperature': pa.array(columns['temperature']),
+            'humidity': pa.array(columns['humidity']),
+            'wind': pa.array(columns['wind'])
+        })
+
+    def to_parquet(self, path: str, temp_unit: str = 'C', wind_unit: str = 'kmh') -> None:
+        """Escribe las columnas en un archivo Parquet"""
+        pq = _require('pyarrow.parquet')
+        pq.write_table(self.to_arrow(temp_unit, wind_unit), path)
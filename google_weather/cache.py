@@ -0,0 +1,202 @@
+import json
+import logging
+import re
+import time
+import unicodedata
+import uuid
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(city: str) -> str:
+    """Normaliza el texto de una ciudad para usarlo como clave de alias"""
+    text = unicodedata.normalize('NFKC', city).casefold()
+    # Unificar separadores y eliminar puntuación de los extremos
+    text = re.sub(r'[\s+]+', ' ', text)
+    return text.strip(' .,;')
+
+
+class WeatherCache:
+    """Cache en memoria de resultados del clima con expiración (TTL)"""
+
+    def __init__(self, ttl: float = 600):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Devuelve una copia del resultado si sigue fresco, o None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at >= self.ttl:
+            del self._entries[key]
+            return None
+        return dict(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Guarda un resultado con la marca de tiempo actual"""
+        self._entries[key] = (time.monotonic(), dict(value))
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CacheBackend:
+    """
+    Interfaz de los backends de cache de lecturas del clima.
+
+    Las lecturas se guardan como dicts serializables en JSON con expiración
+    `ttl`. Los candados (`acquire_lock`/`release_lock`) permiten que una sola
+    consulta entre todos los nodos que comparten el backend haga el scraping
+    de una ciudad mientras las demás esperan su resultado.
+    """
+
+    def __init__(self, ttl: float = 600, lock_ttl: float = 30):
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def acquire_lock(self, key: str) -> Optional[str]:
+        """Toma el candado durante `lock_ttl` segundos; devuelve su token o None si está ocupado"""
+        raise NotImplementedError
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """Libera el candado solo si sigue perteneciendo a `token`"""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """Backend en memoria del proceso (el cache de `cache_ttl`)"""
+
+    def __init__(self, ttl: float = 600, lock_ttl: float = 30):
+        super().__init__(ttl, lock_ttl)
+        self._cache = WeatherCache(ttl)
+        self._locks: Dict[str, Tuple[str, float]] = {}
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._cache.set(key, value)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    async def acquire_lock(self, key: str) -> Optional[str]:
+        now = time.monotonic()
+        lock = self._locks.get(key)
+        if lock is not None and lock[1] > now:
+            return None
+        token = uuid.uuid4().hex
+        self._locks[key] = (token, now + self.lock_ttl)
+        return token
+
+    async def release_lock(self, key: str, token: str) -> None:
+        lock = self._locks.get(key)
+        if lock is not None and lock[0] == token:
+            del self._locks[key]
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class AliasIndex:
+    """
+    Índice aprendido de alias: consulta normalizada -> ubicación canónica de Google.
+
+    'NYC', 'New York' y 'new york city' terminan apuntando a la misma ubicación
+    canónica, de modo que comparten la entrada del cache. El mapeo se persiste
+    en un archivo JSON si se indica `path`, por lotes: cada `save_every` alias
+    nuevos, o en el primero que llega pasados `save_interval` segundos del
+    último guardado. flush() guarda lo pendiente (WeatherScraper lo llama al
+    cerrar).
+    """
+
+    def __init__(self, path: Optional[str] = None, save_every: int = 20, save_interval: float = 30):
+        self.path = Path(path) if path else None
+        self.save_every = save_every
+        self.save_interval = save_interval
+        self._aliases: Dict[str, str] = {}
+        self._pending = 0
+        self._saved_at = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @staticmethod
+    def _key(query: str, lang: str) -> str:
+        # La ubicación canónica depende del idioma ('Nueva York' vs 'New York')
+        return f"{lang}:{normalize_query(query)}"
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            self._aliases = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.error(f"Error cargando índice de alias {self.path}: {str(e)}")
+            self._aliases = {}
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Escritura atómica para no dejar el archivo a medias
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            tmp_path.write_text(json.dumps(self._aliases, ensure_ascii=False, indent=2), encoding='utf-8')
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.error(f"Error guardando índice de alias {self.path}: {str(e)}")
+
+    def resolve(self, query: str, lang: str) -> Optional[str]:
+        """Devuelve la ubicación canónica conocida para la consulta, si existe"""
+        canonical = self._aliases.get(self._key(query, lang))
+        if canonical is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return canonical
+
+    def learn(self, query: str, lang: str, canonical: str) -> None:
+        """Registra que la consulta (y la propia ubicación canónica) apuntan a `canonical`"""
+        for alias in (query, canonical):
+            key = self._key(alias, lang)
+            if self._aliases.get(key) != canonical:
+                self._aliases[key] = canonical
+                self._pending += 1
+        if self._pending and (
+            self._pending >= self.save_every or time.monotonic() - self._saved_at >= self.save_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Guarda en disco los alias aprendidos desde el último guardado"""
+        if not self._pending:
+            return
+        self._save()
+        self._pending = 0
+        self._saved_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._aliases)
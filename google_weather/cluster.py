@@ -0,0 +1,499 @@
+import argparse
+import asyncio
+import bisect
+import hashlib
+import itertools
+import json
+import logging
+import socket
+import sys
+from collections import deque
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Set, Tuple
+
+from .cache import normalize_query
+from .errors import WeatherTimeoutError, BlockedError
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteLookupError(Exception):
+    """Una consulta falló en un nodo trabajador; `kind` es el tipo de la excepción original"""
+
+    def __init__(self, message: str, kind: str, node: Optional[str] = None):
+        self.kind = kind
+        self.node = node
+        super().__init__(message)
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """
+    Anillo de hashing consistente con `replicas` nodos virtuales por nodo.
+
+    Al agregar o quitar un nodo solo cambian de dueño las claves del tramo
+    afectado (~1/N), de modo que cada ciudad sigue yendo al nodo que ya la
+    tiene en su cache.
+    """
+
+    def __init__(self, replicas: int = 100):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+
+    def add(self, node: str) -> None:
+        for i in range(self.replicas):
+            point = _hash(f"{node}#{i}")
+            if point not in self._owners:
+                bisect.insort(self._points, point)
+                self._owners[point] = node
+
+    def remove(self, node: str) -> None:
+        self._points = [point for point in self._points if self._owners[point] != node]
+        self._owners = {point: owner for point, owner in self._owners.items() if owner != node}
+
+    def node_for(self, key: str, exclude: Optional[Set[str]] = None) -> Optional[str]:
+        """
+        Nodo dueño de la clave; con `exclude`, el siguiente nodo del anillo que no
+        esté excluido (o el dueño, si lo están todos)
+        """
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        owner = self._owners[self._points[index]]
+        if not exclude or owner not in exclude:
+            return owner
+        for offset in range(1, len(self._points)):
+            node = self._owners[self._points[(index + offset) % len(self._points)]]
+            if node not in exclude:
+                return node
+        return owner
+
+    @property
+    def nodes(self) -> List[str]:
+        return sorted(set(self._owners.values()))
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+class _Job:
+    def __init__(self, job_id: int, city: str, lang: str, timeout: Optional[float]):
+        self.id = job_id
+        self.city = city
+        self.lang = lang
+        self.timeout = timeout
+        self.key = f"{lang}|{normalize_query(city)}"
+        self.attempts = 0
+        self.node: Optional[str] = None
+        # Nodos que dejaron vencer esta consulta; los reintentos van a otro nodo
+        self.stalled_on: Set[str] = set()
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class _Node:
+    def __init__(self, node_id: str, writer: asyncio.StreamWriter, capacity: int):
+        self.id = node_id
+        self.writer = writer
+        self.capacity = capacity
+        self.in_flight: Dict[int, _Job] = {}
+        self.completed = 0
+
+
+class Coordinator:
+    """
+    Reparte consultas entre nodos trabajadores (ver Worker) por hashing consistente.
+
+    Los trabajadores se conectan por TCP y hablan líneas JSON. Cada ciudad se
+    asigna al nodo dueño de su clave en el anillo en el momento de enviarla, así
+    que las consultas pendientes se rebalancean solas cuando un nodo entra o
+    sale. Las consultas en curso en un nodo que se cae, o que no responde en
+    `job_deadline` segundos (o en el timeout de la consulta, si es mayor),
+    vuelven a la cola (hasta `max_attempts` intentos); tras un vencimiento el
+    reintento va al siguiente nodo del anillo. Si no queda ningún nodo durante
+    `node_wait` segundos, las consultas en cola fallan en vez de esperar para
+    siempre, y close() hace fallar todas las pendientes.
+
+    Ejemplo:
+        coordinator = Coordinator(port=7000)
+        await coordinator.start()
+        # en cada máquina: python -m google_weather.cluster worker --coordinator host:7000
+        async for city, readings in coordinator.stream(cities, lang='es'):
+            ...
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        replicas: int = 100,
+        max_attempts: int = 3,
+        job_deadline: Optional[float] = 120,
+        node_wait: Optional[float] = 30
+    ):
+        self.host = host
+        self.port = port
+        self.max_attempts = max_attempts
+        self.job_deadline = job_deadline
+        self.node_wait = node_wait
+        self.ring = HashRing(replicas)
+        self._nodes: Dict[str, _Node] = {}
+        self._queue: deque = deque()
+        self._ids = itertools.count()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._node_changed: Optional[asyncio.Event] = None
+        self._no_nodes_timer: Optional[asyncio.TimerHandle] = None
+        self._closed = False
+        self.requeued = 0
+        self.expired = 0
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_node, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._node_changed = asyncio.Event()
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    async def wait_for_nodes(self, count: int, timeout: Optional[float] = None) -> None:
+        """Espera hasta que haya al menos `count` nodos conectados"""
+        async def _wait() -> None:
+            while len(self._nodes) < count:
+                self._node_changed.clear()
+                await self._node_changed.wait()
+        await asyncio.wait_for(_wait(), timeout=timeout)
+
+    async def _handle_node(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        node: Optional[_Node] = None
+        try:
+            hello = json.loads(await reader.readline())
+            if hello.get('type') != 'hello':
+                return
+            node = _Node(hello['node'], writer, hello.get('capacity', 4))
+            if node.id in self._nodes:
+                raise ValueError(f"Nodo duplicado: {node.id}")
+            self._nodes[node.id] = node
+            self.ring.add(node.id)
+            self._node_changed.set()
+            if self._no_nodes_timer:
+                self._no_nodes_timer.cancel()
+                self._no_nodes_timer = None
+            logger.info(f"Nodo '{node.id}' conectado ({len(self._nodes)} nodos)")
+            self._pump()
+
+            async for line in reader:
+                self._handle_message(node, json.loads(line))
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Conexión con nodo perdida: {str(e)}")
+        finally:
+            if node is not None and self._nodes.get(node.id) is node:
+                self._remove_node(node)
+            writer.close()
+
+    def _handle_message(self, node: _Node, message: Dict[str, Any]) -> None:
+        job = node.in_flight.pop(message.get('id'), None)
+        if job is None:
+            return
+        self._clear_timer(job)
+        node.completed += 1
+        if not job.future.done():
+            if message['type'] == 'result':
+                job.future.set_result(message['readings'])
+            else:
+                job.future.set_exception(self._remote_error(message, node.id))
+        self._pump()
+
+    @staticmethod
+    def _remote_error(message: Dict[str, Any], node_id: str) -> Exception:
+        # Reconstruir los errores conocidos para que se manejen igual que en local
+        kind = message.get('kind')
+        if kind == 'WeatherTimeoutError':
+            return WeatherTimeoutError(message.get('phase', 'remote'), message.get('timeout'))
+        if kind == 'BlockedError':
+            return BlockedError(message['error'])
+        return RemoteLookupError(message['error'], kind, node_id)
+
+    def _remove_node(self, node: _Node) -> None:
+        del self._nodes[node.id]
+        self.ring.remove(node.id)
+        self._node_changed.set()
+        # Lo que el nodo tenía en curso vuelve al frente de la cola
+        for job in reversed(list(node.in_flight.values())):
+            self._clear_timer(job)
+            self._retry(job, node.id, 'NodeLost', f"Consulta de '{job.city}' perdida en {job.attempts} nodos")
+        node.in_flight.clear()
+        logger.warning(f"Nodo '{node.id}' desconectado ({len(self._nodes)} nodos)")
+        self._pump()
+
+    def _retry(self, job: _Job, node_id: str, kind: str, message: str) -> None:
+        """Devuelve la consulta al frente de la cola, o la hace fallar si agotó sus intentos"""
+        if job.future.done():
+            return
+        if job.attempts >= self.max_attempts:
+            job.future.set_exception(RemoteLookupError(message, kind, node_id))
+            return
+        self.requeued += 1
+        self._queue.appendleft(job)
+
+    @staticmethod
+    def _clear_timer(job: _Job) -> None:
+        if job.timer:
+            job.timer.cancel()
+            job.timer = None
+
+    def _expire_job(self, node_id: str, job: _Job) -> None:
+        """El nodo no respondió a tiempo: la consulta se reintenta en otro nodo"""
+        job.timer = None
+        node = self._nodes.get(node_id)
+        if node is None or node.in_flight.get(job.id) is not job:
+            return
+        # Su respuesta tardía se descarta (ya no está en curso en ese nodo)
+        del node.in_flight[job.id]
+        job.stalled_on.add(node_id)
+        self.expired += 1
+        logger.warning(f"Nodo '{node_id}' no respondió la consulta de '{job.city}' a tiempo")
+        self._retry(job, node_id, 'Deadline', f"Consulta de '{job.city}' vencida en {job.attempts} nodos")
+        self._pump()
+
+    def _fail_queued(self) -> None:
+        """Sin nodos durante `node_wait` segundos: la cola falla en vez de esperar"""
+        self._no_nodes_timer = None
+        queued, self._queue = self._queue, deque()
+        for job in queued:
+            if not job.future.done():
+                job.future.set_exception(RemoteLookupError(
+                    f"Ningún nodo conectado para la consulta de '{job.city}'", 'NoNodes'
+                ))
+
+    def _pump(self) -> None:
+        """Envía las consultas en cola a su nodo dueño mientras tenga capacidad"""
+        if not self._nodes:
+            if self._queue and self.node_wait is not None and self._no_nodes_timer is None:
+                self._no_nodes_timer = asyncio.get_running_loop().call_later(self.node_wait, self._fail_queued)
+            return
+        waiting = deque()
+        while self._queue:
+            job = self._queue.popleft()
+            if job.future.done():
+                continue
+            node = self._nodes[self.ring.node_for(job.key, job.stalled_on)]
+            if len(node.in_flight) >= node.capacity:
+                waiting.append(job)
+                continue
+            job.attempts += 1
+            job.node = node.id
+            node.in_flight[job.id] = job
+            if self.job_deadline is not None:
+                job.timer = asyncio.get_running_loop().call_later(
+                    max(self.job_deadline, job.timeout or 0), self._expire_job, node.id, job
+                )
+            node.writer.write(_encode({
+                'type': 'lookup', 'id': job.id, 'city': job.city, 'lang': job.lang, 'timeout': job.timeout
+            }))
+        self._queue = waiting
+
+    def submit(self, city: str, lang: str = 'en', timeout: Optional[float] = None) -> asyncio.Future:
+        """Encola una consulta y devuelve un future con las lecturas crudas"""
+        if self._closed:
+            raise RuntimeError("El coordinador está cerrado")
+        job = _Job(next(self._ids), city, lang, timeout)
+        self._queue.append(job)
+        self._pump()
+        return job.future
+
+    async def stream(
+        self,
+        cities: List[str],
+        lang: str = 'en',
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Devuelve (ciudad, lecturas o excepción) a medida que llegan los resultados"""
+        results: asyncio.Queue = asyncio.Queue()
+        futures = []
+        for city in cities:
+            future = self.submit(city, lang, timeout)
+            future.add_done_callback(
+                lambda f, city=city: results.put_nowait((city, f.exception() or f.result())) if not f.cancelled() else None
+            )
+            futures.append(future)
+        try:
+            for _ in futures:
+                yield await results.get()
+        finally:
+            # Si quien consume deja de iterar, las consultas pendientes se descartan
+            for future in futures:
+                future.cancel()
+
+    async def get_readings_many(
+        self,
+        cities: List[str],
+        lang: str = 'en',
+        timeout: Optional[float] = None,
+        on_result: Optional[Callable[[str, Any], None]] = None
+    ) -> List[Any]:
+        """Como WeatherScraper.get_readings_many, pero repartido entre los nodos"""
+        futures = [self.submit(city, lang, timeout) for city in cities]
+        if on_result:
+            for city, future in zip(cities, futures):
+                future.add_done_callback(
+                    lambda f, city=city: on_result(city, f.exception() or f.result()) if not f.cancelled() else None
+                )
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'nodes': {node.id: {'in_flight': len(node.in_flight), 'completed': node.completed} for node in self._nodes.values()},
+            'queued': len(self._queue),
+            'requeued': self.requeued,
+            'expired': self.expired
+        }
+
+    async def close(self) -> None:
+        """Cierra el servidor y hace fallar las consultas en cola o en curso"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._no_nodes_timer:
+            self._no_nodes_timer.cancel()
+            self._no_nodes_timer = None
+        pending = list(self._queue) + [job for node in self._nodes.values() for job in node.in_flight.values()]
+        self._queue.clear()
+        for job in pending:
+            self._clear_timer(job)
+            if not job.future.done():
+                job.future.set_exception(RemoteLookupError(
+                    f"Coordinador cerrado antes de terminar la consulta de '{job.city}'", 'Closed', job.node
+                ))
+        if self._server:
+            self._server.close()
+            for node in list(self._nodes.values()):
+                node.writer.close()
+            await self._server.wait_closed()
+
+
+class Worker:
+    """
+    Nodo trabajador: se conecta al coordinador y ejecuta sus consultas con un scraper local.
+
+    Ejemplo:
+        scraper = WeatherScraper(cache_ttl=600)
+        await Worker(scraper, 'coordinator.internal:7000', concurrency=8).run()
+    """
+
+    def __init__(self, scraper, coordinator: str, node_id: Optional[str] = None, concurrency: int = 4):
+        host, _, port = coordinator.rpartition(':')
+        self.scraper = scraper
+        self.host = host or '127.0.0.1'
+        self.port = int(port)
+        self.node_id = node_id or f"{socket.gethostname()}-{id(self):x}"
+        self.concurrency = concurrency
+        self._tasks = set()
+
+    async def run(self) -> None:
+        """Atiende consultas hasta que el coordinador cierra la conexión"""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        writer.write(_encode({'type': 'hello', 'node': self.node_id, 'capacity': self.concurrency}))
+        await writer.drain()
+        try:
+            async for line in reader:
+                message = json.loads(line)
+                if message.get('type') == 'lookup':
+                    task = asyncio.ensure_future(self._lookup(message, writer))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+        except ConnectionError:
+            pass
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            writer.close()
+
+    async def _lookup(self, message: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        try:
+            readings = await self.scraper.get_readings(message['city'], message['lang'], timeout=message.get('timeout'))
+            reply = {'type': 'result', 'id': message['id'], 'readings': readings}
+        except Exception as e:
+            reply = {'type': 'error', 'id': message['id'], 'error': str(e), 'kind': type(e).__name__}
+            if isinstance(e, WeatherTimeoutError):
+                reply.update(phase=e.phase, timeout=e.timeout)
+        writer.write(_encode(reply))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Consultas del clima repartidas entre varios nodos")
+    subparsers = parser.add_subparsers(dest='mode', required=True)
+
+    coordinator_parser = subparsers.add_parser('coordinator', help="Reparte una lista de ciudades (una por línea)")
+    coordinator_parser.add_argument('cities', help="Archivo con las ciudades, o '-' para stdin")
+    coordinator_parser.add_argument('--host', default='127.0.0.1')
+    coordinator_parser.add_argument('--port', type=int, default=7000)
+    coordinator_parser.add_argument('--lang', default='en')
+    coordinator_parser.add_argument('--nodes', type=int, default=1, help="Nodos a esperar antes de empezar")
+
+    worker_parser = subparsers.add_parser('worker', help="Ejecuta consultas para un coordinador")
+    worker_parser.add_argument('--coordinator', required=True, help="host:puerto del coordinador")
+    worker_parser.add_argument('--node-id')
+    worker_parser.add_argument('--concurrency', type=int, default=4)
+    worker_parser.add_argument('--cache-ttl', type=float, default=600)
+    worker_parser.add_argument('--browser-endpoint')
+    worker_parser.add_argument('--profile-dir', help="Perfilar el nodo y volcar los perfiles en este directorio")
+    worker_parser.add_argument('--profile-interval', type=float, default=300, help="Segundos entre volcados del perfil")
+    args = parser.parse_args()
+
+    async def _coordinate() -> None:
+        source = sys.stdin if args.cities == '-' else open(args.cities, encoding='utf-8')
+        with source:
+            cities = [line.strip() for line in source if line.strip()]
+        coordinator = Coordinator(args.host, args.port)
+        await coordinator.start()
+        print(f"Coordinador en {coordinator.address}", file=sys.stderr, flush=True)
+        await coordinator.wait_for_nodes(args.nodes)
+        try:
+            await coordinator.get_readings_many(
+                cities,
+                args.lang,
+                on_result=lambda city, result: print(json.dumps(
+                    {'city': city, 'readings': result} if not isinstance(result, BaseException)
+                    else {'city': city, 'error': str(result)},
+                    ensure_ascii=False
+                ), flush=True)
+            )
+        finally:
+            await coordinator.close()
+
+    async def _work() -> None:
+        from .profiling import Profiler
+        from .weather import WeatherScraper
+        profiler = None
+        if args.profile_dir:
+            # SIGUSR1 vuelca el perfil en cualquier momento
+            profiler = Profiler(args.profile_dir, dump_interval=args.profile_interval, signal_dump=True)
+        scraper = WeatherScraper(cache_ttl=args.cache_ttl, browser_endpoint=args.browser_endpoint, profiler=profiler)
+        try:
+            await Worker(scraper, args.coordinator, args.node_id, args.concurrency).run()
+        finally:
+            await scraper.close()
+            if profiler:
+                profiler.dump()
+
+    try:
+        asyncio.run(_coordinate() if args.mode == 'coordinator' else _work())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,32 +1,156 @@
 import asyncio
+import sys
 import nest_asyncio
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from .weather import WeatherScraper
 
+# nest_asyncio se aplica una sola vez por proceso
+_nest_asyncio_applied = False
+
+
+def _apply_nest_asyncio() -> None:
+    global _nest_asyncio_applied
+    if not _nest_asyncio_applied:
+        nest_asyncio.apply()
+        _nest_asyncio_applied = True
+
+
+class _TextProgress:
+    """Barra de progreso mínima para cuando tqdm no está disponible"""
+
+    def __init__(self, total: int, desc: str):
+        self.total = total
+        self.desc = desc
+        self.n = 0
+        self._render()
+
+    def _render(self) -> None:
+        sys.stdout.write(f"\r{self.desc}: {self.n}/{self.total}")
+        sys.stdout.flush()
+
+    def update(self, n: int = 1) -> None:
+        self.n += n
+        self._render()
+
+    def set_postfix_str(self, text: str) -> None:
+        pass
+
+    def close(self) -> None:
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+
+
+def _progress_bar(total: int, desc: str):
+    try:
+        from tqdm.auto import tqdm
+        return tqdm(total=total, desc=desc)
+    except ImportError:
+        return _TextProgress(total, desc)
+
+
 class ColabWeatherClient:
-    """Cliente especial para Google Colab que maneja automáticamente la configuración async"""
-    
-    def __init__(self, debug: bool = False):
+    """
+    Cliente especial para Google Colab que maneja automáticamente la configuración async
+
+    Reutiliza un único scraper (y su navegador) entre consultas. Usar como context
+    manager, o llamar a close(), para liberar el navegador al terminar:
+
+        with ColabWeatherClient() as weather:
+            results = weather.get_weather_many(cities, lang='es')
+    """
+
+    def __init__(self, debug: bool = False, concurrency: int = 8, **scraper_options):
         # Configurar el entorno de Colab
-        nest_asyncio.apply()
-        
+        _apply_nest_asyncio()
+
         # Crear el scraper
-        self.scraper = WeatherScraper(debug=debug)
-    
+        self.scraper = WeatherScraper(debug=debug, **scraper_options)
+        self.concurrency = concurrency
+        self._closed = False
+
+    def _run(self, coro):
+        return asyncio.get_event_loop().run_until_complete(coro)
+
     def get_weather(self, city: str, lang: str = 'en', temp_unit: str = 'C', wind_unit: str = 'kmh') -> Dict[str, Any]:
         """
         Obtiene el clima para una ciudad de forma síncrona (para uso fácil en Colab)
-        
+
         Args:
             city: Nombre de la ciudad
             lang: Código de idioma ('en', 'es', 'fr', etc.)
             temp_unit: Unidad de temperatura ('C', 'F', 'K')
             wind_unit: Unidad de viento ('kmh', 'mph')
-            
+
         Returns:
             Dict con información del clima
         """
-        async def _get_weather():
-            return await self.scraper.get_weather(city, lang, temp_unit, wind_unit)
-        
-        return asyncio.get_event_loop().run_until_complete(_get_weather()) 
\ No newline at end of file
+        return self._run(self.scraper.get_weather(city, lang, temp_unit, wind_unit))
+
+    def get_weather_many(
+        self,
+        cities: List[str],
+        lang: str = 'en',
+        temp_unit: str = 'C',
+        wind_unit: str = 'kmh',
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        progress: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Obtiene el clima de muchas ciudades en paralelo, mostrando el progreso
+
+        Args:
+            cities: Lista de ciudades
+            lang: Código de idioma ('en', 'es', 'fr', etc.)
+            temp_unit: Unidad de temperatura ('C', 'F', 'K')
+            wind_unit: Unidad de viento ('kmh', 'mph')
+            concurrency: Consultas simultáneas (por defecto, la del cliente)
+            timeout: Presupuesto total en segundos para todo el lote
+            progress: Mostrar una barra de progreso (tqdm si está disponible)
+
+        Returns:
+            Dict ciudad -> resultado, en el orden recibido. Una ciudad repetida se
+            consulta una sola vez y aparece una sola vez. Las consultas que
+            fallan guardan la excepción como valor.
+        """
+        cities = list(dict.fromkeys(cities))
+        bar = _progress_bar(len(cities), 'Clima') if progress else None
+        failures = 0
+
+        def _on_result(city: str, result: Any) -> None:
+            nonlocal failures
+            if isinstance(result, BaseException):
+                failures += 1
+            if bar:
+                bar.update(1)
+                if failures:
+                    bar.set_postfix_str(f"errores: {failures}")
+
+        try:
+            results = self._run(self.scraper.get_weather_many(
+                cities,
+                lang,
+                temp_unit,
+                wind_unit,
+                concurrency=concurrency or self.concurrency,
+                timeout=timeout,
+                on_result=_on_result
+            ))
+        finally:
+            if bar:
+                bar.close()
+
+        return dict(zip(cities, results))
+
+    def close(self) -> None:
+        """Cierra el navegador del scraper; se puede llamar varias veces"""
+        if self._closed:
+            return
+        self._closed = True
+        self._run(self.scraper.close())
+
+    def __enter__(self) -> 'ColabWeatherClient':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
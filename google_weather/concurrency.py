@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List
+
+from .errors import BlockedError
+from .stats import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """
+    Límite de concurrencia adaptativo (AIMD).
+
+    Cada `window` consultas terminadas evalúa la ventana: si el p95 de latencia,
+    la tasa de errores y la tasa de bloqueos (CAPTCHA) están sanos y el límite se
+    estaba usando, lo sube en `increase` (aumento aditivo); si alguno se degrada,
+    lo multiplica por `decrease` (reducción multiplicativa). Cada decisión queda
+    en `history`.
+
+    Ejemplo:
+        limiter = AdaptiveLimiter(initial=4, max_limit=32, target_p95=4.0)
+        results = await scraper.get_weather_many(cities, limiter=limiter)
+        print(limiter.limit, limiter.history[-1])
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        target_p95: float = 5.0,
+        max_error_rate: float = 0.1,
+        max_block_rate: float = 0.02,
+        increase: int = 1,
+        decrease: float = 0.5,
+        window: int = 20,
+        max_history: int = 500
+    ):
+        self.limit = max(min_limit, min(initial, max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_p95 = target_p95
+        self.max_error_rate = max_error_rate
+        self.max_block_rate = max_block_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+        self.history: deque = deque(maxlen=max_history)
+
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._samples: List[tuple] = []
+        self._condition: asyncio.Condition = None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Se crea dentro del event loop (Python 3.9 la asocia al loop al construirla)
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    async def release(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self._in_flight -= 1
+            condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Ocupa un lugar de concurrencia y mide la consulta que se ejecuta dentro"""
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except BlockedError:
+            self.record(time.monotonic() - started, ok=False, blocked=True)
+            raise
+        except Exception:
+            self.record(time.monotonic() - started, ok=False)
+            raise
+        else:
+            self.record(time.monotonic() - started, ok=True)
+        finally:
+            await self.release()
+
+    def observe_in_flight(self, in_flight: int) -> None:
+        """Informa la concurrencia en uso cuando el llamador gestiona sus propios lugares"""
+        self._peak_in_flight = max(self._peak_in_flight, in_flight)
+
+    def record(self, latency: float, ok: bool = True, blocked: bool = False) -> None:
+        """Registra una consulta terminada y decide el nuevo límite al completar la ventana"""
+        self._samples.append((latency, ok, blocked))
+        if len(self._samples) >= self.window:
+            self._decide()
+
+    def _decide(self) -> None:
+        samples, self._samples = self._samples, []
+        p95 = percentile([s[0] for s in samples if s[1]], 95)
+        error_rate = sum(1 for s in samples if not s[1] and not s[2]) / len(samples)
+        block_rate = sum(1 for s in samples if s[2]) / len(samples)
+        peak, self._peak_in_flight = self._peak_in_flight, self._in_flight
+
+        old_limit = self.limit
+        if block_rate > self.max_block_rate:
+            reason = 'blocked'
+        elif error_rate > self.max_error_rate:
+            reason = 'errors'
+        elif p95 is not None and p95 > self.target_p95:
+            reason = 'latency'
+        elif peak >= self.limit:
+            reason = 'healthy'
+        else:
+            # Sano pero sin usar todo el límite: subirlo no aporta nada
+            reason = 'underused'
+
+        if reason in ('blocked', 'errors', 'latency'):
+            self.limit = max(self.min_limit, math.floor(self.limit * self.decrease))
+        elif reason == 'healthy':
+            self.limit = min(self.max_limit, self.limit + self.increase)
+
+        self.history.append({
+            'time': time.time(),
+            'old_limit': old_limit,
+            'limit': self.limit,
+            'reason': reason,
+            'p95': p95,
+            'error_rate': error_rate,
+            'block_rate': block_rate
+        })
+        if self.limit != old_limit:
+            logger.info(f"Concurrencia {old_limit} -> {self.limit} ({reason})")
+
+        # Un límite mayor puede liberar consultas en espera
+        if self._condition is not None and self.limit > old_limit:
+            asyncio.ensure_future(self._notify())
+
+    async def _notify(self) -> None:
+        async with self._condition:
+            self._condition.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado actual para exportar como métrica"""
+        return {
+            'limit': self.limit,
+            'in_flight': self._in_flight,
+            'pending_samples': len(self._samples),
+            'last_decision': self.history[-1] if self.history else None
+        }
@@ -0,0 +1,60 @@
+import time
+from typing import Optional
+
+from .errors import WeatherTimeoutError
+
+
+class Deadline:
+    """
+    Presupuesto de tiempo de extremo a extremo para una consulta.
+
+    Lleva la fase actual para poder informar dónde se agotó el tiempo y
+    reparte el tiempo restante entre navegaciones y esperas de selectores.
+    Con `timeout=None` no impone límite y respeta los valores por defecto.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout if timeout is not None else None
+        self.phase = 'start'
+
+    def remaining(self) -> Optional[float]:
+        """Segundos restantes, o None si no hay límite"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def fork(self) -> 'Deadline':
+        """Copia con el mismo vencimiento y su propia fase, para intentos en paralelo"""
+        child = Deadline()
+        child.timeout = self.timeout
+        child.expires_at = self.expires_at
+        child.phase = self.phase
+        return child
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def enter(self, phase: str) -> None:
+        """Marca el inicio de una fase y falla si ya no queda presupuesto"""
+        self.phase = phase
+        if self.expired():
+            raise self.error()
+
+    def timeout_ms(self, default: Optional[float] = None) -> Optional[float]:
+        """
+        Timeout en milisegundos para una operación de Playwright.
+
+        Devuelve el menor entre `default` (ms) y el tiempo restante. Nunca
+        devuelve 0, porque Playwright lo interpreta como "sin límite".
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if remaining <= 0:
+            raise self.error()
+        remaining_ms = max(1.0, remaining * 1000)
+        return min(default, remaining_ms) if default is not None else remaining_ms
+
+    def error(self) -> WeatherTimeoutError:
+        return WeatherTimeoutError(self.phase, self.timeout)
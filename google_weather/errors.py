@@ -0,0 +1,11 @@
+class WeatherTimeoutError(TimeoutError):
+    """Se agotó el presupuesto de tiempo de una consulta; `phase` indica en qué etapa"""
+
+    def __init__(self, phase: str, timeout: float):
+        self.phase = phase
+        self.timeout = timeout
+        super().__init__(f"Error getting weather: timeout of {timeout}s exceeded during '{phase}'")
+
+
+class BlockedError(Exception):
+    """Google respondió con un CAPTCHA o una página de bloqueo en lugar de resultados"""
@@ -0,0 +1,142 @@
+import math
+import time
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distancia de gran círculo en kilómetros"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def encode_geohash(lat: float, lon: float, precision: int = 5) -> str:
+    """Geohash estándar (base 32) del punto"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, value, even = 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """(alto, ancho) en grados de una celda de la precisión dada"""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+class SpatialIndex:
+    """
+    Índice espacial de lecturas recientes sobre una grilla de geohash.
+
+    Cada lectura se guarda en la celda de sus coordenadas. Una búsqueda por radio
+    recorre solo las celdas que tocan el recuadro del círculo (o todas las celdas
+    ocupadas, si son menos) y devuelve la entrada fresca más cercana dentro del
+    radio. Las entradas vencidas (`ttl`) se descartan al encontrarlas y en un
+    barrido completo cada `ttl` segundos, así que el índice no crece con puntos
+    que ya nadie consulta.
+    """
+
+    def __init__(self, ttl: float = 600, precision: int = 5):
+        self.ttl = ttl
+        self.precision = precision
+        self.cell_height, self.cell_width = geohash_cell_size(precision)
+        self._cells: Dict[str, List[Tuple[float, float, float, Dict[str, Any]]]] = {}
+        self._last_sweep = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, lat: float, lon: float, readings: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        if now - self._last_sweep >= self.ttl:
+            self.sweep()
+        cell = self._cells.setdefault(encode_geohash(lat, lon, self.precision), [])
+        # Un punto repetido reemplaza su lectura anterior
+        cell[:] = [entry for entry in cell if (entry[0], entry[1]) != (lat, lon)]
+        cell.append((lat, lon, now, dict(readings)))
+
+    def sweep(self) -> int:
+        """Descarta las entradas vencidas de todas las celdas; devuelve cuántas se quitaron"""
+        now = time.monotonic()
+        self._last_sweep = now
+        removed = 0
+        for geohash in list(self._cells):
+            removed += self._prune(geohash, now)
+        return removed
+
+    def _prune(self, geohash: str, now: float) -> int:
+        cell = self._cells[geohash]
+        fresh = [entry for entry in cell if now - entry[2] < self.ttl]
+        if len(fresh) != len(cell):
+            if fresh:
+                self._cells[geohash] = fresh
+            else:
+                del self._cells[geohash]
+        return len(cell) - len(fresh)
+
+    def _cells_covering(self, lat: float, lon: float, radius_km: float) -> Optional[Set[str]]:
+        """
+        Celdas que tocan el recuadro del círculo, o None si son más que las celdas
+        ocupadas del índice (entonces conviene recorrer esas directamente)
+        """
+        dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+        cos_lat = math.cos(math.radians(min(89.9, abs(lat))))
+        dlon = min(180.0, math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)))
+        lat_min, lat_max = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+
+        # Pasos de una celda: cada celda que corta el recuadro tiene al menos un punto de la grilla
+        lat_steps = math.ceil((lat_max - lat_min) / self.cell_height) + 1
+        lon_steps = math.ceil(2 * dlon / self.cell_width) + 1
+        if lat_steps * lon_steps > len(self._cells):
+            return None
+        cells = set()
+        for i in range(lat_steps):
+            point_lat = min(lat_max, lat_min + i * self.cell_height)
+            for j in range(lon_steps):
+                point_lon = min(lon + dlon, lon - dlon + j * self.cell_width)
+                point_lon = (point_lon + 180.0) % 360.0 - 180.0
+                cells.add(encode_geohash(point_lat, point_lon, self.precision))
+        return cells
+
+    def nearest(self, lat: float, lon: float, radius_km: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """(distancia_km, lecturas) de la entrada fresca más cercana dentro del radio, o None"""
+        now = time.monotonic()
+        best = None
+        covering = self._cells_covering(lat, lon, radius_km)
+        for geohash in list(self._cells) if covering is None else covering:
+            if geohash not in self._cells:
+                continue
+            self._prune(geohash, now)
+            for entry_lat, entry_lon, _, readings in self._cells.get(geohash, []):
+                distance = haversine_km(lat, lon, entry_lat, entry_lon)
+                if distance <= radius_km and (best is None or distance < best[0]):
+                    best = (distance, readings)
+        if best is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return best[0], dict(best[1])
+
+    def __len__(self) -> int:
+        return sum(len(cell) for cell in self._cells.values())
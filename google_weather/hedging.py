@@ -0,0 +1,62 @@
+from collections import deque
+from typing import Dict, Any, Optional
+
+from .stats import percentile
+
+
+class HedgePolicy:
+    """
+    Política de consultas de cobertura (hedged requests).
+
+    Si una consulta no terminó en el percentil `percentile` de las latencias
+    recientes, se lanza un segundo intento y gana el primero que termine bien.
+    `budget` limita la carga extra: los intentos de cobertura nunca superan esa
+    fracción de las consultas.
+
+    Ejemplo:
+        scraper = WeatherScraper(hedge=HedgePolicy(percentile=90, budget=0.05))
+        ...
+        print(scraper.hedge.snapshot())
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        budget: float = 0.05,
+        min_samples: int = 20,
+        min_delay: float = 0.1,
+        window: int = 200
+    ):
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._latencies: deque = deque(maxlen=window)
+
+        self.requests = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    def record_latency(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    def delay(self) -> Optional[float]:
+        """Segundos a esperar antes de cubrir, o None si aún no hay muestras suficientes"""
+        if len(self._latencies) < self.min_samples:
+            return None
+        return max(self.min_delay, percentile(self._latencies, self.percentile))
+
+    def try_fire(self) -> bool:
+        """Reserva un intento de cobertura si el presupuesto lo permite"""
+        if self.hedges_fired + 1 > self.budget * self.requests:
+            return False
+        self.hedges_fired += 1
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'hedges_fired': self.hedges_fired,
+            'hedges_won': self.hedges_won,
+            'delay': self.delay()
+        }
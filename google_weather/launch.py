@@ -0,0 +1,251 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from .stats import percentile
+
+logger = logging.getLogger(__name__)
+
+# Flags de Chromium compartidos por todos los perfiles y por el servidor externo
+CHROMIUM_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-site-isolation-trials'
+]
+
+# Funciones desactivadas en todos los perfiles. Chromium solo respeta el último
+# --disable-features de la línea de comandos, así que se combinan en uno solo.
+DISABLED_FEATURES = ['IsolateOrigins', 'site-per-process']
+
+# Perfiles de lanzamiento: flags extra, funciones desactivadas y cómo se lanza Chromium.
+# - default: la configuración original
+# - low-memory: menos procesos de renderizado, sin GPU ni tareas en segundo plano y
+#   un heap de V8 acotado; para máquinas pequeñas con muchos contextos
+# - headless-shell: el binario chrome-headless-shell (siempre sin ventana), que
+#   arranca más rápido y pesa menos que el Chromium completo
+LAUNCH_PROFILES = {
+    'default': {
+        'args': [],
+        'disable_features': [],
+        'channel': None,
+        'force_headless': False,
+    },
+    'low-memory': {
+        'args': [
+            '--process-per-site',
+            '--renderer-process-limit=2',
+            '--disable-dev-shm-usage',
+            '--disable-gpu',
+            '--disable-extensions',
+            '--disable-background-networking',
+            '--disable-background-timer-throttling',
+            '--disable-renderer-backgrounding',
+            '--js-flags=--max-old-space-size=128',
+        ],
+        'disable_features': ['Translate', 'OptimizationHints', 'MediaRouter', 'BackForwardCache'],
+        'channel': None,
+        'force_headless': False,
+    },
+    'headless-shell': {
+        'args': ['--disable-gpu', '--disable-extensions'],
+        'disable_features': ['Translate'],
+        'channel': 'chromium-headless-shell',
+        'force_headless': True,
+    },
+}
+
+
+def validate_launch_profile(profile: str) -> None:
+    if profile not in LAUNCH_PROFILES:
+        raise ValueError(f"Perfil de lanzamiento no soportado: {profile}")
+
+
+def chromium_args(profile: str = 'default') -> List[str]:
+    """Flags de Chromium del perfil, con un único --disable-features combinado"""
+    validate_launch_profile(profile)
+    config = LAUNCH_PROFILES[profile]
+    features = list(dict.fromkeys(DISABLED_FEATURES + config['disable_features']))
+    return [*CHROMIUM_ARGS, f"--disable-features={','.join(features)}", *config['args']]
+
+
+def launch_options(profile: str = 'default', headless: bool = True, proxy: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Argumentos para `playwright.chromium.launch` según el perfil
+
+    Args:
+        profile: Nombre del perfil (ver LAUNCH_PROFILES)
+        headless: Sin ventana; los perfiles con `force_headless` lo ignoran
+        proxy: Proxy del navegador, si lo hay
+    """
+    validate_launch_profile(profile)
+    config = LAUNCH_PROFILES[profile]
+    options: Dict[str, Any] = {
+        'headless': headless or config['force_headless'],
+        'args': chromium_args(profile),
+        'proxy': proxy,
+    }
+    if config['channel']:
+        options['channel'] = config['channel']
+    return options
+
+
+def descendant_pids(pid: Optional[int] = None) -> Optional[List[int]]:
+    """PIDs de todos los procesos descendientes (driver, navegador y sus hijos) según /proc"""
+    proc = Path('/proc')
+    if not proc.exists():
+        return None
+    pending = [pid or os.getpid()]
+    found = []
+    while pending:
+        current = pending.pop()
+        try:
+            tasks = list((proc / str(current) / 'task').iterdir())
+        except OSError:
+            continue
+        for task in tasks:
+            try:
+                children = [int(child) for child in (task / 'children').read_text().split()]
+            except OSError:
+                continue
+            found.extend(children)
+            pending.extend(children)
+    return found
+
+
+def _rss_bytes(pid: int) -> int:
+    """RSS de un proceso en bytes (0 si ya terminó)"""
+    try:
+        fields = Path(f'/proc/{pid}/statm').read_text().split()
+    except OSError:
+        return 0
+    return int(fields[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def process_tree_rss(pid: Optional[int] = None, include_self: bool = False) -> Optional[int]:
+    """
+    Memoria residente sumada de los procesos descendientes, en bytes
+
+    La memoria compartida entre procesos de Chromium se cuenta una vez por proceso,
+    así que es una cota superior; sirve para comparar perfiles, no como valor absoluto.
+    None fuera de Linux.
+    """
+    pids = descendant_pids(pid)
+    if pids is None:
+        return None
+    if include_self:
+        pids.append(pid or os.getpid())
+    return sum(_rss_bytes(child) for child in pids)
+
+
+async def benchmark_profile(
+    profile: str,
+    city: str = 'Madrid',
+    lang: str = 'en',
+    lookups: int = 10,
+    settle: float = 2.0,
+    **scraper_options
+) -> Dict[str, Any]:
+    """
+    Mide un perfil de lanzamiento con un scraper nuevo
+
+    Args:
+        profile: Perfil de lanzamiento a medir
+        city, lang: Consulta repetida en cada medición
+        lookups: Consultas de régimen estable tras la primera
+        settle: Segundos de espera antes de medir la memoria estable
+        **scraper_options: Otras opciones de WeatherScraper (p. ej. archive_dir/archive_mode
+            para medir sin red)
+
+    Returns:
+        Dict con 'profile', 'launch_seconds', 'first_lookup_seconds', 'lookup_p50',
+        'lookup_p95', 'rss_after_launch_mb', 'rss_steady_mb', 'processes' y 'errors'
+    """
+    from .weather import WeatherScraper
+
+    validate_launch_profile(profile)
+    report: Dict[str, Any] = {'profile': profile, 'errors': 0}
+    latencies = []
+
+    def _rss_mb() -> Optional[float]:
+        rss = process_tree_rss()
+        return round(rss / 2 ** 20, 1) if rss is not None else None
+
+    async with WeatherScraper(launch_profile=profile, **scraper_options) as scraper:
+        warmup = await scraper.warmup([lang])
+        report['launch_seconds'] = warmup.get('browser', 0.0)
+        report['rss_after_launch_mb'] = _rss_mb()
+
+        started = time.monotonic()
+        await scraper.get_readings(city, lang)
+        report['first_lookup_seconds'] = time.monotonic() - started
+
+        for _ in range(lookups):
+            started = time.monotonic()
+            try:
+                await scraper.get_readings(city, lang)
+            except Exception as e:
+                report['errors'] += 1
+                logger.warning(f"Consulta fallida con el perfil '{profile}': {str(e)}")
+                continue
+            latencies.append(time.monotonic() - started)
+
+        await asyncio.sleep(settle)
+        report['rss_steady_mb'] = _rss_mb()
+        pids = descendant_pids()
+        report['processes'] = len(pids) if pids is not None else None
+
+    report['lookup_p50'] = percentile(latencies, 50)
+    report['lookup_p95'] = percentile(latencies, 95)
+    return report
+
+
+async def benchmark(profiles: Optional[List[str]] = None, **options) -> List[Dict[str, Any]]:
+    """Mide cada perfil por turno (nunca en paralelo, para no mezclar la memoria)"""
+    profiles = profiles or list(LAUNCH_PROFILES)
+    for profile in profiles:
+        validate_launch_profile(profile)
+    return [await benchmark_profile(profile, **options) for profile in profiles]
+
+
+def _format_report(report: Dict[str, Any]) -> str:
+    def _value(key: str, fmt: str) -> str:
+        value = report.get(key)
+        return format(value, fmt) if value is not None else '-'
+
+    return (
+        f"{report['profile']:<15} lanzamiento {_value('launch_seconds', '.2f')}s  "
+        f"primera {_value('first_lookup_seconds', '.2f')}s  "
+        f"p50 {_value('lookup_p50', '.2f')}s  p95 {_value('lookup_p95', '.2f')}s  "
+        f"RSS {_value('rss_after_launch_mb', '.0f')} -> {_value('rss_steady_mb', '.0f')} MB  "
+        f"procesos {_value('processes', 'd')}  errores {report['errors']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Perfiles de lanzamiento del navegador")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    bench = subparsers.add_parser('benchmark', help="Mide arranque, primera consulta y memoria de cada perfil")
+    bench.add_argument('--profiles', nargs='+', choices=list(LAUNCH_PROFILES), default=list(LAUNCH_PROFILES))
+    bench.add_argument('--city', default='Madrid')
+    bench.add_argument('--lang', default='en')
+    bench.add_argument('--lookups', type=int, default=10)
+    bench.add_argument('--settle', type=float, default=2.0)
+    bench.add_argument('--archive-dir', help="Reproducir páginas grabadas en vez de consultar Google")
+    bench.add_argument('--json', action='store_true', help="Un JSON por perfil en vez de una tabla")
+    args = parser.parse_args()
+
+    options = {'city': args.city, 'lang': args.lang, 'lookups': args.lookups, 'settle': args.settle}
+    if args.archive_dir:
+        options.update(archive_dir=args.archive_dir, archive_mode='replay')
+
+    reports = asyncio.run(benchmark(args.profiles, **options))
+    for report in reports:
+        print(json.dumps(report) if args.json else _format_report(report), flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+import json
+import logging
+import re
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Variantes conocidas del widget del clima, de la más reciente a la más antigua.
+# 'widget' se espera como una sola lista de selectores CSS (basta con que aparezca
+# cualquiera); el resto de los campos se prueban uno a uno, en orden.
+DEFAULT_SELECTORS = {
+    'widget': ['#wob_wc', '#wob_tm'],
+    'location': ['.BBwThe', '#wob_loc', '.wob_loc'],
+    'temperature': ['#wob_tm', '.wob_t.q8U8x'],
+    'condition': ['#wob_dc', '#wob_dcp span'],
+    'humidity': ['#wob_hm'],
+    'wind': ['#wob_ws', '#wob_tws'],
+}
+
+_STEP = re.compile(r'^([a-zA-Z][\w-]*)?((?:[#.][\w-]+)*)$')
+
+
+def selector_xpath(selector: str) -> Optional[str]:
+    """
+    XPath equivalente a un selector CSS simple, para la extracción offline con lxml
+
+    Admite pasos de descendiente con etiqueta, id y clases ('#wob_dcp span',
+    'span.wob_t.q8U8x'); devuelve None para cualquier otra sintaxis.
+    """
+    parts = []
+    for step in selector.split():
+        match = _STEP.match(step)
+        if not match or not (match.group(1) or match.group(2)):
+            return None
+        conditions = []
+        for token in re.findall(r'[#.][\w-]+', match.group(2)):
+            if token[0] == '#':
+                conditions.append(f"@id='{token[1:]}'")
+            else:
+                conditions.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {token[1:]} ')")
+        predicate = f"[{' and '.join(conditions)}]" if conditions else ''
+        parts.append(f"{match.group(1) or '*'}{predicate}")
+    return '//' + '//'.join(parts)
+
+
+class SelectorRegistry:
+    """
+    Cadenas de selectores por campo con la variante ganadora recordada por idioma.
+
+    Cada campo tiene una lista ordenada de selectores alternativos. Para cada
+    idioma se prueba primero la variante que funcionó la última vez, así que un
+    cambio de marcado cuesta una prueba extra (una consulta al DOM) en vez de un
+    timeout. Cada vez que gana otra variante, o ninguna, se registra un evento de
+    deriva; `on_drift` recibe cada evento. Las ganadoras se persisten en un archivo
+    JSON si se indica `path`.
+
+    Evento:
+        {'field': 'location', 'lang': 'es', 'previous': '.BBwThe',
+         'selector': '#wob_loc', 'time': 1700000000.0}
+
+    Ejemplo:
+        registry = SelectorRegistry(on_drift=lambda event: alert(event))
+        registry.register('location', '.new-location-class', position=0)
+        scraper = WeatherScraper(selectors=registry)
+    """
+
+    def __init__(
+        self,
+        chains: Optional[Dict[str, List[str]]] = None,
+        path: Optional[str] = None,
+        on_drift: Optional[Callable[[Dict[str, Any]], None]] = None,
+        max_events: int = 100
+    ):
+        self.chains: Dict[str, List[str]] = {field: list(selectors) for field, selectors in DEFAULT_SELECTORS.items()}
+        for field, selectors in (chains or {}).items():
+            if not selectors:
+                raise ValueError(f"La cadena de selectores de '{field}' está vacía")
+            self.chains[field] = list(selectors)
+        self.path = Path(path) if path else None
+        self.on_drift = on_drift
+        self.events: deque = deque(maxlen=max_events)
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self._winners: Dict[str, str] = {}
+        self._load()
+
+    @staticmethod
+    def _key(field: str, lang: str) -> str:
+        return f"{lang}:{field}"
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            self._winners = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.error(f"Error cargando selectores ganadores {self.path}: {str(e)}")
+            self._winners = {}
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Escritura atómica para no dejar el archivo a medias
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            tmp_path.write_text(json.dumps(self._winners, indent=2), encoding='utf-8')
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.error(f"Error guardando selectores ganadores {self.path}: {str(e)}")
+
+    def register(self, field: str, selector: str, position: Optional[int] = None) -> None:
+        """Agrega una variante a la cadena del campo (al final, o en `position`)"""
+        chain = self.chains.setdefault(field, [])
+        if selector in chain:
+            chain.remove(selector)
+        chain.insert(len(chain) if position is None else position, selector)
+
+    def preferred(self, field: str, lang: str) -> str:
+        """Variante que se prueba primero para el idioma"""
+        chain = self.chains[field]
+        winner = self._winners.get(self._key(field, lang))
+        return winner if winner in chain else chain[0]
+
+    def candidates(self, field: str, lang: str) -> List[str]:
+        """Cadena del campo con la última ganadora del idioma al frente"""
+        first = self.preferred(field, lang)
+        return [first] + [selector for selector in self.chains[field] if selector != first]
+
+    def combined(self, field: str, lang: str) -> str:
+        """Lista de selectores CSS que coincide con cualquier variante del campo"""
+        return ', '.join(self.candidates(field, lang))
+
+    def record(self, field: str, lang: str, selector: Optional[str]) -> None:
+        """
+        Registra la variante que encontró el campo (None si no funcionó ninguna)
+
+        Si difiere de la preferida para el idioma, se emite un evento de deriva y,
+        si encontró el campo, pasa a ser la preferida.
+        """
+        previous = self.preferred(field, lang)
+        if selector == previous:
+            self.hits[(field, selector)] += 1
+            return
+        if selector is None:
+            self.misses[field] += 1
+        else:
+            self.hits[(field, selector)] += 1
+            self._winners[self._key(field, lang)] = selector
+            self._save()
+        event = {'field': field, 'lang': lang, 'previous': previous, 'selector': selector, 'time': time.time()}
+        self.events.append(event)
+        logger.warning(f"Deriva de marcado en '{field}' ({lang}): {previous} -> {selector or 'ninguna variante'}")
+        if self.on_drift:
+            try:
+                self.on_drift(event)
+            except Exception as e:
+                # Un callback roto nunca debe hacer fallar la consulta
+                logger.error(f"Error en on_drift: {str(e)}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'winners': dict(self._winners),
+            'hits': {f"{field} {selector}": count for (field, selector), count in self.hits.items()},
+            'misses': dict(self.misses),
+            'drift_events': len(self.events)
+        }
@@ -0,0 +1,114 @@
+from collections import defaultdict, deque
+from typing import Dict, Any, Optional, Tuple
+
+from .stats import percentile
+
+# Perfiles de navegación: cómo se espera a la página antes de buscar el widget.
+# - load: espera el evento 'load' completo (comportamiento original)
+# - domcontentloaded: espera solo el HTML parseado
+# - commit: continúa apenas llega la respuesta y espera el widget mientras el HTML se recibe
+# - stream: navega hasta 'load' en paralelo y continúa en cuanto el widget es visible
+NAVIGATION_PROFILES = {
+    'load': {'wait_until': 'load', 'stream': False},
+    'domcontentloaded': {'wait_until': 'domcontentloaded', 'stream': False},
+    'commit': {'wait_until': 'commit', 'stream': False},
+    'stream': {'wait_until': 'load', 'stream': True},
+}
+
+# Tiempos del navegador para la navegación actual (en segundos desde su inicio)
+NAVIGATION_TIMING_JS = """() => {
+    const entry = performance.getEntriesByType('navigation')[0];
+    if (!entry) return null;
+    return {
+        dom_content_loaded: entry.domContentLoadedEventEnd > 0 ? entry.domContentLoadedEventEnd / 1000 : null,
+        load: entry.loadEventEnd > 0 ? entry.loadEventEnd / 1000 : null
+    };
+}"""
+
+
+# Búsqueda sin navegación: fetch() desde una página ya abierta en el buscador (con sus
+# cookies) y extracción con DOMParser en la misma llamada. `chains` trae, por campo, los
+# selectores a probar en orden; se devuelve el selector ganador y el texto de cada campo.
+IN_PAGE_FETCH_JS = """async ({url, chains, timeoutMs, includeHtml}) => {
+    const controller = new AbortController();
+    const timer = timeoutMs ? setTimeout(() => controller.abort(), timeoutMs) : null;
+    try {
+        const response = await fetch(url, {credentials: 'include', signal: controller.signal});
+        const html = await response.text();
+        const doc = new DOMParser().parseFromString(html, 'text/html');
+        const fields = {};
+        for (const [field, selectors] of Object.entries(chains)) {
+            fields[field] = null;
+            for (const selector of selectors) {
+                const element = doc.querySelector(selector);
+                if (element) {
+                    fields[field] = [selector, element.textContent];
+                    break;
+                }
+            }
+        }
+        return {status: response.status, url: response.url, fields, html: includeHtml ? html : null};
+    } finally {
+        if (timer) clearTimeout(timer);
+    }
+}"""
+
+
+class NavigationStats:
+    """
+    Mediciones por (perfil, idioma): tiempo hasta el widget frente a tiempo hasta 'load'.
+
+    Guarda una ventana de las últimas `window` navegaciones de cada combinación.
+    Un `time_to_load` None significa que el widget ya estaba visible antes de que
+    la página terminara de cargar.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[Tuple[str, str], deque] = defaultdict(lambda: deque(maxlen=self.window))
+
+    def record(
+        self,
+        profile: str,
+        lang: str,
+        ok: bool,
+        time_to_widget: Optional[float] = None,
+        time_to_load: Optional[float] = None
+    ) -> None:
+        self._samples[(profile, lang)].append((ok, time_to_widget, time_to_load))
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Resumen por 'perfil:idioma' con tasa de éxito y percentiles en segundos"""
+        report = {}
+        for (profile, lang), samples in self._samples.items():
+            widget_times = [s[1] for s in samples if s[0] and s[1] is not None]
+            load_times = [s[2] for s in samples if s[0] and s[2] is not None]
+            successes = sum(1 for s in samples if s[0])
+            report[f"{profile}:{lang}"] = {
+                'count': len(samples),
+                'success_rate': successes / len(samples),
+                'widget_p50': percentile(widget_times, 50),
+                'widget_p95': percentile(widget_times, 95),
+                'load_p50': percentile(load_times, 50),
+                'widget_before_load': (successes - len(load_times)) / successes if successes else None
+            }
+        return report
+
+    def best_profile(self, lang: str, min_success_rate: float = 0.98, min_samples: int = 20) -> Optional[str]:
+        """
+        Perfil con menor p95 hasta el widget entre los que mantienen la tasa de
+        éxito mínima para el idioma, o None si todavía no hay datos suficientes.
+        """
+        best = None
+        best_p95 = None
+        for profile in NAVIGATION_PROFILES:
+            samples = self._samples.get((profile, lang))
+            if not samples or len(samples) < min_samples:
+                continue
+            successes = [s for s in samples if s[0]]
+            if len(successes) / len(samples) < min_success_rate:
+                continue
+            p95 = percentile([s[1] for s in successes if s[1] is not None], 95)
+            if p95 is not None and (best_p95 is None or p95 < best_p95):
+                best, best_p95 = profile, p95
+        return best
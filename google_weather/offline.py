@@ -0,0 +1,216 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Union
+
+from lxml import html as lxml_html
+
+from .markup import DEFAULT_SELECTORS, selector_xpath
+from .parsing import build_readings, normalize_text, resolve_units
+from .units import format_readings
+
+logger = logging.getLogger(__name__)
+
+# Las mismas cadenas de variantes que usa WeatherScraper, como XPath para lxml
+FIELD_XPATHS = {
+    field: [xpath for xpath in map(selector_xpath, DEFAULT_SELECTORS[field]) if xpath]
+    for field in ('location', 'temperature', 'condition', 'humidity', 'wind')
+}
+
+OUTPUT_FIELDS = [
+    'file', 'ok', 'error', 'lang', 'location', 'temperature_f', 'condition', 'humidity',
+    'wind_text', 'wind_value', 'wind_is_mph', 'temperature', 'wind'
+]
+
+
+def extract_html(content: Union[str, bytes], lang: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extrae las lecturas crudas de una página de resultados guardada, sin navegador
+
+    Args:
+        content: HTML de la página
+        lang: Idioma de la página; por defecto, el atributo lang de <html> o 'en'
+
+    Returns:
+        Las mismas lecturas que WeatherScraper.get_readings, más 'lang'
+    """
+    root = lxml_html.fromstring(content)
+    lang = lang or (root.get('lang') or 'en').split('-')[0]
+    texts = {}
+    for field, xpaths in FIELD_XPATHS.items():
+        texts[field] = None
+        for xpath in xpaths:
+            elements = root.xpath(xpath)
+            if elements:
+                texts[field] = normalize_text(elements[0].text_content())
+                break
+    readings = build_readings(texts, lang)
+    readings['lang'] = lang
+    return readings
+
+
+def _extract_file(path: str, lang: Optional[str], temp_unit: Optional[str], wind_unit: Optional[str]) -> Dict[str, Any]:
+    """Procesa un archivo en un proceso del pool; los errores se devuelven como datos"""
+    try:
+        readings = extract_html(Path(path).read_bytes(), lang)
+        units = resolve_units(readings['lang'], temp_unit, wind_unit)
+        formatted = format_readings(readings, *units)
+        return dict(readings, file=path, ok=True, error=None, temperature=formatted['temperature'], wind=formatted['wind'])
+    except Exception as e:
+        return {'file': path, 'ok': False, 'error': f"{type(e).__name__}: {str(e)}"}
+
+
+def iter_html_files(sources: Iterable[Union[str, Path]]) -> Iterator[str]:
+    """Recorre archivos y directorios (recursivamente) de forma perezosa"""
+    for source in sources:
+        source = Path(source)
+        if source.is_dir():
+            for root, _, files in os.walk(source):
+                for name in sorted(files):
+                    if name.endswith(('.html', '.htm')):
+                        yield str(Path(root) / name)
+        else:
+            yield str(source)
+
+
+class _Writer:
+    """Escribe los resultados en JSONL o CSV según la extensión del archivo"""
+
+    def __init__(self, output):
+        self._owns_file = isinstance(output, (str, Path))
+        self._file = open(output, 'w', encoding='utf-8', newline='') if self._owns_file else output
+        self._csv = None
+        if self._owns_file and str(output).endswith('.csv'):
+            self._csv = csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS, extrasaction='ignore')
+            self._csv.writeheader()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._csv:
+            self._csv.writerow(record)
+        else:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def close(self) -> None:
+        self._file.flush()
+        if self._owns_file:
+            self._file.close()
+
+
+def extract_archive(
+    sources: Union[str, Path, List[Union[str, Path]]],
+    output,
+    lang: Optional[str] = None,
+    temp_unit: Optional[str] = None,
+    wind_unit: Optional[str] = None,
+    workers: Optional[int] = None,
+    batch_size: int = 32,
+    progress_every: float = 5.0
+) -> Dict[str, Any]:
+    """
+    Re-extrae un archivo de páginas guardadas en paralelo con un pool de procesos
+
+    Los archivos se leen de forma perezosa y se envían por lotes: nunca hay más de
+    `workers * 4` lotes en vuelo, así que archivos enormes no se cargan en memoria.
+    El orden de salida sigue al de finalización, no al de entrada.
+
+    Args:
+        sources: Archivo(s) HTML o directorio(s), p. ej. 'debug_responses/'
+        output: Ruta .jsonl / .csv, o un stream de texto abierto (JSONL)
+        lang: Forzar el idioma; por defecto se toma del atributo lang de cada página
+        temp_unit, wind_unit: Unidades de los campos formateados (por defecto, las del idioma)
+        workers: Procesos del pool (por defecto, os.cpu_count())
+        batch_size: Archivos por tarea enviada al pool
+        progress_every: Segundos entre mensajes de progreso en el log
+
+    Returns:
+        Dict con 'files', 'ok', 'errors', 'seconds' y 'pages_per_second'
+    """
+    if isinstance(sources, (str, Path)):
+        sources = [sources]
+    workers = workers or os.cpu_count() or 1
+    files = iter_html_files(sources)
+    writer = _Writer(output)
+    report = {'files': 0, 'ok': 0, 'errors': 0}
+    started = last_progress = time.monotonic()
+
+    def _batches() -> Iterator[List[str]]:
+        batch = []
+        for path in files:
+            batch.append(path)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            batches = _batches()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < workers * 4:
+                    batch = next(batches, None)
+                    if batch is None:
+                        exhausted = True
+                        break
+                    pending.add(pool.submit(_extract_batch, batch, lang, temp_unit, wind_unit))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for record in future.result():
+                        writer.write(record)
+                        report['files'] += 1
+                        report['ok' if record['ok'] else 'errors'] += 1
+                now = time.monotonic()
+                if now - last_progress >= progress_every:
+                    last_progress = now
+                    logger.info(f"{report['files']} páginas ({report['files'] / (now - started):.1f} páginas/s)")
+    finally:
+        writer.close()
+
+    report['seconds'] = time.monotonic() - started
+    report['pages_per_second'] = report['files'] / report['seconds'] if report['seconds'] > 0 else 0.0
+    return report
+
+
+def _extract_batch(paths: List[str], lang: Optional[str], temp_unit: Optional[str], wind_unit: Optional[str]) -> List[Dict[str, Any]]:
+    return [_extract_file(path, lang, temp_unit, wind_unit) for path in paths]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-extrae el clima de páginas de resultados guardadas, sin navegador")
+    parser.add_argument('sources', nargs='+', help="Archivos HTML o directorios (p. ej. debug_responses/)")
+    parser.add_argument('-o', '--output', default='-', help="Archivo .jsonl o .csv ('-' para stdout)")
+    parser.add_argument('--lang', help="Idioma de las páginas (por defecto, el de cada página)")
+    parser.add_argument('--temp-unit', choices=['C', 'F', 'K'])
+    parser.add_argument('--wind-unit', choices=['kmh', 'mph'])
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+
+    report = extract_archive(
+        args.sources,
+        sys.stdout if args.output == '-' else args.output,
+        lang=args.lang,
+        temp_unit=args.temp_unit,
+        wind_unit=args.wind_unit,
+        workers=args.workers,
+        batch_size=args.batch_size
+    )
+    print(
+        f"{report['files']} páginas ({report['ok']} ok, {report['errors']} con error) "
+        f"en {report['seconds']:.1f}s: {report['pages_per_second']:.1f} páginas/s",
+        file=sys.stderr
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import re
+from typing import Dict, Any, Optional, Tuple
+
+from .lang import locale_configs, weather_conditions, unit_preferences
+from .units import convert_temperature, parse_wind, validate_temp_unit
+
+# Textos de prefijo comunes que Google antepone a la ubicación en diferentes idiomas
+LOCATION_PREFIXES = ['Resultados para ', 'Results for ', 'Résultats pour ', 'Ergebnisse für ']
+
+# Campos que toda lectura debe tener
+REQUIRED_FIELDS = ['temperature_f', 'condition', 'humidity', 'wind_text', 'location']
+
+
+def clean_location(text: str) -> str:
+    """Quita los prefijos de resultados y los espacios sobrantes del texto de ubicación"""
+    for prefix in LOCATION_PREFIXES:
+        if text.startswith(prefix):
+            text = text.replace(prefix, '').strip()
+    return text.strip()
+
+
+def map_condition(condition: str, lang: str) -> str:
+    """Normaliza la condición al texto del mapeo del idioma si la contiene"""
+    conditions_map = weather_conditions.get(lang, weather_conditions['en'])
+    for value in conditions_map.values():
+        if value.lower() in condition.lower():
+            return value
+    return condition
+
+
+def parse_temperature_f(temp_raw: str) -> float:
+    """Temperatura cruda (°F) validada contra un rango razonable"""
+    # La temperatura viene en Fahrenheit por defecto
+    temp_f = float(temp_raw)
+
+    # Validar rangos razonables (en Celsius)
+    temp_celsius = convert_temperature(temp_f, 'C')
+    if not (-50 <= temp_celsius <= 50):
+        raise ValueError(f"Temperatura fuera de rango razonable: {temp_celsius}°C")
+    return temp_f
+
+
+def build_readings(texts: Dict[str, Optional[str]], lang: str) -> Dict[str, Any]:
+    """
+    Arma las lecturas crudas a partir de los textos del widget
+
+    Args:
+        texts: 'location', 'temperature', 'condition', 'humidity' y 'wind';
+            None si el elemento no estaba en la página
+        lang: Idioma de la página, para mapear la condición
+
+    Raises:
+        ValueError: si faltan datos o la temperatura no es válida
+    """
+    data: Dict[str, Any] = {}
+    if texts.get('location') is not None:
+        data['location'] = clean_location(texts['location'])
+    if texts.get('temperature') is not None:
+        data['temperature_f'] = parse_temperature_f(texts['temperature'])
+    if texts.get('condition') is not None:
+        data['condition'] = map_condition(texts['condition'], lang)
+    if texts.get('humidity') is not None:
+        data['humidity'] = texts['humidity']
+    if texts.get('wind') is not None:
+        # La conversión de unidades se hace al formatear (ver units.format_readings)
+        data['wind_text'] = texts['wind']
+        data['wind_value'], data['wind_is_mph'] = parse_wind(texts['wind'])
+
+    missing = [k for k in REQUIRED_FIELDS if k not in data]
+    if missing:
+        raise ValueError(f"Faltan datos del clima: {', '.join(missing)}")
+    return data
+
+
+def resolve_units(lang: str, temp_unit: Optional[str], wind_unit: Optional[str]) -> Tuple[str, str]:
+    """Completa las unidades no indicadas según la configuración regional del idioma"""
+    # Obtener configuración regional
+    lang_config = locale_configs.get(lang, locale_configs['en'])
+    locale = lang_config['locale']
+
+    # Determinar unidades basadas en la configuración regional si no se especifican
+    if temp_unit is None or wind_unit is None:
+        unit_prefs = unit_preferences.get(locale, unit_preferences['default'])
+        temp_unit = temp_unit or unit_prefs['temp']
+        wind_unit = wind_unit or unit_prefs['wind']
+    validate_temp_unit(temp_unit)
+    return temp_unit, wind_unit
+
+
+def normalize_text(text: str) -> str:
+    """Colapsa espacios y saltos de línea (el HTML guardado suele venir indentado)"""
+    return re.sub(r'\s+', ' ', text).strip()
@@ -0,0 +1,242 @@
+import asyncio
+import cProfile
+import json
+import logging
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from .stats import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class Profiler:
+    """
+    Perfilado opcional del lado Python del scraper, pensado para producción.
+
+    - CPU muestreada: un hilo toma la pila del hilo del event loop cada
+      `sample_interval` segundos y la acumula en formato de pilas colapsadas
+      (compatible con flamegraph.pl / speedscope). Con `cprofile=True` se suma
+      un perfil determinista de cProfile que se guarda en formato pstats.
+    - Memoria: tracemalloc activo; cada consulta registra cuánta memoria
+      trazada sumó (aproximado con consultas concurrentes) y cada volcado guarda
+      un snapshot completo y las líneas que más crecieron desde el anterior.
+    - Lag del event loop: una tarea mide cuánto se atrasa un sleep de `lag_interval`.
+
+    Los volcados se hacen con dump(), cada `dump_interval` segundos, o al recibir
+    SIGUSR1 (`signal_dump=True`), sin reiniciar el proceso.
+
+    Ejemplo:
+        async with Profiler('profiles', dump_interval=300) as profiler:
+            scraper = WeatherScraper(profiler=profiler)
+            await scraper.get_weather_many(cities)
+    """
+
+    def __init__(
+        self,
+        output_dir: str = 'profiles',
+        sample_interval: float = 0.005,
+        cprofile: bool = False,
+        tracemalloc_frames: int = 10,
+        lag_interval: float = 0.1,
+        dump_interval: Optional[float] = None,
+        signal_dump: bool = False,
+        window: int = 1000
+    ):
+        self.output_dir = Path(output_dir)
+        self.sample_interval = sample_interval
+        self.cprofile = cprofile
+        self.tracemalloc_frames = tracemalloc_frames
+        self.lag_interval = lag_interval
+        self.dump_interval = dump_interval
+        self.signal_dump = signal_dump
+
+        self.stacks: Counter = Counter()
+        self.lag: deque = deque(maxlen=window)
+        self.lookups: deque = deque(maxlen=window)
+        self.running = False
+
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampling = threading.Event()
+        self._target_thread: Optional[int] = None
+        self._stacks_lock = threading.Lock()
+        self._tasks = []
+        self._owns_tracemalloc = False
+        self._last_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    async def start(self) -> 'Profiler':
+        """Empieza a perfilar el hilo del event loop actual; llamar varias veces no tiene efecto"""
+        if self.running:
+            return self
+        self.running = True
+        loop = asyncio.get_running_loop()
+        self._target_thread = threading.get_ident()
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.tracemalloc_frames)
+            self._owns_tracemalloc = True
+
+        if self.cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+        self._stop_sampling.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name='google-weather-profiler', daemon=True)
+        self._sampler.start()
+
+        self._tasks.append(loop.create_task(self._measure_lag()))
+        if self.dump_interval:
+            self._tasks.append(loop.create_task(self._dump_periodically()))
+        if self.signal_dump and hasattr(signal, 'SIGUSR1'):
+            loop.add_signal_handler(signal.SIGUSR1, self._dump_safely)
+        return self
+
+    async def stop(self) -> None:
+        """Detiene el perfilado; los datos acumulados siguen disponibles para dump()"""
+        if not self.running:
+            return
+        self.running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.signal_dump and hasattr(signal, 'SIGUSR1'):
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGUSR1)
+        self._stop_sampling.set()
+        self._sampler.join()
+        if self._profile:
+            self._profile.disable()
+        if self._owns_tracemalloc:
+            # Conservar un último snapshot antes de apagar tracemalloc
+            self._last_snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    async def __aenter__(self) -> 'Profiler':
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
+
+    def _sample_loop(self) -> None:
+        while not self._stop_sampling.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._target_thread)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            with self._stacks_lock:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    async def _measure_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.lag.append(max(0.0, loop.time() - expected))
+
+    async def _dump_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.dump_interval)
+            self._dump_safely()
+
+    def _dump_safely(self) -> None:
+        # Un volcado fallido (disco lleno, permisos) nunca debe afectar a las consultas
+        try:
+            self.dump()
+        except Exception as e:
+            logger.error(f"Error volcando el perfil: {str(e)}")
+
+    @contextmanager
+    def track_lookup(self, label: str):
+        """Mide duración y memoria trazada neta de una consulta"""
+        tracing = tracemalloc.is_tracing()
+        before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.lookups.append({
+                'label': label,
+                'duration': time.monotonic() - started,
+                'allocated': (tracemalloc.get_traced_memory()[0] - before) if tracing else None
+            })
+
+    def collapsed_stacks(self) -> str:
+        """Pilas muestreadas en formato colapsado ('a;b;c N' por línea)"""
+        with self._stacks_lock:
+            return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def dump(self, output_dir: Optional[str] = None) -> Dict[str, Path]:
+        """
+        Escribe los perfiles acumulados y empieza una ventana nueva
+
+        Returns:
+            Dict tipo -> archivo ('collapsed', 'pstats', 'tracemalloc', 'allocations', 'summary')
+        """
+        directory = Path(output_dir) if output_dir else self.output_dir
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S') + f"-{int(time.time() * 1000) % 1000:03d}"
+        files: Dict[str, Path] = {}
+
+        files['collapsed'] = directory / f"cpu-{stamp}.collapsed"
+        files['collapsed'].write_text(self.collapsed_stacks(), encoding='utf-8')
+
+        if self._profile:
+            files['pstats'] = directory / f"cpu-{stamp}.pstats"
+            self._profile.disable()
+            pstats.Stats(self._profile).dump_stats(str(files['pstats']))
+            self._profile = cProfile.Profile()
+            if self.running:
+                self._profile.enable()
+
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else self._last_snapshot
+        if snapshot is not None:
+            files['tracemalloc'] = directory / f"alloc-{stamp}.tracemalloc"
+            snapshot.dump(str(files['tracemalloc']))
+            # Líneas que más crecieron desde el volcado anterior (o en total, la primera vez)
+            if self._last_snapshot is not None and self._last_snapshot is not snapshot:
+                top = snapshot.compare_to(self._last_snapshot, 'lineno')[:25]
+            else:
+                top = snapshot.statistics('lineno')[:25]
+            files['allocations'] = directory / f"alloc-{stamp}.txt"
+            files['allocations'].write_text(''.join(f"{stat}\n" for stat in top), encoding='utf-8')
+            self._last_snapshot = snapshot
+
+        files['summary'] = directory / f"summary-{stamp}.json"
+        files['summary'].write_text(json.dumps(self.summary(), indent=2), encoding='utf-8')
+
+        with self._stacks_lock:
+            self.stacks.clear()
+        logger.info(f"Perfil volcado en {directory} ({stamp})")
+        return files
+
+    def summary(self) -> Dict[str, Any]:
+        """Lag del event loop, consultas medidas y pilas más frecuentes de la ventana actual"""
+        allocated = [l['allocated'] for l in self.lookups if l['allocated'] is not None]
+        with self._stacks_lock:
+            samples = sum(self.stacks.values())
+            top_stacks = self.stacks.most_common(10)
+        return {
+            'samples': samples,
+            'top_stacks': [{'stack': stack, 'samples': count} for stack, count in top_stacks],
+            'loop_lag_p50': percentile(self.lag, 50),
+            'loop_lag_p95': percentile(self.lag, 95),
+            'loop_lag_max': max(self.lag) if self.lag else None,
+            'lookups': len(self.lookups),
+            'lookup_p95': percentile([l['duration'] for l in self.lookups], 95),
+            'allocated_per_lookup': sum(allocated) / len(allocated) if allocated else None
+        }
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Dict, Any, Optional, Union
+from urllib.parse import urlparse
+
+from .cache import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+
+class RedisError(Exception):
+    """Respuesta de error del servidor (-ERR ...)"""
+
+
+def _encode_command(*args: Union[str, bytes, int, float]) -> bytes:
+    """Serializa un comando como array RESP de bulk strings"""
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+        parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+    return b''.join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader):
+    """Lee una respuesta RESP completa"""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionResetError("Conexión cerrada por el servidor")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b'+':
+        return payload.decode('utf-8')
+    if kind == b'-':
+        raise RedisError(payload.decode('utf-8'))
+    if kind == b':':
+        return int(payload)
+    if kind == b'$':
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b'*':
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise RedisError(f"Respuesta RESP inválida: {line!r}")
+
+
+class RedisBackend(CacheBackend):
+    """
+    Backend compartido sobre el protocolo de Redis (RESP), sin dependencias extra.
+
+    Varios nodos apuntando al mismo servidor comparten las lecturas, de modo que
+    cada ciudad se consulta una vez por TTL en toda la flota. Los candados de
+    single-flight usan SET NX PX con un token aleatorio.
+
+    Ejemplo:
+        backend = RedisBackend('redis://cache.internal:6379/2', ttl=600)
+        scraper = WeatherScraper(cache_backend=backend, single_flight=True)
+    """
+
+    def __init__(
+        self,
+        url: str = 'redis://127.0.0.1:6379/0',
+        ttl: float = 600,
+        lock_ttl: float = 30,
+        prefix: str = 'google_weather:',
+        connect_timeout: float = 5
+    ):
+        super().__init__(ttl, lock_ttl)
+        parsed = urlparse(url)
+        if parsed.scheme != 'redis':
+            raise ValueError(f"URL de Redis no soportada: {url}")
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.password = parsed.password
+        self.prefix = prefix
+        self.connect_timeout = connect_timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port),
+            timeout=self.connect_timeout
+        )
+        if self.password:
+            await self._send('AUTH', self.password)
+        if self.db:
+            await self._send('SELECT', self.db)
+
+    async def _send(self, *args) -> Any:
+        self._writer.write(_encode_command(*args))
+        await self._writer.drain()
+        return await _read_reply(self._reader)
+
+    async def execute(self, *args) -> Any:
+        """Ejecuta un comando, reconectando una vez si la conexión se cayó"""
+        # Una sola conexión: los comandos se serializan para no mezclar respuestas
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._writer is None:
+                        await self._connect()
+                    return await self._send(*args)
+                except (OSError, asyncio.IncompleteReadError) as e:
+                    await self._disconnect()
+                    if attempt:
+                        raise
+                    logger.warning(f"Reconectando a Redis {self.host}:{self.port}: {str(e)}")
+                except BaseException:
+                    # Cancelado (p. ej. por un timeout) o respuesta inválida con el comando ya enviado:
+                    # lo que quede de su respuesta lo leería el próximo comando. Se descarta la conexión.
+                    await self._disconnect()
+                    raise
+
+    async def _disconnect(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        data = await self.execute('GET', self._key(key))
+        return json.loads(data) if data is not None else None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        data = json.dumps(value, ensure_ascii=False)
+        await self.execute('SET', self._key(key), data, 'PX', max(1, int(self.ttl * 1000)))
+
+    async def delete(self, key: str) -> None:
+        await self.execute('DEL', self._key(key))
+
+    async def acquire_lock(self, key: str) -> Optional[str]:
+        token = uuid.uuid4().hex
+        reply = await self.execute('SET', self._key(f"lock:{key}"), token, 'NX', 'PX', max(1, int(self.lock_ttl * 1000)))
+        return token if reply == 'OK' else None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        # GET + DEL en lugar de un script: si el candado expiró entre ambos y otro
+        # nodo lo tomó, ese nodo solo pierde la exclusividad, no el resultado
+        lock_key = self._key(f"lock:{key}")
+        current = await self.execute('GET', lock_key)
+        if current is not None and current.decode('utf-8') == token:
+            await self.execute('DEL', lock_key)
+
+    async def ping(self) -> bool:
+        return await self.execute('PING') == 'PONG'
+
+    async def close(self) -> None:
+        await self._disconnect()
@@ -0,0 +1,63 @@
+import hashlib
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit, parse_qs
+
+logger = logging.getLogger(__name__)
+
+
+class PageArchive:
+    """
+    Archivo en disco de páginas de resultados, indexadas por su clave de consulta.
+
+    Cada navegación grabada se guarda como `<clave>.html` y se registra en
+    `index.json` junto con la URL original, de modo que el modo replay de
+    WeatherScraper pueda servirla sin tocar Google.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._index_path = self.directory / 'index.json'
+        self._index: Dict[str, Dict[str, Any]] = {}
+        if self._index_path.exists():
+            self._index = json.loads(self._index_path.read_text(encoding='utf-8'))
+
+    @staticmethod
+    def query_key(url: str) -> str:
+        """
+        Clave estable de una búsqueda a partir de sus parámetros `q` y `hl`.
+
+        Se decodifican los parámetros para que la URL construida por el scraper y
+        la que ve el navegador (ya codificada) produzcan la misma clave.
+        """
+        params = parse_qs(urlsplit(url).query)
+        query = params.get('q', [''])[0]
+        lang = params.get('hl', [''])[0]
+        return hashlib.sha1(f"{lang}|{query}".encode('utf-8')).hexdigest()[:20]
+
+    def save(self, url: str, html: str) -> Path:
+        """Guarda el HTML de una navegación y actualiza el índice"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        key = self.query_key(url)
+        path = self.directory / f"{key}.html"
+        path.write_text(html, encoding='utf-8')
+        self._index[key] = {'url': url, 'recorded_at': datetime.now().isoformat()}
+        self._index_path.write_text(json.dumps(self._index, ensure_ascii=False, indent=2), encoding='utf-8')
+        logger.debug(f"Página grabada en {path}")
+        return path
+
+    def load(self, url: str) -> Optional[str]:
+        """Devuelve el HTML grabado para la URL, o None si no existe"""
+        path = self.directory / f"{self.query_key(url)}.html"
+        if not path.exists():
+            return None
+        return path.read_text(encoding='utf-8')
+
+    def __contains__(self, url: str) -> bool:
+        return (self.directory / f"{self.query_key(url)}.html").exists()
+
+    def __len__(self) -> int:
+        return len(self._index)
@@ -0,0 +1,267 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Dict, Any, Optional, Tuple
+
+from .concurrency import AdaptiveLimiter
+from .errors import WeatherTimeoutError, BlockedError
+from .stats import percentile
+
+logger = logging.getLogger(__name__)
+
+# Clases de prioridad, de mayor a menor. Una clase solo recibe páginas cuando
+# las anteriores no tienen consultas en cola.
+PRIORITY_CLASSES = ('interactive', 'normal', 'bulk')
+
+
+class QueueFullError(Exception):
+    """La consulta fue rechazada por control de admisión (cola llena)"""
+
+
+class _Flow:
+    """Flujo de consultas de un (tenant, idioma) dentro de una clase de prioridad"""
+
+    def __init__(self, weight: float):
+        self.weight = weight
+        self.last_finish = 0.0
+
+
+class _Request:
+    def __init__(self, kwargs: Dict[str, Any], priority: str, timeout: Optional[float]):
+        self.kwargs = kwargs
+        self.priority = priority
+        self.timeout = timeout
+        self.enqueued_at = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.task: Optional[asyncio.Task] = None
+        # Entrada del heap de su clase mientras espera, y el timer que la vence en la cola
+        self.entry: Optional[Tuple[float, int, '_Request']] = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class FairScheduler:
+    """
+    Planificador con prioridades y reparto justo delante de WeatherScraper.get_weather.
+
+    - Prioridad estricta entre clases ('interactive' > 'normal' > 'bulk').
+    - Dentro de cada clase, start-time fair queueing entre flujos (tenant, idioma),
+      con peso = peso del tenant × peso del idioma. Un refresco masivo en 'en'
+      no puede acaparar las páginas frente a otros flujos de la misma clase.
+    - Colas acotadas: si la cola total o la de una clase está llena, la consulta
+      se rechaza de inmediato con QueueFullError.
+
+    El tiempo en cola y el tiempo de scraping se miden por separado (ver stats()).
+    Con `limiter` (AdaptiveLimiter) la concurrencia se ajusta sola según la
+    latencia y la tasa de errores/bloqueos en lugar de usar `concurrency`.
+
+    Ejemplo:
+        scheduler = FairScheduler(scraper, concurrency=8)
+        result = await scheduler.get_weather('Madrid', lang='es', priority='interactive', tenant='web')
+    """
+
+    def __init__(
+        self,
+        scraper,
+        concurrency: int = 4,
+        max_queue: int = 1000,
+        max_queue_per_class: Optional[Dict[str, int]] = None,
+        tenant_weights: Optional[Dict[str, float]] = None,
+        lang_weights: Optional[Dict[str, float]] = None,
+        window: int = 1000,
+        limiter: Optional[AdaptiveLimiter] = None
+    ):
+        self.scraper = scraper
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_queue_per_class = max_queue_per_class or {}
+        self.tenant_weights = tenant_weights or {}
+        self.lang_weights = lang_weights or {}
+        self.limiter = limiter
+
+        self._queues: Dict[str, list] = {priority: [] for priority in PRIORITY_CLASSES}
+        self._flows: Dict[str, Dict[Tuple[str, str], _Flow]] = {priority: {} for priority in PRIORITY_CLASSES}
+        self._virtual_time: Dict[str, float] = {priority: 0.0 for priority in PRIORITY_CLASSES}
+        self._sequence = itertools.count()
+        self._active = 0
+        self._tasks = set()
+
+        # Métricas por clase de prioridad
+        self._queue_wait: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+        self._scrape_time: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+        self._rejected: Dict[str, int] = defaultdict(int)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _weight(self, tenant: str, lang: str) -> float:
+        return self.tenant_weights.get(tenant, 1.0) * self.lang_weights.get(lang, 1.0)
+
+    async def get_weather(
+        self,
+        city: str,
+        lang: str = 'en',
+        temp_unit: str = None,
+        wind_unit: str = None,
+        priority: str = 'normal',
+        tenant: str = 'default',
+        timeout: Optional[float] = None,
+        with_timing: bool = False
+    ):
+        """
+        Encola una consulta y espera su resultado
+
+        Args:
+            city, lang, temp_unit, wind_unit: Igual que WeatherScraper.get_weather
+            priority: Clase de prioridad ('interactive', 'normal', 'bulk')
+            tenant: Identificador del cliente para el reparto justo
+            timeout: Presupuesto total en segundos, incluido el tiempo en cola
+            with_timing: Devolver (resultado, {'queue_wait': s, 'scrape_time': s})
+
+        Raises:
+            QueueFullError: si la cola está llena (control de admisión)
+            WeatherTimeoutError: si el presupuesto se agota en la cola ('queue') o después
+        """
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Prioridad no soportada: {priority}")
+
+        class_limit = self.max_queue_per_class.get(priority)
+        if self.queued >= self.max_queue or (class_limit is not None and len(self._queues[priority]) >= class_limit):
+            self._rejected[priority] += 1
+            raise QueueFullError(f"Cola llena para prioridad '{priority}'")
+
+        request = _Request(
+            {'city': city, 'lang': lang, 'temp_unit': temp_unit, 'wind_unit': wind_unit},
+            priority,
+            timeout
+        )
+
+        # Etiquetas de start-time fair queueing
+        flows = self._flows[priority]
+        flow = flows.get((tenant, lang))
+        if flow is None:
+            flow = flows[(tenant, lang)] = _Flow(self._weight(tenant, lang))
+        start_tag = max(self._virtual_time[priority], flow.last_finish)
+        flow.last_finish = start_tag + 1.0 / flow.weight
+        request.entry = (start_tag, next(self._sequence), request)
+        heapq.heappush(self._queues[priority], request.entry)
+        if timeout is not None:
+            # El presupuesto también vence en la cola, sin esperar a que llegue su turno
+            request.timer = asyncio.get_running_loop().call_later(max(0.0, timeout), self._expire, request)
+
+        self._dispatch()
+        try:
+            result, timing = await request.future
+        except asyncio.CancelledError:
+            # Sacarla de la cola, o liberar la página si quien consultaba dejó de esperar
+            self._unqueue(request)
+            if request.task:
+                request.task.cancel()
+            raise
+        return (result, timing) if with_timing else result
+
+    def _unqueue(self, request: _Request) -> None:
+        """Quita la consulta de su cola (si sigue esperando) para que no ocupe lugar en la admisión"""
+        if request.timer:
+            request.timer.cancel()
+            request.timer = None
+        if request.entry is None:
+            return
+        queue = self._queues[request.priority]
+        try:
+            queue.remove(request.entry)
+        except ValueError:
+            pass
+        else:
+            heapq.heapify(queue)
+        request.entry = None
+
+    def _expire(self, request: _Request) -> None:
+        """Vence una consulta cuyo presupuesto se agotó antes de salir de la cola"""
+        request.timer = None
+        if request.entry is None or request.future.done():
+            return
+        self._unqueue(request)
+        self._queue_wait[request.priority].append(time.monotonic() - request.enqueued_at)
+        request.future.set_exception(WeatherTimeoutError('queue', request.timeout))
+
+    def _next_request(self) -> Optional[_Request]:
+        for priority in PRIORITY_CLASSES:
+            queue = self._queues[priority]
+            while queue:
+                start_tag, _, request = heapq.heappop(queue)
+                request.entry = None
+                if request.timer:
+                    request.timer.cancel()
+                    request.timer = None
+                # Por si acaso: una consulta ya resuelta nunca se despacha
+                if request.future.done():
+                    continue
+                self._virtual_time[priority] = start_tag
+                return request
+        return None
+
+    def _dispatch(self) -> None:
+        while self._active < (self.limiter.limit if self.limiter else self.concurrency):
+            request = self._next_request()
+            if request is None:
+                return
+            self._active += 1
+            if self.limiter:
+                self.limiter.observe_in_flight(self._active)
+            task = request.task = asyncio.ensure_future(self._run(request))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, request: _Request) -> None:
+        started = time.monotonic()
+        queue_wait = started - request.enqueued_at
+        self._queue_wait[request.priority].append(queue_wait)
+        try:
+            remaining = None
+            if request.timeout is not None:
+                remaining = request.timeout - queue_wait
+                if remaining <= 0:
+                    raise WeatherTimeoutError('queue', request.timeout)
+            try:
+                result = await self.scraper.get_weather(timeout=remaining, **request.kwargs)
+            except BlockedError:
+                if self.limiter:
+                    self.limiter.record(time.monotonic() - started, ok=False, blocked=True)
+                raise
+            except Exception:
+                if self.limiter:
+                    self.limiter.record(time.monotonic() - started, ok=False)
+                raise
+            scrape_time = time.monotonic() - started
+            if self.limiter:
+                self.limiter.record(scrape_time, ok=True)
+            self._scrape_time[request.priority].append(scrape_time)
+            if not request.future.done():
+                request.future.set_result((result, {'queue_wait': queue_wait, 'scrape_time': scrape_time}))
+        except Exception as e:
+            if not request.future.done():
+                request.future.set_exception(e)
+        finally:
+            self._active -= 1
+            self._dispatch()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Métricas por clase: en cola, rechazadas y percentiles de espera y scraping (segundos)"""
+        report = {}
+        for priority in PRIORITY_CLASSES:
+            waits = self._queue_wait[priority]
+            scrapes = self._scrape_time[priority]
+            report[priority] = {
+                'queued': len(self._queues[priority]),
+                'rejected': self._rejected[priority],
+                'completed': len(scrapes),
+                'queue_wait_p50': percentile(waits, 50),
+                'queue_wait_p95': percentile(waits, 95),
+                'scrape_time_p50': percentile(scrapes, 50),
+                'scrape_time_p95': percentile(scrapes, 95)
+            }
+        return report
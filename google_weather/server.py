@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import json
+import logging
+import shutil
+import subprocess
+import tempfile
+import time
+import urllib.request
+from typing import Optional
+
+from playwright.async_api import async_playwright
+
+from .launch import LAUNCH_PROFILES, chromium_args
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserServer:
+    """Proceso de Chromium con el puerto de depuración remota (CDP) abierto"""
+
+    def __init__(self, process: subprocess.Popen, port: int, user_data_dir: str):
+        self.process = process
+        self.port = port
+        self.user_data_dir = user_data_dir
+
+    @property
+    def endpoint(self) -> str:
+        """Endpoint para WeatherScraper(browser_endpoint=..., endpoint_type='cdp')"""
+        return f"http://127.0.0.1:{self.port}"
+
+    def close(self, timeout: float = 10) -> None:
+        """Detiene el navegador y elimina su perfil temporal"""
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+def _cdp_ready(port: int) -> bool:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=1) as response:
+            return 'webSocketDebuggerUrl' in json.loads(response.read())
+    except (OSError, ValueError):
+        return False
+
+
+async def launch_browser_server(
+    port: int = 9222,
+    headless: bool = True,
+    executable_path: Optional[str] = None,
+    startup_timeout: float = 30,
+    profile: str = 'default'
+) -> BrowserServer:
+    """
+    Lanza un Chromium local que varios WeatherScraper (incluso de otros procesos)
+    pueden compartir a través de CDP.
+
+    Args:
+        port: Puerto de depuración remota
+        headless: Ejecutar sin interfaz gráfica
+        executable_path: Ruta a Chromium (por defecto, el instalado por Playwright)
+        startup_timeout: Segundos máximos de espera hasta que CDP responda
+        profile: Perfil de lanzamiento cuyos flags se aplican (el canal del perfil
+            no cambia el ejecutable; para eso, indicar `executable_path`)
+
+    Returns:
+        BrowserServer con el endpoint a usar en `browser_endpoint`
+    """
+    profile_args = chromium_args(profile)
+    headless = headless or LAUNCH_PROFILES[profile]['force_headless']
+    if executable_path is None:
+        playwright = await async_playwright().start()
+        try:
+            executable_path = playwright.chromium.executable_path
+        finally:
+            await playwright.stop()
+
+    user_data_dir = tempfile.mkdtemp(prefix='google_weather_browser_')
+    args = [
+        executable_path,
+        f'--remote-debugging-port={port}',
+        f'--user-data-dir={user_data_dir}',
+        '--no-first-run',
+        '--no-default-browser-check',
+        *profile_args
+    ]
+    if headless:
+        args.append('--headless=new')
+
+    process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    server = BrowserServer(process, port, user_data_dir)
+
+    started = time.monotonic()
+    while not await asyncio.to_thread(_cdp_ready, port):
+        if process.poll() is not None:
+            server.close()
+            raise Exception(f"El navegador terminó al iniciar (código {process.returncode})")
+        if time.monotonic() - started > startup_timeout:
+            server.close()
+            raise TimeoutError(f"El navegador no respondió en el puerto {port} tras {startup_timeout}s")
+        await asyncio.sleep(0.1)
+
+    logger.info(f"Navegador compartido listo en {server.endpoint} ({time.monotonic() - started:.2f}s)")
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lanza un navegador compartido para WeatherScraper")
+    parser.add_argument('--port', type=int, default=9222)
+    parser.add_argument('--headed', action='store_true', help="Mostrar la ventana del navegador")
+    parser.add_argument('--profile', choices=list(LAUNCH_PROFILES), default='default', help="Perfil de lanzamiento")
+    args = parser.parse_args()
+
+    async def _run() -> None:
+        server = await launch_browser_server(port=args.port, headless=not args.headed, profile=args.profile)
+        print(f"Endpoint CDP: {server.endpoint}", flush=True)
+        try:
+            while server.process.poll() is None:
+                await asyncio.sleep(1)
+        finally:
+            server.close()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,471 @@
+import argparse
+import asyncio
+import html
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+import zlib
+from typing import Dict, Any, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .lang import lang_queries
+from .launch import LAUNCH_PROFILES, descendant_pids, process_tree_rss
+from .stats import percentile
+from .watch import JsonlSink
+
+logger = logging.getLogger(__name__)
+
+# Página de resultados mínima con los mismos elementos del widget que lee WeatherScraper
+RESULTS_PAGE = """<!DOCTYPE html>
+<html lang="{lang}"><head><meta charset="utf-8"><title>{query} - Mock Search</title></head>
+<body>
+<div id="wob_wc">
+  <div class="BBwThe">Results for {location}</div>
+  <span id="wob_tm">{temperature}</span>
+  <div id="wob_dc">{condition}</div>
+  <span id="wob_hm">{humidity}%</span>
+  <span id="wob_ws">{wind} mph</span>
+</div>
+<div class="padding">{padding}</div>
+</body></html>"""
+
+HOME_PAGE = '<!DOCTYPE html><html lang="{lang}"><head><title>Mock Search</title></head><body><form action="/search"></form></body></html>'
+
+CONDITIONS = ['Sunny', 'Cloudy', 'Rain', 'Partly cloudy', 'Clear']
+
+
+class MockResultsServer:
+    """
+    Servidor HTTP local que imita la página de resultados de Google.
+
+    Responde `/search?q=...` con el widget del clima (valores deterministas por
+    consulta) y `/` con una portada vacía, con conexiones keep-alive como un
+    servidor real. `latency` y `jitter` agregan una demora por respuesta, y
+    `padding_kb` infla la página para acercar su tamaño al de una búsqueda real.
+
+    Ejemplo:
+        async with MockResultsServer() as server:
+            scraper = WeatherScraper(base_url=server.url)
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        padding_kb: int = 0
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.padding_kb = padding_kb
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> 'MockResultsServer':
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> 'MockResultsServer':
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def render(self, path: str) -> Optional[str]:
+        """HTML de la ruta pedida, o None si no existe"""
+        parts = urlsplit(path)
+        params = parse_qs(parts.query)
+        lang = params.get('hl', ['en'])[0]
+        if parts.path == '/':
+            return HOME_PAGE.format(lang=html.escape(lang))
+        if parts.path != '/search':
+            return None
+        query = params.get('q', [''])[0]
+        # La ubicación es la ciudad de la consulta, sin el texto de la plantilla del idioma
+        template = re.escape(lang_queries.get(lang, lang_queries['en']).replace('+', ' ')).replace(r'\{city\}', '(.+)')
+        match = re.fullmatch(template, query)
+        seed = zlib.crc32(query.encode('utf-8'))
+        return RESULTS_PAGE.format(
+            lang=html.escape(lang),
+            query=html.escape(query),
+            location=html.escape(match.group(1) if match else query),
+            temperature=40 + seed % 50,
+            condition=CONDITIONS[seed % len(CONDITIONS)],
+            humidity=20 + seed % 70,
+            wind=seed % 25,
+            padding='x' * (self.padding_kb * 1024)
+        )
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                try:
+                    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    break
+                self.requests += 1
+                delay = self.latency + random.uniform(0, self.jitter)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                page = self.render(path) if method in ('GET', 'HEAD') else None
+                status = '200 OK' if page is not None else '404 Not Found'
+                body = (page or '<html><body></body></html>').encode('utf-8')
+                headers = (
+                    f"HTTP/1.1 {status}\r\n"
+                    "Content-Type: text/html; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: keep-alive\r\n\r\n"
+                )
+                writer.write(headers.encode('latin-1') + (body if method != 'HEAD' else b''))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def open_fds(pid: Optional[int] = None) -> Optional[int]:
+    """Descriptores abiertos por el proceso y todos sus descendientes (None fuera de Linux)"""
+    pids = descendant_pids(pid)
+    if pids is None:
+        return None
+    total = 0
+    for current in [pid or os.getpid(), *pids]:
+        try:
+            total += len(os.listdir(f'/proc/{current}/fd'))
+        except OSError:
+            continue
+    return total
+
+
+class SoakThresholds:
+    """
+    Crecimiento máximo tolerado entre la muestra de referencia y la final.
+
+    La referencia se toma tras el período de calentamiento, cuando el navegador,
+    los contextos y los caches ya tienen su tamaño estable.
+    """
+
+    def __init__(
+        self,
+        max_rss_growth: float = 0.5,
+        max_fd_growth: int = 50,
+        max_child_growth: int = 0,
+        max_leaked_pages: int = 0,
+        max_latency_drift: float = 1.0,
+        max_error_rate: float = 0.01
+    ):
+        self.max_rss_growth = max_rss_growth
+        self.max_fd_growth = max_fd_growth
+        self.max_child_growth = max_child_growth
+        self.max_leaked_pages = max_leaked_pages
+        self.max_latency_drift = max_latency_drift
+        self.max_error_rate = max_error_rate
+
+
+class SoakRun:
+    """
+    Consulta a ritmo fijo durante `duration` segundos y muestrea los recursos.
+
+    Las consultas se lanzan en un ciclo abierto (una cada 1/rate segundos, sin
+    esperar a la anterior), como el tráfico real; si ya hay `max_concurrency` en
+    curso, el turno se cuenta en 'skipped' en vez de acumular trabajo. Cada
+    `sample_interval` segundos se registra una muestra con RSS, descriptores,
+    procesos hijos, contextos, páginas y la latencia de la ventana.
+
+    Muestra:
+        {'elapsed': 60.0, 'rss_mb': 412.3, 'fds': 210, 'child_processes': 9,
+         'contexts': 1, 'pages': 3, 'warm_pages': 0, 'fetch_pages': 0, 'inflight': 2, 'lookups': 120,
+         'errors': 0, 'skipped': 0, 'p50': 0.31, 'p95': 0.52}
+    """
+
+    def __init__(
+        self,
+        scraper,
+        cities: List[str],
+        duration: float = 3600,
+        rate: float = 2.0,
+        lang: str = 'en',
+        sample_interval: float = 30,
+        warmup: float = 60,
+        max_concurrency: int = 8,
+        timeout: Optional[float] = 30,
+        thresholds: Optional[SoakThresholds] = None,
+        sink: Optional[JsonlSink] = None
+    ):
+        if not cities:
+            raise ValueError("Se necesita al menos una ciudad")
+        if rate <= 0:
+            raise ValueError("rate debe ser positivo")
+        self.scraper = scraper
+        self.cities = cities
+        self.duration = duration
+        self.rate = rate
+        self.lang = lang
+        self.sample_interval = sample_interval
+        self.warmup = warmup
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.thresholds = thresholds or SoakThresholds()
+        self.sink = sink
+
+        self.samples: List[Dict[str, Any]] = []
+        self.lookups = 0
+        self.errors = 0
+        self.skipped = 0
+        self._window: List[float] = []
+        self._tasks = set()
+        self._started = 0.0
+
+    async def _lookup(self, city: str) -> None:
+        started = time.monotonic()
+        try:
+            await self.scraper.get_readings(city, self.lang, timeout=self.timeout)
+        except Exception as e:
+            self.errors += 1
+            logger.debug(f"Consulta fallida durante la prueba de resistencia ({city}): {str(e)}")
+            return
+        finally:
+            self.lookups += 1
+        self._window.append(time.monotonic() - started)
+
+    def sample(self) -> Dict[str, Any]:
+        """Registra una muestra de recursos y la latencia desde la muestra anterior"""
+        resources = self.scraper.resources()
+        rss = process_tree_rss(include_self=True)
+        window, self._window = self._window, []
+        sample = {
+            'elapsed': round(time.monotonic() - self._started, 3),
+            'rss_mb': round(rss / 2 ** 20, 1) if rss is not None else None,
+            'fds': open_fds(),
+            'child_processes': resources.get('child_processes'),
+            'contexts': resources.get('contexts'),
+            'pages': resources.get('pages'),
+            'warm_pages': resources.get('warm_pages', 0),
+            'fetch_pages': resources.get('fetch_pages', 0),
+            'inflight': resources.get('inflight'),
+            'lookups': self.lookups,
+            'errors': self.errors,
+            'skipped': self.skipped,
+            'p50': percentile(window, 50),
+            'p95': percentile(window, 95)
+        }
+        self.samples.append(sample)
+        if self.sink:
+            self.sink.write(sample)
+        p50 = f"{sample['p50']:.3f}s" if sample['p50'] is not None else '-'
+        logger.info(
+            f"[{sample['elapsed']:.0f}s] RSS {sample['rss_mb']} MB, {sample['fds']} fds, "
+            f"{sample['child_processes']} procesos, {sample['pages']} páginas, "
+            f"p50 {p50}, {self.errors}/{self.lookups} errores"
+        )
+        return sample
+
+    async def run(self) -> Dict[str, Any]:
+        """Ejecuta la prueba completa y devuelve el informe (ver `evaluate`)"""
+        self._started = time.monotonic()
+        end = self._started + self.duration
+        next_sample = self._started + self.sample_interval
+        tick = 0
+        while True:
+            now = time.monotonic()
+            if now >= end:
+                break
+            if now >= next_sample:
+                self.sample()
+                next_sample += self.sample_interval
+            due = self._started + tick / self.rate
+            if now < due:
+                await asyncio.sleep(min(due, next_sample, end) - now)
+                continue
+            if len(self._tasks) >= self.max_concurrency:
+                self.skipped += 1
+            else:
+                task = asyncio.ensure_future(self._lookup(self.cities[tick % len(self.cities)]))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            tick += 1
+
+        # Se drenan las consultas en curso para que la muestra final mida fugas, no trabajo pendiente
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.sample()
+        return self.evaluate()
+
+    def _baseline(self) -> Optional[Dict[str, Any]]:
+        for sample in self.samples:
+            if sample['elapsed'] >= self.warmup and sample['p50'] is not None:
+                return sample
+        return self.samples[0] if self.samples else None
+
+    def evaluate(self) -> Dict[str, Any]:
+        """
+        Compara la muestra de referencia con la final contra los umbrales
+
+        Returns:
+            Dict con 'ok', 'violations' (textos), 'growth', 'baseline', 'final',
+            'lookups', 'errors', 'skipped' y 'error_rate'
+        """
+        limits = self.thresholds
+        baseline = self._baseline()
+        final = self.samples[-1] if self.samples else None
+        violations = []
+        growth: Dict[str, Any] = {}
+
+        if baseline and final and baseline is not final:
+            if baseline['rss_mb'] and final['rss_mb'] is not None:
+                growth['rss'] = (final['rss_mb'] - baseline['rss_mb']) / baseline['rss_mb']
+                if growth['rss'] > limits.max_rss_growth:
+                    violations.append(f"RSS creció {growth['rss']:.0%} ({baseline['rss_mb']} -> {final['rss_mb']} MB)")
+            for key, limit, label in (
+                ('fds', limits.max_fd_growth, 'descriptores abiertos'),
+                ('child_processes', limits.max_child_growth, 'procesos hijos'),
+            ):
+                if baseline[key] is not None and final[key] is not None:
+                    growth[key] = final[key] - baseline[key]
+                    if growth[key] > limit:
+                        violations.append(f"{label}: {baseline[key]} -> {final[key]}")
+            # Latencia de la última ventana con consultas frente a la de referencia
+            last_p50 = next((s['p50'] for s in reversed(self.samples) if s['p50'] is not None), None)
+            if baseline['p50'] and last_p50 is not None:
+                growth['latency'] = last_p50 / baseline['p50'] - 1
+                if growth['latency'] > limits.max_latency_drift:
+                    violations.append(f"La latencia p50 derivó {growth['latency']:.0%} ({baseline['p50']:.3f}s -> {last_p50:.3f}s)")
+
+        if final and final['pages'] is not None:
+            # Sin consultas en curso, toda página abierta que no sea precalentada ni de fetch() es una fuga
+            leaked = final['pages'] - final['warm_pages'] - final['fetch_pages'] - (final['inflight'] or 0)
+            growth['leaked_pages'] = leaked
+            if leaked > limits.max_leaked_pages:
+                violations.append(f"{leaked} páginas abiertas sin consulta en curso")
+
+        error_rate = self.errors / self.lookups if self.lookups else 0.0
+        if error_rate > limits.max_error_rate:
+            violations.append(f"Tasa de error {error_rate:.1%} ({self.errors}/{self.lookups})")
+
+        return {
+            'ok': not violations,
+            'violations': violations,
+            'growth': growth,
+            'baseline': baseline,
+            'final': final,
+            'lookups': self.lookups,
+            'errors': self.errors,
+            'skipped': self.skipped,
+            'error_rate': error_rate
+        }
+
+
+async def soak(
+    cities: List[str],
+    duration: float = 3600,
+    rate: float = 2.0,
+    base_url: Optional[str] = None,
+    server_latency: float = 0.05,
+    output: Optional[str] = None,
+    scraper_options: Optional[Dict[str, Any]] = None,
+    **options
+) -> Dict[str, Any]:
+    """
+    Prueba de resistencia de WeatherScraper contra un servidor de resultados local
+
+    Args:
+        cities: Ciudades consultadas por turno
+        duration: Segundos de prueba
+        rate: Consultas por segundo
+        base_url: Servidor de resultados ya levantado; por defecto se inicia un MockResultsServer
+        server_latency: Demora por respuesta del servidor local
+        output: Archivo JSONL donde se escribe cada muestra
+        scraper_options: Opciones de WeatherScraper (p. ej. launch_profile)
+        **options: Opciones de SoakRun (sample_interval, warmup, thresholds, ...)
+    """
+    from .weather import WeatherScraper
+
+    server = None
+    sink = JsonlSink(output) if output else None
+    try:
+        if base_url is None:
+            server = await MockResultsServer(latency=server_latency, jitter=server_latency / 2).start()
+            base_url = server.url
+        async with WeatherScraper(base_url=base_url, **(scraper_options or {})) as scraper:
+            run = SoakRun(scraper, cities, duration=duration, rate=rate, sink=sink, **options)
+            return await run.run()
+    finally:
+        if server:
+            await server.close()
+        if sink:
+            sink.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prueba de resistencia contra un servidor de resultados local")
+    parser.add_argument('--cities', nargs='+', default=['Madrid', 'London', 'Buenos Aires', 'Tokyo'])
+    parser.add_argument('--lang', default='en')
+    parser.add_argument('--duration', type=float, default=3600, help="Segundos de prueba")
+    parser.add_argument('--rate', type=float, default=2.0, help="Consultas por segundo")
+    parser.add_argument('--sample-interval', type=float, default=30)
+    parser.add_argument('--warmup', type=float, default=60, help="Segundos antes de la muestra de referencia")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--base-url', help="Servidor de resultados externo en vez del local")
+    parser.add_argument('--server-latency', type=float, default=0.05)
+    parser.add_argument('--launch-profile', choices=list(LAUNCH_PROFILES), default='default')
+    parser.add_argument('--output', help="Archivo JSONL con las muestras")
+    parser.add_argument('--max-rss-growth', type=float, default=0.5, help="Fracción (0.5 = +50%%)")
+    parser.add_argument('--max-fd-growth', type=int, default=50)
+    parser.add_argument('--max-child-growth', type=int, default=0)
+    parser.add_argument('--max-latency-drift', type=float, default=1.0, help="Fracción sobre el p50 de referencia")
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    args = parser.parse_args()
+
+    thresholds = SoakThresholds(
+        max_rss_growth=args.max_rss_growth,
+        max_fd_growth=args.max_fd_growth,
+        max_child_growth=args.max_child_growth,
+        max_latency_drift=args.max_latency_drift,
+        max_error_rate=args.max_error_rate
+    )
+    report = asyncio.run(soak(
+        args.cities,
+        duration=args.duration,
+        rate=args.rate,
+        base_url=args.base_url,
+        server_latency=args.server_latency,
+        output=args.output,
+        scraper_options={'launch_profile': args.launch_profile},
+        lang=args.lang,
+        sample_interval=args.sample_interval,
+        warmup=args.warmup,
+        max_concurrency=args.concurrency,
+        thresholds=thresholds
+    ))
+    print(json.dumps({k: v for k, v in report.items() if k not in ('baseline', 'final')}, ensure_ascii=False), flush=True)
+    for violation in report['violations']:
+        print(f"FALLA: {violation}", file=sys.stderr)
+    sys.exit(0 if report['ok'] else 1)
+
+
+if __name__ == '__main__':
+    main()
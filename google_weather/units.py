@@ -0,0 +1,72 @@
+import re
+from typing import Dict, Any, Optional, Tuple
+
+# Factor de conversión de km/h a mph
+KMH_TO_MPH = 0.621371
+
+TEMP_UNITS = ('C', 'F', 'K')
+
+
+def validate_temp_unit(temp_unit: str) -> None:
+    if temp_unit not in TEMP_UNITS:
+        raise ValueError(f"Unidad de temperatura no soportada: {temp_unit}")
+
+
+def convert_temperature(temp_f, temp_unit: str):
+    """
+    Convierte una temperatura en Fahrenheit (como la entrega Google) a la unidad deseada.
+
+    Funciona igual con un float que con un array de NumPy, de modo que las
+    conversiones masivas se aplican de forma vectorizada.
+    """
+    validate_temp_unit(temp_unit)
+    if temp_unit == 'C':
+        return (temp_f - 32) * 5/9
+    if temp_unit == 'K':
+        return (temp_f - 32) * 5/9 + 273.15
+    return temp_f
+
+
+def convert_wind(value, source_is_mph, wind_unit: str):
+    """
+    Convierte velocidades de viento a 'kmh' o 'mph'.
+
+    `source_is_mph` indica la unidad original (bool, o array numérico de 0/1
+    para conversiones vectorizadas).
+    """
+    if wind_unit == 'mph':
+        return value * (source_is_mph + (1 - source_is_mph) * KMH_TO_MPH)
+    return value * ((1 - source_is_mph) + source_is_mph / KMH_TO_MPH)
+
+
+def parse_wind(wind_text: str) -> Tuple[Optional[float], bool]:
+    """Devuelve (valor, es_mph) del texto del viento; valor None si no es numérico"""
+    match = re.search(r'\d+(?:\.\d+)?', wind_text)
+    if not match:
+        return None, False
+    return float(match.group()), 'mph' in wind_text.lower()
+
+
+def parse_humidity(humidity_text: str) -> Optional[float]:
+    match = re.search(r'\d+(?:\.\d+)?', humidity_text)
+    return float(match.group()) if match else None
+
+
+def format_readings(readings: Dict[str, Any], temp_unit: str, wind_unit: str) -> Dict[str, Any]:
+    """Convierte las lecturas crudas de una consulta al resultado clásico de get_weather"""
+    temp = convert_temperature(readings['temperature_f'], temp_unit)
+
+    if readings['wind_value'] is None:
+        wind = readings['wind_text']
+    else:
+        wind_value = convert_wind(readings['wind_value'], readings['wind_is_mph'], wind_unit)
+        unit_text = 'mph' if wind_unit == 'mph' else 'km/h'
+        wind = f"{round(wind_value, 1)} {unit_text}"
+
+    return {
+        'location': readings['location'],
+        'temperature': f"{round(temp, 1)}°{temp_unit}",
+        'condition': readings['condition'],
+        'humidity': readings['humidity'],
+        'wind': wind
+    }
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, IO, List, Optional, Union
+
+from .concurrency import AdaptiveLimiter
+from .units import convert_temperature, convert_wind, parse_humidity, validate_temp_unit
+
+logger = logging.getLogger(__name__)
+
+WATCHED_FIELDS = ('temperature', 'condition', 'humidity', 'wind')
+
+
+class JsonlSink:
+    """Escribe cada evento de cambio como una línea JSON (archivo o stream abierto)"""
+
+    def __init__(self, target: Union[str, Path, IO[str]]):
+        if isinstance(target, (str, Path)):
+            self._file = open(target, 'a', encoding='utf-8')
+            self._owns_file = True
+        else:
+            self._file = target
+            self._owns_file = False
+
+    def write(self, event: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(event, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._owns_file:
+            self._file.close()
+
+
+class WeatherWatcher:
+    """
+    Sondea un conjunto de ciudades y emite solo los cambios.
+
+    Guarda, por ciudad, el último valor emitido de cada campo y compara cada
+    lectura nueva contra él: la temperatura, la humedad y el viento cambian si
+    se mueven al menos su umbral (en la unidad pedida), la condición si cambia
+    el texto. Comparar contra lo emitido, y no contra la lectura anterior, hace
+    que una deriva lenta termine produciendo un evento.
+
+    Evento:
+        {'city': 'Madrid', 'lang': 'es', 'location': 'Madrid, España',
+         'at': '2024-05-01T12:00:00+00:00', 'initial': False,
+         'changes': {'temperature': {'old': 21.0, 'new': 21.6}}}
+
+    Ejemplo:
+        watcher = scraper.watch(['Madrid', 'Lima'], lang='es', interval=300, temperature=0.5)
+        async for event in watcher:
+            print(event['city'], event['changes'])
+    """
+
+    def __init__(
+        self,
+        scraper,
+        cities: List[str],
+        lang: str = 'en',
+        interval: float = 300,
+        temp_unit: str = 'C',
+        wind_unit: str = 'kmh',
+        temperature: float = 0.5,
+        humidity: float = 1.0,
+        wind: float = 1.0,
+        condition: bool = True,
+        emit_initial: bool = True,
+        concurrency: int = 4,
+        timeout: Optional[float] = None,
+        limiter: Optional[AdaptiveLimiter] = None
+    ):
+        validate_temp_unit(temp_unit)
+        if wind_unit not in ('kmh', 'mph'):
+            raise ValueError(f"Unidad de viento no soportada: {wind_unit}")
+        self.scraper = scraper
+        self.cities = list(cities)
+        self.lang = lang
+        self.interval = interval
+        self.temp_unit = temp_unit
+        self.wind_unit = wind_unit
+        self.thresholds = {'temperature': temperature, 'humidity': humidity, 'wind': wind}
+        self.watch_condition = condition
+        self.emit_initial = emit_initial
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.limiter = limiter
+
+        self._last: Dict[str, Dict[str, Any]] = {}
+        self.stats = {'polls': 0, 'readings': 0, 'events': 0, 'errors': 0}
+
+    @property
+    def suppressed_rate(self) -> float:
+        """Fracción de lecturas que no produjeron evento"""
+        readings = self.stats['readings']
+        return 1 - self.stats['events'] / readings if readings else 0.0
+
+    def _values(self, readings: Dict[str, Any]) -> Dict[str, Any]:
+        wind = None
+        if readings.get('wind_value') is not None:
+            wind = round(convert_wind(readings['wind_value'], readings['wind_is_mph'], self.wind_unit), 1)
+        return {
+            'temperature': round(convert_temperature(readings['temperature_f'], self.temp_unit), 1),
+            'condition': readings['condition'],
+            'humidity': parse_humidity(readings['humidity']),
+            'wind': wind
+        }
+
+    def _changed(self, field: str, old: Any, new: Any) -> bool:
+        if field == 'condition':
+            return self.watch_condition and old != new
+        if old is None or new is None:
+            return old is not new
+        return abs(new - old) >= self.thresholds[field]
+
+    def update(self, city: str, readings: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Compara una lectura con el estado de la ciudad; devuelve el evento o None"""
+        self.stats['readings'] += 1
+        values = self._values(readings)
+        last = self._last.get(city)
+        if last is None:
+            self._last[city] = values
+            if not self.emit_initial:
+                return None
+            changes = {field: {'old': None, 'new': values[field]} for field in WATCHED_FIELDS}
+        else:
+            changes = {
+                field: {'old': last[field], 'new': values[field]}
+                for field in WATCHED_FIELDS
+                if self._changed(field, last[field], values[field])
+            }
+            if not changes:
+                return None
+            # Solo los campos emitidos avanzan su referencia
+            for field in changes:
+                last[field] = values[field]
+
+        self.stats['events'] += 1
+        return {
+            'city': city,
+            'lang': self.lang,
+            'location': readings['location'],
+            'at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'initial': last is None,
+            'changes': changes
+        }
+
+    async def poll(self) -> List[Dict[str, Any]]:
+        """Consulta todas las ciudades una vez y devuelve los eventos de cambio"""
+        self.stats['polls'] += 1
+        results = await self.scraper.get_readings_many(
+            self.cities, self.lang, concurrency=self.concurrency, timeout=self.timeout, limiter=self.limiter
+        )
+        events = []
+        for city, result in zip(self.cities, results):
+            if isinstance(result, BaseException):
+                self.stats['errors'] += 1
+                logger.warning(f"Error vigilando '{city}': {str(result)}")
+                continue
+            event = self.update(city, result)
+            if event is not None:
+                events.append(event)
+        return events
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            started = time.monotonic()
+            for event in await self.poll():
+                yield event
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def run(self, sink: Union[JsonlSink, str, Path, IO[str]], polls: Optional[int] = None) -> None:
+        """Escribe los eventos en un sink JSONL; con `polls`, se detiene tras esa cantidad de sondeos"""
+        owns_sink = not isinstance(sink, JsonlSink)
+        sink = JsonlSink(sink) if owns_sink else sink
+        try:
+            done = 0
+            while polls is None or done < polls:
+                started = time.monotonic()
+                for event in await self.poll():
+                    sink.write(event)
+                done += 1
+                if polls is None or done < polls:
+                    await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        finally:
+            if owns_sink:
+                sink.close()
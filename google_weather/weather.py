@@ -1,12 +1,31 @@
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
-from playwright.async_api import async_playwright, Page, Browser, BrowserContext
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Callable, Union, Awaitable, Iterator
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Route, Error as PlaywrightError
 from bs4 import BeautifulSoup
 from datetime import datetime
 from pathlib import Path
 import re
-from .lang import lang_queries, weather_labels, locale_configs, weather_conditions, unit_preferences
+from .lang import lang_queries, weather_labels, locale_configs
+from .cache import AliasIndex, CacheBackend, MemoryBackend, normalize_query
+from .concurrency import AdaptiveLimiter
+from .deadline import Deadline
+from .errors import WeatherTimeoutError, BlockedError
+from .geo import SpatialIndex
+from .replay import PageArchive
+from .hedging import HedgePolicy
+from .launch import descendant_pids, launch_options, validate_launch_profile
+from .markup import SelectorRegistry
+from .navigation import IN_PAGE_FETCH_JS, NAVIGATION_PROFILES, NAVIGATION_TIMING_JS, NavigationStats
+from .parsing import build_readings, clean_location, parse_temperature_f, resolve_units
+from .profiling import Profiler
+from .proxies import ProxyEndpoint, ProxyPool
+from .units import format_readings
+from .watch import WeatherWatcher
+import json
 import random
+import time
 
 # Configurar logging
 logging.basicConfig(
@@ -38,18 +57,129 @@ def save_debug_html(content: str, prefix: str = 'debug') -> str:
         logger.error(f"Error guardando HTML: {str(e)}")
         return "No se pudo guardar el HTML"
 
+def _consume_task_result(task: asyncio.Future) -> None:
+    """Marca como recuperado el resultado de una tarea auxiliar para evitar avisos de asyncio"""
+    if not task.cancelled():
+        task.exception()
+
 class WeatherScraper:
-    def __init__(self, headless: bool = True, debug: bool = False):
+    def __init__(
+        self,
+        headless: bool = True,
+        debug: bool = False,
+        cache_ttl: Optional[float] = None,
+        alias_path: Optional[str] = None,
+        browser_endpoint: Optional[str] = None,
+        endpoint_type: str = 'cdp',
+        archive_dir: Optional[str] = None,
+        archive_mode: Optional[str] = None,
+        warmup_langs: Optional[List[str]] = None,
+        storage_state_dir: Optional[str] = None,
+        storage_state_refresh: float = 3600,
+        navigation_profile: Union[str, Dict[str, str]] = 'load',
+        lite: bool = False,
+        hedge: Optional[HedgePolicy] = None,
+        cache_backend: Optional[CacheBackend] = None,
+        single_flight: bool = False,
+        single_flight_poll: float = 0.25,
+        proxies: Optional[ProxyPool] = None,
+        profiler: Optional[Profiler] = None,
+        launch_profile: str = 'default',
+        base_url: str = 'https://www.google.com',
+        selectors: Optional[SelectorRegistry] = None,
+        in_page_fetch: bool = False
+    ):
+        if endpoint_type not in ('cdp', 'playwright'):
+            raise ValueError(f"Tipo de endpoint no soportado: {endpoint_type}")
+        if archive_mode not in (None, 'record', 'replay'):
+            raise ValueError(f"Modo de archivo no soportado: {archive_mode}")
+        if archive_mode and not archive_dir:
+            raise ValueError("archive_mode requiere archive_dir")
+        profiles = navigation_profile.values() if isinstance(navigation_profile, dict) else [navigation_profile]
+        for profile in profiles:
+            if profile not in NAVIGATION_PROFILES:
+                raise ValueError(f"Perfil de navegación no soportado: {profile}")
+        validate_launch_profile(launch_profile)
         self.headless = headless
+        # Flags de Chromium y modelo de procesos del navegador propio (ver launch.LAUNCH_PROFILES)
+        self.launch_profile = launch_profile
+        # Origen de las búsquedas; otro valor apunta el scraper a un servidor de prueba
+        self.base_url = base_url.rstrip('/')
+        # Cadenas de selectores con la variante ganadora por idioma y eventos de deriva de marcado
+        self.selectors = selectors or SelectorRegistry()
         self.debug = debug
         self.debug_dir = Path("debug_screenshots") if debug else None
         if self.debug_dir:
             self.debug_dir.mkdir(exist_ok=True)
         
-        # Cache para browsers/contexts
+        # Cache para browsers/contexts, y el driver de Playwright que los sostiene
+        self._playwright = None
         self._browser: Optional[Browser] = None
         self._contexts: Dict[str, BrowserContext] = {}
+        # Parámetros (lang, lite, variant, proxy) con que se creó cada contexto
+        self._context_params: Dict[str, tuple] = {}
+        self._context_lock: Optional[asyncio.Lock] = None
+        
+        # Navegador externo compartido (CDP o servidor de Playwright)
+        self.browser_endpoint = browser_endpoint
+        self.endpoint_type = endpoint_type
+        
+        # Cache de resultados (en memoria con `cache_ttl`, o un backend compartido) e índice de alias
+        self.cache: Optional[CacheBackend] = cache_backend if cache_backend is not None else (MemoryBackend(cache_ttl) if cache_ttl else None)
+        self.aliases = AliasIndex(alias_path)
+        # Single-flight: un solo scraping por ciudad entre todos los nodos del backend
+        self.single_flight = single_flight
+        self.single_flight_poll = single_flight_poll
+        self.cache_stats = {'hits': 0, 'misses': 0, 'waits': 0, 'errors': 0}
+        # Índice espacial por idioma para get_weather_at (mismo TTL que el cache)
+        self._spatial: Dict[str, SpatialIndex] = {}
+        self.spatial_ttl = self.cache.ttl if self.cache is not None else 600
+        
+        # Grabación/reproducción de páginas de resultados
+        self.archive_mode = archive_mode
+        self.archive: Optional[PageArchive] = PageArchive(archive_dir) if archive_dir else None
+        
+        # Sesión (cookies/consentimiento) persistida por locale entre reinicios
+        self.storage_state_dir = Path(storage_state_dir) if storage_state_dir else None
+        self.storage_state_refresh = storage_state_refresh
+        self._storage_saved_at: Dict[Path, float] = {}
+        self._storage_saving = set()
+        self._background_tasks = set()
+        
+        # Perfil de navegación (global o por idioma, con clave 'default') y sus mediciones
+        self.navigation_profile = navigation_profile
+        self.navigation_stats = NavigationStats()
+        
+        # Modo liviano: contextos sin JavaScript con vuelta automática al contexto completo
+        self.lite = lite
+        self.lite_stats = {'attempts': 0, 'fallbacks': 0}
+        
+        # Búsquedas con fetch() desde una página fija por contexto, con vuelta a la navegación
+        self.in_page_fetch = in_page_fetch
+        self.fetch_stats = {'attempts': 0, 'fallbacks': 0}
+        self._fetch_pages: Dict[str, Page] = {}
+        self._fetch_page_locks: Dict[str, asyncio.Lock] = {}
+        
+        # Consultas de cobertura para recortar la latencia de cola
+        self.hedge = hedge
+        
+        # Pool de proxies de salida: cada contexto queda ligado a un endpoint
+        self.proxies = proxies
+        
+        # Perfilado opcional (CPU, memoria y lag del event loop), iniciado con la primera consulta
+        self.profiler = profiler
+        
+        # Páginas y consultas en curso, para cancelarlas al cerrar
+        self._open_pages = set()
+        self._inflight = set()
+        self._closed = False
         
+        # Páginas precalentadas listas para la próxima consulta de cada contexto
+        self._warm_pages: Dict[str, List[Page]] = {}
+        self.warmup_report: Optional[Dict[str, float]] = None
+        self._warmup_task: Optional[asyncio.Task] = None
+        if warmup_langs:
+            self._start_background_warmup(warmup_langs)
 
     def _get_random_user_agent(self) -> str:
         """Retorna un User-Agent aleatorio de una lista predefinida"""
@@ -63,24 +193,75 @@ class WeatherScraper:
         ]
         return random.choice(user_agents)
 
-    async def _get_context(self, lang: str) -> BrowserContext:
-        """Obtiene o crea un contexto de navegador para el idioma especificado"""
-        if lang not in self._contexts:
+    @staticmethod
+    def _context_key(
+        lang: str,
+        lite: bool = False,
+        variant: Optional[str] = None,
+        proxy: Optional[ProxyEndpoint] = None
+    ) -> str:
+        key = f"{lang}:lite" if lite else lang
+        if variant:
+            key = f"{key}:{variant}"
+        return f"{key}:proxy={proxy.name}" if proxy else key
+
+    async def _get_context(
+        self,
+        lang: str,
+        lite: bool = False,
+        variant: Optional[str] = None,
+        proxy: Optional[ProxyEndpoint] = None
+    ) -> BrowserContext:
+        """
+        Obtiene o crea un contexto de navegador para el idioma especificado
+        
+        `variant` crea un contexto independiente para el mismo idioma (por ejemplo,
+        'hedge' para que los intentos de cobertura no compartan conexiones).
+        Con `proxy`, todo el tráfico del contexto sale por ese endpoint.
+        """
+        if self._closed:
+            raise RuntimeError("El scraper ya fue cerrado")
+        key = self._context_key(lang, lite, variant, proxy)
+        if key in self._contexts:
+            return self._contexts[key]
+        
+        # Evitar que consultas concurrentes lancen varios navegadores/contextos
+        if self._context_lock is None:
+            self._context_lock = asyncio.Lock()
+        async with self._context_lock:
+            if key in self._contexts:
+                return self._contexts[key]
+            
             if not self._browser:
                 self._browser = await self._launch_browser()
             
             # Obtener configuración regional
             lang_config = locale_configs.get(lang, locale_configs['en'])
             
+            # Reutilizar la sesión guardada para evitar interstitials de consentimiento
+            storage_state_path = self._storage_state_path(lang, proxy)
+            if storage_state_path and not storage_state_path.exists():
+                storage_state_path = None
+            
             context = await self._browser.new_context(
+                storage_state=str(storage_state_path) if storage_state_path else None,
                 viewport={'width': 1920, 'height': 1080},
                 user_agent=self._get_random_user_agent(),
                 locale=lang_config['locale'],
                 timezone_id=lang_config['timezone'],
                 permissions=['geolocation'],
-                java_script_enabled=True
+                # En replay y en modo liviano se usa el widget renderizado en el servidor
+                java_script_enabled=self.archive_mode != 'replay' and not lite,
+                service_workers='block' if lite else 'allow',
+                reduced_motion='reduce' if lite else 'no-preference',
+                proxy=proxy.playwright_proxy() if proxy else None
             )
             
+            if self.archive_mode == 'replay':
+                await context.route('**/*', self._replay_route)
+            elif lite:
+                await context.route('**/*', self._lite_route)
+            
             # Agregar scripts de evasión
             await context.add_init_script("""
                 Object.defineProperty(navigator, 'webdriver', {
@@ -88,48 +269,290 @@ class WeatherScraper:
                 });
             """)
             
-            self._contexts[lang] = context
+            self._contexts[key] = context
+            self._context_params[key] = (lang, lite, variant, proxy)
             
-        return self._contexts[lang]
+        return self._contexts[key]
+    
+    async def _lite_route(self, route: Route) -> None:
+        """En modo liviano solo se descargan documentos y estilos"""
+        if route.request.resource_type in ('image', 'media', 'font', 'script', 'texttrack', 'eventsource', 'websocket'):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @property
+    def fetch_fallback_rate(self) -> float:
+        """Fracción de búsquedas con fetch() que necesitaron navegar"""
+        if not self.fetch_stats['attempts']:
+            return 0.0
+        return self.fetch_stats['fallbacks'] / self.fetch_stats['attempts']
+
+    @property
+    def lite_fallback_rate(self) -> float:
+        """Fracción de consultas livianas que necesitaron el contexto completo"""
+        attempts = self.lite_stats['attempts']
+        return self.lite_stats['fallbacks'] / attempts if attempts else 0.0
+
+    def _storage_state_path(self, lang: str, proxy: Optional[ProxyEndpoint] = None) -> Optional[Path]:
+        """
+        Archivo de storage_state del locale del idioma (None si no se persiste)
+
+        Los contextos liviano y de cobertura comparten el archivo del idioma; cada
+        proxy tiene el suyo, porque Google liga la sesión a la IP de salida.
+        """
+        if not self.storage_state_dir or self.archive_mode == 'replay':
+            return None
+        locale = locale_configs.get(lang, locale_configs['en'])['locale']
+        if proxy:
+            name = re.sub(r'[^\w.-]', '_', proxy.name)
+            return self.storage_state_dir / f"{locale}.{name}.json"
+        return self.storage_state_dir / f"{locale}.json"
+
+    async def save_storage_state(
+        self,
+        lang: str,
+        lite: bool = False,
+        variant: Optional[str] = None,
+        proxy: Optional[ProxyEndpoint] = None
+    ) -> Optional[Path]:
+        """
+        Guarda las cookies y el almacenamiento de un contexto del idioma en disco
+
+        Sin otros argumentos se usa el contexto completo del idioma o, si no existe,
+        el liviano.
+        """
+        path = self._storage_state_path(lang, proxy)
+        context = self._contexts.get(self._context_key(lang, lite, variant, proxy))
+        if context is None and not lite:
+            context = self._contexts.get(self._context_key(lang, True, variant, proxy))
+        if not path or not context:
+            return None
+        
+        state = await context.storage_state()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Escritura atómica: otros procesos pueden estar leyendo el mismo archivo
+        tmp_path = path.with_suffix(f".{id(self)}.tmp")
+        tmp_path.write_text(json.dumps(state), encoding='utf-8')
+        tmp_path.replace(path)
+        self._storage_saved_at[path] = time.monotonic()
+        if self.debug:
+            logger.debug(f"storage_state guardado en {path}")
+        return path
+
+    def _refresh_storage_state(
+        self,
+        lang: str,
+        lite: bool = False,
+        variant: Optional[str] = None,
+        proxy: Optional[ProxyEndpoint] = None
+    ) -> None:
+        """Programa el guardado de la sesión del contexto usado si nunca se guardó o ya venció el intervalo"""
+        path = self._storage_state_path(lang, proxy)
+        if not path or path in self._storage_saving:
+            return
+        saved_at = self._storage_saved_at.get(path)
+        if saved_at is not None and time.monotonic() - saved_at < self.storage_state_refresh:
+            return
+        # Un guardado en curso por archivo; la hora se registra solo si el guardado funciona
+        self._storage_saving.add(path)
+        
+        async def _save() -> None:
+            try:
+                await self.save_storage_state(lang, lite, variant, proxy)
+            except Exception as e:
+                logger.error(f"Error guardando storage_state de '{lang}': {str(e)}")
+            finally:
+                self._storage_saving.discard(path)
+        
+        task = asyncio.ensure_future(_save())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _start_background_warmup(self, langs: List[str]) -> None:
+        """Lanza warmup() en segundo plano si hay un event loop corriendo"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.warning("No hay event loop corriendo: llamar a 'await scraper.warmup(...)' explícitamente")
+            return
+        
+        def _log_failure(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception():
+                logger.error(f"Error en el precalentamiento: {str(task.exception())}")
+        
+        self._warmup_task = loop.create_task(self.warmup(langs))
+        self._warmup_task.add_done_callback(_log_failure)
+
+    async def warmup(self, langs: Optional[List[str]] = None, pages_per_lang: int = 1) -> Dict[str, float]:
+        """
+        Paga los costos de arranque antes del tráfico real
+        
+        Lanza (o conecta) el navegador, crea el contexto de cada idioma y deja
+        páginas abiertas en google.com, con las cookies de consentimiento y las
+        conexiones ya establecidas, para que las próximas consultas las reutilicen.
+        
+        Args:
+            langs: Idiomas a precalentar (por defecto, solo 'en')
+            pages_per_lang: Páginas precalentadas por idioma
+            
+        Returns:
+            Dict con los segundos de cada etapa ('browser', 'context:<lang>',
+            'pages:<lang>') y el total ('total')
+        """
+        langs = langs or ['en']
+        report: Dict[str, float] = {}
+        started = time.monotonic()
+        
+        if not self._browser:
+            stage = time.monotonic()
+            # El primer contexto lanza el navegador; se mide por separado
+            if self._context_lock is None:
+                self._context_lock = asyncio.Lock()
+            async with self._context_lock:
+                if not self._browser:
+                    self._browser = await self._launch_browser()
+            report['browser'] = time.monotonic() - stage
+        
+        # Con proxies se precalienta el contexto de cada endpoint
+        endpoints = self.proxies.endpoints if self.proxies else [None]
+        for lang in langs:
+            stage = time.monotonic()
+            for endpoint in endpoints:
+                await self._get_context(lang, self.lite, proxy=endpoint)
+            report[f'context:{lang}'] = time.monotonic() - stage
+        
+        async def _prime(lang: str, endpoint: Optional[ProxyEndpoint]) -> None:
+            stage = time.monotonic()
+            context = await self._get_context(lang, self.lite, proxy=endpoint)
+            pages = [await context.new_page() for _ in range(pages_per_lang)]
+            if self.archive_mode != 'replay':
+                results = await asyncio.gather(
+                    *(page.goto(f'{self.base_url}/?hl={lang}') for page in pages),
+                    return_exceptions=True
+                )
+                # Una página que no pudo navegar sigue sirviendo: solo se pierde el precalentamiento de red
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.warning(f"No se pudo precalentar una página '{lang}': {str(result)}")
+            self._warm_pages.setdefault(self._context_key(lang, self.lite, proxy=endpoint), []).extend(pages)
+            self._refresh_storage_state(lang, self.lite, proxy=endpoint)
+            report[f'pages:{lang}'] = max(report.get(f'pages:{lang}', 0.0), time.monotonic() - stage)
+        
+        await asyncio.gather(*(_prime(lang, endpoint) for lang in langs for endpoint in endpoints))
+        
+        report['total'] = time.monotonic() - started
+        self.warmup_report = report
+        logger.info(f"Precalentamiento completado en {report['total']:.2f}s ({', '.join(langs)})")
+        return report
+
+    def _take_warm_page(self, key: str) -> Optional[Page]:
+        """
+        Devuelve una página precalentada del contexto, si queda alguna abierta, y
+        programa su reemplazo para que la próxima consulta tampoco arranque en frío
+        """
+        pages = self._warm_pages.get(key)
+        while pages:
+            page = pages.pop()
+            if not page.is_closed():
+                self._replenish_warm_page(key)
+                return page
+        return None
+
+    def _replenish_warm_page(self, key: str) -> None:
+        """
+        Abre en segundo plano una página en blanco nueva en el contexto de la clave.
+
+        No navega al buscador: el contexto ya tiene las cookies de consentimiento y
+        cada visita extra a la portada duplicaría las peticiones a Google.
+        """
+        context = self._contexts.get(key)
+        if context is None or self._closed:
+            return
+        
+        async def _prime() -> None:
+            try:
+                page = await context.new_page()
+            except Exception as e:
+                logger.warning(f"No se pudo reponer la página precalentada '{key}': {str(e)}")
+                return
+            if self._closed:
+                await page.close()
+                return
+            self._warm_pages.setdefault(key, []).append(page)
+        
+        task = asyncio.ensure_future(_prime())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        task.add_done_callback(_consume_task_result)
+
+    async def _replay_route(self, route: Route) -> None:
+        """Sirve las búsquedas desde el archivo en disco y bloquea cualquier otra petición"""
+        request = route.request
+        if not request.is_navigation_request():
+            await route.abort()
+            return
+        
+        html = self.archive.load(request.url)
+        if html is None:
+            if self.debug:
+                logger.debug(f"Página no grabada: {request.url}")
+            await route.fulfill(status=404, content_type='text/html', body='<html><body></body></html>')
+            return
+        
+        await route.fulfill(status=200, content_type='text/html; charset=utf-8', body=html)
     
     async def _launch_browser(self) -> Browser:
-        """Lanza el navegador con configuraciones optimizadas"""
-        playwright = await async_playwright().start()
-        return await playwright.chromium.launch(
-            headless=self.headless,
-            args=[
-                '--disable-blink-features=AutomationControlled',
-                '--disable-features=IsolateOrigins,site-per-process',
-                '--disable-site-isolation-trials'
-            ]
-        )
+        """Lanza el navegador con configuraciones optimizadas, o se conecta a uno compartido"""
+        # El driver se guarda para poder detenerlo en close(); si no, su proceso queda vivo
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        playwright = self._playwright
+        try:
+            if self.browser_endpoint:
+                if self.debug:
+                    logger.debug(f"Conectando al navegador compartido ({self.endpoint_type}): {self.browser_endpoint}")
+                if self.endpoint_type == 'cdp':
+                    return await playwright.chromium.connect_over_cdp(self.browser_endpoint)
+                return await playwright.chromium.connect(self.browser_endpoint)
+            
+            return await playwright.chromium.launch(**launch_options(
+                self.launch_profile,
+                headless=self.headless,
+                # Chromium solo admite proxies por contexto si el navegador se lanzó con uno
+                proxy={'server': 'http://per-context'} if self.proxies else None
+            ))
+        except BaseException:
+            self._playwright = None
+            await playwright.stop()
+            raise
     
-    async def _extract_location(self, page: Page, lang: str) -> str:
+    async def _extract_location(self, page: Page, lang: str, deadline: Optional[Deadline] = None) -> str:
         """Extrae la ubicación del widget del clima"""
+        deadline = deadline or Deadline()
         try:
-            # Esperar y obtener el elemento de ubicación usando el selector más genérico
-            location_element = await page.wait_for_selector(".BBwThe", timeout=5000)
+            deadline.enter('location')
+            # Probar las variantes conocidas y, si ninguna está aún, esperar a cualquiera de ellas
+            location_element = await self._wait_field(page, 'location', lang, deadline.timeout_ms(5000))
             
             if location_element:
                 full_text = await location_element.text_content()
                 if self.debug:
                     logger.debug(f"Texto completo encontrado: {full_text}")
                 
-                # Eliminar textos de prefijo comunes en diferentes idiomas
-                prefixes = ['Resultados para ', 'Results for ', 'Résultats pour ', 'Ergebnisse für ']
-                for prefix in prefixes:
-                    if full_text.startswith(prefix):
-                        full_text = full_text.replace(prefix, '').strip()
-                
-                # Limpiar y devolver la ubicación
-                location = full_text.strip()
+                # Eliminar prefijos comunes en diferentes idiomas, limpiar y devolver la ubicación
+                location = clean_location(full_text)
                 if self.debug:
                     logger.debug(f"Ubicación final: {location}")
                 return location
                 
             raise ValueError("No se encontró el elemento de ubicación")
             
+        except WeatherTimeoutError:
+            raise
         except Exception as e:
+            if deadline.expired():
+                raise deadline.error() from e
             if self.debug:
                 logger.error(f"Error extrayendo ubicación: {str(e)}")
                 await page.screenshot(path=str(self.debug_dir / f"location_error_{lang}.png"))
@@ -137,25 +560,130 @@ class WeatherScraper:
                 logger.debug(f"HTML de la página: {content}")
             raise
 
-    async def _perform_search(self, page: Page, city: str, lang: str) -> None:
-        """Realiza la búsqueda del clima"""
+    async def _probe_field(self, page: Page, field: str, lang: str, record_miss: bool = True):
+        """
+        Prueba las variantes del campo en orden, con la última ganadora del idioma primero
+
+        Cada variante es una consulta inmediata al DOM: un cambio de marcado cuesta
+        una prueba extra, no un timeout. Devuelve el elemento o None.
+        """
+        for selector in self.selectors.candidates(field, lang):
+            element = await page.query_selector(selector)
+            if element:
+                self.selectors.record(field, lang, selector)
+                return element
+        if record_miss:
+            self.selectors.record(field, lang, None)
+        return None
+
+    async def _wait_field(self, page: Page, field: str, lang: str, timeout: float, state: str = 'attached'):
+        """Como _probe_field, pero si ninguna variante está aún en la página espera a cualquiera de ellas"""
+        element = await self._probe_field(page, field, lang, record_miss=False)
+        if element:
+            return element
+        try:
+            await page.wait_for_selector(self.selectors.combined(field, lang), state=state, timeout=timeout)
+        except Exception:
+            self.selectors.record(field, lang, None)
+            raise
+        return await self._probe_field(page, field, lang)
+
+    @staticmethod
+    def _check_blocked(page: Page) -> None:
+        """Detecta la página de bloqueo/CAPTCHA de Google (redirige a /sorry/)"""
+        if '/sorry/' in page.url:
+            raise BlockedError("Error getting weather: blocked by Google (CAPTCHA)")
+
+    def _navigation_profile_for(self, lang: str) -> str:
+        if isinstance(self.navigation_profile, dict):
+            return self.navigation_profile.get(lang, self.navigation_profile.get('default', 'load'))
+        return self.navigation_profile
+
+    def _search_url(self, city: str, lang: str) -> str:
+        search_query = lang_queries.get(lang, lang_queries['en']).format(city=city.replace(' ', '+'))
+        return f'{self.base_url}/search?q={search_query}&hl={lang}'
+
+    async def _perform_search(
+        self,
+        page: Page,
+        city: str,
+        lang: str,
+        deadline: Optional[Deadline] = None,
+        lite: bool = False
+    ) -> None:
+        """
+        Realiza la búsqueda del clima
+
+        En modo liviano (sin JavaScript) el DOM ya es definitivo cuando termina la
+        navegación: el widget se prueba sin esperar y, si falta, se falla enseguida
+        para que la consulta vuelva al contexto completo con el resto del presupuesto.
+        """
+        deadline = deadline or Deadline()
+        profile_name = self._navigation_profile_for(lang)
+        profile = NAVIGATION_PROFILES[profile_name]
+        navigation = None
         try:
             # Construir y navegar a la URL de búsqueda
-            search_query = lang_queries.get(lang, lang_queries['en']).format(city=city.replace(' ', '+'))
-            url = f'https://www.google.com/search?q={search_query}&hl={lang}'
+            url = self._search_url(city, lang)
             
             if self.debug:
                 logger.debug(f"URL de búsqueda: {url}")
             
-            await page.goto(url)
+            deadline.enter('navigation')
+            started = time.monotonic()
+            navigation = asyncio.ensure_future(
+                page.goto(url, wait_until=profile['wait_until'], timeout=deadline.timeout_ms())
+            )
+            # En modo stream la navegación sigue en segundo plano; su error se consume al cerrar la página
+            navigation.add_done_callback(_consume_task_result)
+            if not profile['stream'] or lite:
+                await navigation
+                self._check_blocked(page)
             
             # Esperar a que el widget se cargue
             try:
-                await page.wait_for_selector('#wob_wc', state='visible')
+                deadline.enter('widget')
+                if lite:
+                    missing = [
+                        field for field in ('widget', 'location', 'temperature')
+                        if not await self._probe_field(page, field, lang, record_miss=False)
+                    ]
+                    if missing:
+                        raise Exception(f"Error getting weather: {', '.join(missing)} missing without JavaScript")
+                else:
+                    widget_wait = asyncio.ensure_future(
+                        page.wait_for_selector(self.selectors.combined('widget', lang), state='visible', timeout=deadline.timeout_ms())
+                    )
+                    widget_wait.add_done_callback(_consume_task_result)
+                    if not navigation.done():
+                        # Continuar en cuanto aparezca el widget, salvo que la navegación falle antes
+                        await asyncio.wait({navigation, widget_wait}, return_when=asyncio.FIRST_COMPLETED)
+                        if navigation.done() and not navigation.cancelled():
+                            if navigation.exception():
+                                widget_wait.cancel()
+                                raise navigation.exception()
+                            # Navegación completa sin widget: puede ser la página de bloqueo
+                            try:
+                                self._check_blocked(page)
+                            except BlockedError:
+                                widget_wait.cancel()
+                                raise
+                    await widget_wait
+                time_to_widget = time.monotonic() - started
+                
+                try:
+                    timing = await page.evaluate(NAVIGATION_TIMING_JS) or {}
+                except Exception:
+                    # Las métricas nunca deben hacer fallar la consulta
+                    timing = {}
+                self.navigation_stats.record(profile_name, lang, True, time_to_widget, timing.get('load'))
+                
+                if self.archive_mode == 'record':
+                    self.archive.save(url, await page.content())
                 
                 if self.debug:
                     # Verificar si el widget está realmente presente
-                    widget = await page.query_selector('#wob_wc')
+                    widget = await page.query_selector(self.selectors.combined('widget', lang))
                     if widget:
                         html = await page.evaluate('element => element.outerHTML', widget)
                         logger.debug(f"Widget encontrado: {html}")
@@ -163,7 +691,7 @@ class WeatherScraper:
                         logger.debug("Widget no encontrado después de esperar")
                     
                     # Verificar elementos críticos
-                    for selector in ['#wob_loc', '#wob_tm', '#wob_dc', '#wob_hm', '#wob_ws']:
+                    for selector in (selector for field, chain in self.selectors.chains.items() if field != 'widget' for selector in chain):
                         elem = await page.query_selector(selector)
                         if elem:
                             text = await elem.text_content()
@@ -171,23 +699,40 @@ class WeatherScraper:
                         else:
                             logger.debug(f"Elemento {selector} no encontrado")
                 
+            except (WeatherTimeoutError, BlockedError):
+                raise
             except Exception as e:
+                if deadline.expired():
+                    raise deadline.error() from e
+                if navigation.done() and not navigation.cancelled() and navigation.exception() is e:
+                    raise
+                self._check_blocked(page)
                 if self.debug:
                     logger.error(f"Error esperando al widget: {str(e)}")
                     content = await page.content()
                     save_debug_html(content, f"widget_error_{lang}")
                 raise Exception("Error getting weather: Widget not found")
             
+        except WeatherTimeoutError:
+            self.navigation_stats.record(profile_name, lang, False)
+            raise
         except Exception as e:
+            self.navigation_stats.record(profile_name, lang, False)
+            if navigation is not None and not navigation.done():
+                navigation.cancel()
+            if deadline.expired():
+                raise deadline.error() from e
             if self.debug:
                 logger.error(f"Error en búsqueda: {str(e)}")
                 await page.screenshot(path=str(self.debug_dir / f"search_error_{lang}.png"))
             raise
 
-    async def _extract_temperature(self, page: Page, temp_unit: str) -> str:
-        """Extrae y convierte la temperatura según la unidad deseada"""
+    async def _extract_temperature(self, page: Page, deadline: Optional[Deadline] = None, lang: str = 'en') -> float:
+        """Extrae la temperatura cruda (°F) y valida que esté en un rango razonable"""
+        deadline = deadline or Deadline()
         try:
-            temp_element = await page.wait_for_selector("#wob_tm", state='visible')
+            deadline.enter('temperature')
+            temp_element = await self._wait_field(page, 'temperature', lang, deadline.timeout_ms(), state='visible')
             if not temp_element:
                 raise ValueError("No se encontró el elemento de temperatura")
             
@@ -195,26 +740,14 @@ class WeatherScraper:
             if self.debug:
                 logger.debug(f"Temperatura encontrada (raw): {temp_raw}")
             
-            # La temperatura viene en Fahrenheit por defecto
-            temp = float(temp_raw)
-            
-            # Convertir a Celsius si es necesario
-            if temp_unit == 'C':
-                temp = (temp - 32) * 5/9
-            elif temp_unit == 'K':
-                temp = (temp - 32) * 5/9 + 273.15
-            
-            # Validar rangos razonables (en Celsius)
-            temp_celsius = temp if temp_unit == 'C' else (temp - 32) * 5/9 if temp_unit == 'F' else temp - 273.15
-            if not (-50 <= temp_celsius <= 50):
-                if self.debug:
-                    logger.debug(f"Temperatura raw: {temp_raw}°F")
-                    logger.debug(f"Temperatura convertida: {temp_celsius}°C")
-                raise ValueError(f"Temperatura fuera de rango razonable: {temp_celsius}°C")
-            
-            return f"{round(temp, 1)}°{temp_unit}"
+            # Fahrenheit, validada contra un rango razonable
+            return parse_temperature_f(temp_raw)
             
+        except WeatherTimeoutError:
+            raise
         except Exception as e:
+            if deadline.expired():
+                raise deadline.error() from e
             if self.debug:
                 logger.error(f"Error procesando temperatura: {str(e)}")
             raise
@@ -225,96 +758,682 @@ class WeatherScraper:
         lang: str = 'en',
         temp_unit: str = None,
         wind_unit: str = None,
-        retries: int = 2
+        retries: int = 2,
+        timeout: Optional[float] = None
     ) -> Dict[str, Any]:
-        """Obtiene el clima actual usando múltiples estrategias de recuperación"""
+        """
+        Obtiene el clima actual usando múltiples estrategias de recuperación
+        
+        Con `timeout` (segundos) toda la consulta comparte un único presupuesto que se
+        reparte entre la navegación y cada espera de selectores. Si se agota, la página
+        se cancela y se lanza WeatherTimeoutError indicando la fase afectada.
+        """
+        temp_unit, wind_unit = self._resolve_units(lang, temp_unit, wind_unit)
+        readings = await self.get_readings(city, lang, timeout=timeout)
+        return format_readings(readings, temp_unit, wind_unit)
+
+    @staticmethod
+    def _resolve_units(lang: str, temp_unit: Optional[str], wind_unit: Optional[str]):
+        """Completa las unidades no indicadas según la configuración regional del idioma"""
+        return resolve_units(lang, temp_unit, wind_unit)
+
+    async def get_weather_at(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float = 5,
+        lang: str = 'en',
+        temp_unit: str = None,
+        wind_unit: str = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Obtiene el clima para unas coordenadas
+        
+        Responde con la lectura fresca más cercana dentro de `radius_km` si hay
+        una en el índice espacial; si no, busca las coordenadas en Google y
+        guarda el resultado en el índice bajo esas coordenadas.
+        
+        Returns:
+            Dict como el de get_weather, más 'distance_km' (0 si se consultó)
+        """
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError(f"Coordenadas fuera de rango: {lat}, {lon}")
+        temp_unit, wind_unit = self._resolve_units(lang, temp_unit, wind_unit)
+        index = self._spatial.get(lang)
+        if index is None:
+            index = self._spatial[lang] = SpatialIndex(self.spatial_ttl)
+        
+        nearest = index.nearest(lat, lon, radius_km)
+        if nearest is not None:
+            distance, readings = nearest
+            if self.debug:
+                logger.debug(f"Lectura a {distance:.1f} km para ({lat}, {lon}): {readings['location']}")
+        else:
+            readings = await self.get_readings(f"{lat:.4f},{lon:.4f}", lang, timeout=timeout)
+            index.add(lat, lon, readings)
+            distance = 0.0
+        
+        result = format_readings(readings, temp_unit, wind_unit)
+        result['distance_km'] = round(distance, 2)
+        return result
+
+    async def get_readings(self, city: str, lang: str = 'en', timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Obtiene las lecturas crudas del widget, sin convertir unidades
         
-        # Obtener configuración regional
-        lang_config = locale_configs.get(lang, locale_configs['en'])
-        locale = lang_config['locale']
+        Returns:
+            Dict con 'location', 'condition', 'humidity' (texto), 'temperature_f',
+            'wind_value', 'wind_is_mph' y 'wind_text'
+        """
+        if self.profiler is None:
+            return await self._get_readings(city, lang, timeout)
+        await self.profiler.start()
+        with self.profiler.track_lookup(f"{lang}:{city}"):
+            return await self._get_readings(city, lang, timeout)
+
+    async def _get_readings(self, city: str, lang: str, timeout: Optional[float]) -> Dict[str, Any]:
+        deadline = Deadline(timeout)
+        lock_token = None
+        
+        if self.cache is not None:
+            # Ubicación canónica si la consulta es un alias conocido; si no, la propia consulta
+            canonical = self.aliases.resolve(city, lang)
+            key = self._cache_key(canonical, lang) if canonical else self._query_cache_key(city, lang)
+            cached = await self._cache_call('get', key, deadline=deadline)
+            if cached is not None:
+                self.cache_stats['hits'] += 1
+                if self.debug:
+                    logger.debug(f"Cache hit para '{city}' -> '{canonical or city}'")
+                return cached
+            if self.single_flight:
+                # Quien espera y encuentra las lecturas cuenta como hit, no como miss
+                lock_token, cached = await self._single_flight(key, deadline)
+                if cached is not None:
+                    return cached
+            self.cache_stats['misses'] += 1
         
-        # Determinar unidades basadas en la configuración regional si no se especifican
-        if temp_unit is None or wind_unit is None:
-            unit_prefs = unit_preferences.get(locale, unit_preferences['default'])
-            temp_unit = temp_unit or unit_prefs['temp']
-            wind_unit = wind_unit or unit_prefs['wind']
+        try:
+            readings = await asyncio.wait_for(
+                self._fetch_hedged(city, lang, deadline),
+                timeout=deadline.remaining()
+            )
+        except WeatherTimeoutError:
+            raise
+        except asyncio.TimeoutError as e:
+            # El presupuesto se agotó en una operación sin timeout propio
+            raise deadline.error() from e
+        finally:
+            if lock_token is not None:
+                await self._cache_call('release_lock', key, lock_token)
         
-        context = await self._get_context(lang)
-        page = await context.new_page()
+        # Aprender el alias (solo sirve con cache o para persistirlo) y guardar las lecturas
+        # bajo la ubicación canónica y la consulta
+        if self.cache is not None or self.aliases.path:
+            self.aliases.learn(city, lang, readings['location'])
+        if self.cache is not None:
+            await self._cache_call('set', self._cache_key(readings['location'], lang), readings, deadline=deadline)
+            await self._cache_call('set', self._query_cache_key(city, lang), readings, deadline=deadline)
         
+        return readings
+
+    @staticmethod
+    def _cache_key(location: str, lang: str) -> str:
+        return f"{lang}|{location}"
+
+    @staticmethod
+    def _query_cache_key(query: str, lang: str) -> str:
+        # Otros nodos no conocen nuestros alias: la consulta normalizada también es una clave
+        return f"{lang}|?{normalize_query(query)}"
+
+    async def _cache_call(self, method: str, *args, deadline: Optional[Deadline] = None) -> Any:
+        """
+        Llama al backend de cache; sus fallos se registran y nunca hacen fallar la consulta
+
+        Con `deadline`, la llamada no puede pasarse del presupuesto de la consulta:
+        si ya no queda tiempo no se hace, y si tarda más cuenta como un fallo.
+        """
+        remaining = deadline.remaining() if deadline else None
+        if remaining is not None and remaining <= 0:
+            return None
         try:
-            # Realizar búsqueda directamente
-            await self._perform_search(page, city, lang)
-            
-            # Extraer datos
-            data = {}
-            
-            # Ubicación
-            data['location'] = await self._extract_location(page, lang)
+            return await asyncio.wait_for(getattr(self.cache, method)(*args), timeout=remaining)
+        except Exception as e:
+            self.cache_stats['errors'] += 1
+            logger.warning(f"Error en el backend de cache ({method}): {str(e)}")
+            return None
+
+    async def _single_flight(self, key: str, deadline: Deadline):
+        """
+        Toma el candado de la clave o espera a que quien lo tiene publique las lecturas.
+        
+        Returns:
+            (token, None) si esta consulta debe hacer el scraping, o (None, lecturas)
+            si otro nodo las obtuvo mientras esperábamos. (None, None) si el backend
+            falla. Si el dueño del candado
+            muere, el candado expira (lock_ttl) y esta consulta lo toma.
+        """
+        deadline.enter('single_flight')
+        waited = False
+        while True:
+            try:
+                token = await asyncio.wait_for(self.cache.acquire_lock(key), timeout=deadline.remaining())
+            except Exception as e:
+                # Sin backend no hay coordinación posible: se consulta sin candado
+                self.cache_stats['errors'] += 1
+                logger.warning(f"Error en el backend de cache (acquire_lock): {str(e)}")
+                return None, None
+            if token is not None:
+                if waited:
+                    # El dueño anterior pudo publicar y soltar el candado justo después de nuestra
+                    # última lectura: se vuelve a mirar el cache antes de repetir el scraping
+                    cached = await self._cache_call('get', key, deadline=deadline)
+                    if cached is not None:
+                        await self._cache_call('release_lock', key, token)
+                        self.cache_stats['hits'] += 1
+                        return None, cached
+                return token, None
+            if not waited:
+                waited = True
+                self.cache_stats['waits'] += 1
+            remaining = deadline.remaining()
+            await asyncio.sleep(self.single_flight_poll if remaining is None else min(self.single_flight_poll, remaining))
+            deadline.enter('single_flight')
+            cached = await self._cache_call('get', key, deadline=deadline)
+            if cached is not None:
+                self.cache_stats['hits'] += 1
+                return None, cached
+
+    async def _fetch_hedged(self, city: str, lang: str, deadline: Deadline) -> Dict[str, Any]:
+        """
+        Ejecuta la consulta y, si la política de cobertura lo indica, lanza un segundo
+        intento en otro contexto cuando la primera tarda más que el percentil configurado.
+        Gana el primer intento que termina bien y el otro se cancela.
+        
+        Cada intento lleva su propia fase (mismo vencimiento); al terminar, `deadline`
+        queda con la fase del ganador o, si no gana ninguno, la del intento original.
+        """
+        if self.hedge is None:
+            return await self._fetch_weather(city, lang, deadline)
+        
+        self.hedge.requests += 1
+        started = time.monotonic()
+        delay = self.hedge.delay()
+        deadlines = [deadline.fork()]
+        attempts = [asyncio.ensure_future(self._fetch_weather(city, lang, deadlines[0]))]
+        winner = deadlines[0]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done and self.hedge.try_fire():
+                    if self.debug:
+                        logger.debug(f"Cubriendo consulta lenta de '{city}' tras {delay:.2f}s")
+                    deadlines.append(deadline.fork())
+                    attempts.append(asyncio.ensure_future(
+                        self._fetch_weather(city, lang, deadlines[1], variant='hedge')
+                    ))
             
-            # Temperatura
-            data['temperature'] = await self._extract_temperature(page, temp_unit)
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not attempts[0]:
+                            self.hedge.hedges_won += 1
+                            winner = deadlines[1]
+                        self.hedge.record_latency(time.monotonic() - started)
+                        return task.result()
+            # Fallaron todos los intentos: se informa el error del intento original
+            raise attempts[0].exception()
+        finally:
+            deadline.phase = winner.phase
+            # El perdedor (o todos, si nos cancelan) libera su página enseguida
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+                task.add_done_callback(_consume_task_result)
+
+    async def _fetch_weather(
+        self,
+        city: str,
+        lang: str,
+        deadline: Optional[Deadline] = None,
+        variant: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Obtiene las lecturas crudas, probando primero fetch() en la página y el contexto liviano si están activos"""
+        deadline = deadline or Deadline()
+        if self.in_page_fetch and self.archive_mode != 'replay':
+            self.fetch_stats['attempts'] += 1
+            try:
+                return await self._run_inflight(self._fetch_in_page(city, lang, deadline, variant=variant))
+            except (WeatherTimeoutError, BlockedError):
+                raise
+            except Exception as e:
+                if self._closed:
+                    raise
+                # Respuesta sin widget (u otra variante de página): navegar como siempre
+                self.fetch_stats['fallbacks'] += 1
+                if self.debug:
+                    logger.debug(f"fetch() sin widget para '{city}' ({str(e)}), navegando")
+        if self.lite and self.archive_mode != 'replay':
+            self.lite_stats['attempts'] += 1
+            try:
+                return await self._run_inflight(self._fetch_weather_page(city, lang, deadline, lite=True, variant=variant))
+            except (WeatherTimeoutError, BlockedError):
+                raise
+            except Exception as e:
+                if self._closed:
+                    raise
+                # Widget incompleto sin JavaScript: repetir con el contexto completo
+                self.lite_stats['fallbacks'] += 1
+                if self.debug:
+                    logger.debug(f"Modo liviano incompleto para '{city}' ({str(e)}), usando contexto completo")
+        return await self._run_inflight(self._fetch_weather_page(city, lang, deadline, variant=variant))
+
+    async def _run_inflight(self, work: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Corre el trabajo de página en una tarea propia, que close() cancela sin tocar
+        la tarea del llamador: este recibe RuntimeError en lugar de CancelledError.
+        Si cancelan al llamador, la tarea se cancela con él.
+        """
+        task = asyncio.ensure_future(work)
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+        try:
+            await asyncio.wait({task})
+        except asyncio.CancelledError:
+            task.cancel()
+            await asyncio.wait({task})
+            raise
+        if task.cancelled():
+            raise RuntimeError("El scraper ya fue cerrado")
+        return task.result()
+
+    async def _get_fetch_page(self, lang: str, variant: Optional[str], proxy: Optional[ProxyEndpoint], deadline: Deadline) -> Page:
+        """Página de larga vida del contexto, abierta en el buscador, desde la que se hacen los fetch()"""
+        key = self._context_key(lang, False, variant, proxy)
+        page = self._fetch_pages.get(key)
+        if page is not None and not page.is_closed():
+            return page
+        lock = self._fetch_page_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            page = self._fetch_pages.get(key)
+            if page is not None and not page.is_closed():
+                return page
+            context = await self._get_context(lang, False, variant, proxy)
+            # Una página precalentada ya está en el buscador con las cookies de consentimiento
+            page = self._take_warm_page(key)
+            if page is None:
+                page = await context.new_page()
+                try:
+                    await page.goto(f'{self.base_url}/?hl={lang}', wait_until='domcontentloaded', timeout=deadline.timeout_ms())
+                    self._check_blocked(page)
+                except BaseException:
+                    await page.close()
+                    raise
+            self._fetch_pages[key] = page
+            return page
+
+    @contextmanager
+    def _attempt(
+        self,
+        lang: str,
+        deadline: Deadline,
+        lite: bool = False,
+        variant: Optional[str] = None,
+        proxy: Optional[ProxyEndpoint] = None
+    ) -> Iterator[None]:
+        """
+        Contabilidad común de un intento (fetch() en la página o navegación completa).
+
+        Registra el resultado en el proxy (o lo libera si se cancela el intento),
+        refresca la sesión persistida tras un éxito y convierte los errores
+        posteriores al vencimiento del presupuesto en WeatherTimeoutError.
+        """
+        started = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            if proxy:
+                self.proxies.release(proxy)
+            raise
+        except Exception as e:
+            if proxy:
+                # Bloqueos, timeouts y errores de red cuentan contra el endpoint;
+                # un widget incompleto no es culpa del proxy
+                self.proxies.record(
+                    proxy,
+                    time.monotonic() - started,
+                    ok=not isinstance(e, (BlockedError, WeatherTimeoutError, PlaywrightError)),
+                    blocked=isinstance(e, BlockedError)
+                )
+            if deadline.expired() and not isinstance(e, (WeatherTimeoutError, BlockedError)):
+                raise deadline.error() from e
+            raise
+        if proxy:
+            self.proxies.record(proxy, time.monotonic() - started)
+        # Mantener fresca la sesión persistida del contexto usado
+        self._refresh_storage_state(lang, lite, variant, proxy)
+
+    async def _fetch_in_page(
+        self,
+        city: str,
+        lang: str,
+        deadline: Optional[Deadline] = None,
+        variant: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Busca con fetch() desde la página de larga vida y extrae el widget con DOMParser
+
+        Sin navegación, muchas consultas pueden correr a la vez sobre la misma página.
+        Lanza BlockedError si la respuesta redirige al CAPTCHA y Exception si le falta
+        el widget, para que la consulta vuelva a la navegación.
+        """
+        deadline = deadline or Deadline()
+        deadline.enter('context')
+        proxy = self.proxies.choose() if self.proxies else None
+        with self._attempt(lang, deadline, variant=variant, proxy=proxy):
+            page = await self._get_fetch_page(lang, variant, proxy, deadline)
+            url = self._search_url(city, lang)
+            chains = {
+                field: self.selectors.candidates(field, lang)
+                for field in ('widget', 'location', 'temperature', 'condition', 'humidity', 'wind')
+            }
+            deadline.enter('fetch')
+            result = await page.evaluate(IN_PAGE_FETCH_JS, {
+                'url': url,
+                'chains': chains,
+                'timeoutMs': deadline.timeout_ms(),
+                'includeHtml': self.archive_mode == 'record'
+            })
+            if '/sorry/' in result['url'] or result['status'] == 429:
+                raise BlockedError("Error getting weather: blocked by Google (CAPTCHA)")
+            fields = result['fields']
+            if not fields.get('widget'):
+                raise Exception(f"Error getting weather: Widget not found in fetched page (HTTP {result['status']})")
             
-            # Condición
-            condition_elem = await page.query_selector('#wob_dc')
-            if condition_elem:
-                condition = await condition_elem.text_content()
-                # Intentar traducir la condición si existe en el mapeo
-                conditions_map = weather_conditions.get(lang, weather_conditions['en'])
-                for key, value in conditions_map.items():
-                    if value.lower() in condition.lower():
-                        condition = value
-                        break
-                data['condition'] = condition
+            deadline.enter('extraction')
+            texts = {}
+            for field, found in fields.items():
+                if found and field != 'widget':
+                    self.selectors.record(field, lang, found[0])
+                    texts[field] = found[1]
+            data = build_readings(texts, lang)
             
-            # Humedad
-            humidity_elem = await page.query_selector('#wob_hm')
-            if humidity_elem:
-                data['humidity'] = await humidity_elem.text_content()
+            if self.archive_mode == 'record' and result.get('html'):
+                self.archive.save(url, result['html'])
+        return data
+
+    async def _fetch_weather_page(
+        self,
+        city: str,
+        lang: str,
+        deadline: Optional[Deadline] = None,
+        lite: bool = False,
+        variant: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Abre una página, realiza la búsqueda y extrae las lecturas crudas del widget"""
+        deadline = deadline or Deadline()
+        deadline.enter('context')
+        proxy = self.proxies.choose() if self.proxies else None
+        with self._attempt(lang, deadline, lite, variant, proxy):
+            context = await self._get_context(lang, lite, variant, proxy)
+            page = self._take_warm_page(self._context_key(lang, lite, variant, proxy)) or await context.new_page()
+            self._open_pages.add(page)
+            try:
+                # Realizar búsqueda directamente
+                await self._perform_search(page, city, lang, deadline, lite)
+                
+                # Ubicación y temperatura (°F) esperan al widget
+                location = await self._extract_location(page, lang, deadline)
+                temp_f = await self._extract_temperature(page, deadline, lang)
+                
+                deadline.enter('extraction')
+                texts = {}
+                for field in ('condition', 'humidity', 'wind'):
+                    element = await self._probe_field(page, field, lang)
+                    texts[field] = await element.text_content() if element else None
+                
+                # Misma lógica de campos que la extracción offline (ver parsing.build_readings)
+                data = build_readings(dict(texts, location=location, temperature=str(temp_f)), lang)
             
-            # Viento
-            wind_elem = await page.query_selector('#wob_ws')
-            if wind_elem:
-                wind_text = await wind_elem.text_content()
-                try:
-                    wind_value = float(re.search(r'[\d.]+', wind_text).group())
-                    
-                    # Convertir solo si es necesario
-                    if wind_unit == 'mph' and 'km/h' in wind_text.lower():
-                        wind_value = wind_value * 0.621371
-                    
-                    unit_text = 'mph' if wind_unit == 'mph' else 'km/h'
-                    data['wind'] = f"{round(wind_value, 1)} {unit_text}"
-                except (AttributeError, ValueError):
-                    data['wind'] = wind_text
+            except Exception as e:
+                if self.debug and not deadline.expired():
+                    await page.screenshot(path=str(self.debug_dir / f"error_{lang}.png"))
+                    logger.error(f"Error obteniendo clima: {str(e)}")
+                raise
             
-            # Validar datos requeridos
-            required_fields = ['temperature', 'condition', 'humidity', 'wind', 'location']
-            missing = [k for k in required_fields if k not in data]
-            if missing:
-                raise Exception(f"Faltan datos del clima: {', '.join(missing)}")
+            finally:
+                self._open_pages.discard(page)
+                await page.close()
+        return data
+
+    async def get_weather_many(
+        self,
+        cities: List[str],
+        lang: str = 'en',
+        temp_unit: str = None,
+        wind_unit: str = None,
+        concurrency: int = 4,
+        timeout: Optional[float] = None,
+        on_result: Optional[Callable[[str, Any], None]] = None,
+        limiter: Optional[AdaptiveLimiter] = None
+    ) -> List[Any]:
+        """
+        Obtiene el clima de varias ciudades en paralelo
+        
+        Args:
+            cities: Lista de ciudades
+            lang: Código de idioma
+            temp_unit: Unidad de temperatura ('C', 'F', 'K')
+            wind_unit: Unidad de viento ('kmh', 'mph')
+            concurrency: Máximo de consultas simultáneas
+            timeout: Presupuesto total en segundos para todo el lote
+            on_result: Callback opcional `(ciudad, resultado_o_excepción)` a medida que terminan
+            limiter: AdaptiveLimiter opcional que reemplaza a `concurrency`
             
-            return data
+        Returns:
+            Lista con un resultado por ciudad, en el mismo orden. Las consultas
+            que fallan devuelven la excepción en su posición.
+        """
+        async def _lookup(city: str, remaining: Optional[float]) -> Dict[str, Any]:
+            return await self.get_weather(city, lang, temp_unit, wind_unit, timeout=remaining)
+        
+        return await self._run_batch(cities, _lookup, concurrency, timeout, on_result, limiter)
+
+    async def get_readings_many(
+        self,
+        cities: List[str],
+        lang: str = 'en',
+        concurrency: int = 4,
+        timeout: Optional[float] = None,
+        on_result: Optional[Callable[[str, Any], None]] = None,
+        limiter: Optional[AdaptiveLimiter] = None
+    ) -> List[Any]:
+        """Igual que get_weather_many, pero devuelve las lecturas crudas de get_readings"""
+        async def _lookup(city: str, remaining: Optional[float]) -> Dict[str, Any]:
+            return await self.get_readings(city, lang, timeout=remaining)
+        
+        return await self._run_batch(cities, _lookup, concurrency, timeout, on_result, limiter)
+
+    def watch(self, cities: List[str], lang: str = 'en', interval: float = 300, **options) -> WeatherWatcher:
+        """
+        Vigila las ciudades y emite solo los cambios (ver WeatherWatcher)
+        
+        Args:
+            cities: Lista de ciudades
+            lang: Código de idioma
+            interval: Segundos entre sondeos
+            **options: Unidades, umbrales ('temperature', 'humidity', 'wind', 'condition'),
+                'emit_initial', 'concurrency', 'timeout' y 'limiter' (AdaptiveLimiter
+                compartido entre sondeos)
+        
+        Returns:
+            WeatherWatcher, iterable con `async for` o volcable a JSONL con run()
+        """
+        return WeatherWatcher(self, cities, lang, interval, **options)
+
+    async def _run_batch(
+        self,
+        cities: List[str],
+        lookup,
+        concurrency: int,
+        timeout: Optional[float],
+        on_result: Optional[Callable[[str, Any], None]] = None,
+        limiter: Optional[AdaptiveLimiter] = None
+    ) -> List[Any]:
+        """
+        Ejecuta `lookup(city, remaining)` para cada ciudad con presupuesto común.
+        
+        La concurrencia la fija `concurrency`, o el límite adaptativo de `limiter`
+        si se indica, que además recibe la latencia y el resultado de cada consulta.
+        """
+        deadline = Deadline(timeout)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _lookup(city: str) -> Dict[str, Any]:
+            # Cada consulta recibe lo que queda del presupuesto del lote
+            remaining = deadline.remaining()
+            if remaining is not None and remaining <= 0:
+                raise WeatherTimeoutError('queue', timeout)
+            if limiter is None:
+                return await lookup(city, remaining)
             
-        except Exception as e:
-            if self.debug:
-                await page.screenshot(path=str(self.debug_dir / f"error_{lang}.png"))
-                logger.error(f"Error obteniendo clima: {str(e)}")
-            raise
+            started = time.monotonic()
+            try:
+                result = await lookup(city, remaining)
+            except BlockedError:
+                limiter.record(time.monotonic() - started, ok=False, blocked=True)
+                raise
+            except Exception:
+                limiter.record(time.monotonic() - started, ok=False)
+                raise
+            limiter.record(time.monotonic() - started, ok=True)
+            return result
         
-        finally:
-            await page.close()
+        async def _run(city: str) -> Dict[str, Any]:
+            if limiter is None:
+                await semaphore.acquire()
+            else:
+                await limiter.acquire()
+            try:
+                result = await _lookup(city)
+            except Exception as e:
+                if on_result:
+                    on_result(city, e)
+                raise
+            finally:
+                if limiter is None:
+                    semaphore.release()
+                else:
+                    await limiter.release()
+            if on_result:
+                on_result(city, result)
+            return result
+        
+        return await asyncio.gather(*(_run(city) for city in cities), return_exceptions=True)
+
+    async def __aenter__(self) -> 'WeatherScraper':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
 
     async def close(self):
-        """Cierra todos los recursos del navegador"""
+        """
+        Cierra todos los recursos: consultas en curso, páginas, contextos, navegador
+        y el driver de Playwright. Se puede llamar varias veces.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        
+        # Cancelar las consultas en curso (su finally cierra cada página)
+        inflight = [task for task in self._inflight if not task.done()]
+        for task in inflight:
+            task.cancel()
+        if self._warmup_task and not self._warmup_task.done():
+            self._warmup_task.cancel()
+            inflight.append(self._warmup_task)
+        if inflight:
+            await asyncio.gather(*inflight, return_exceptions=True)
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        
+        self.aliases.flush()
+        
+        # Guardar la sesión final de cada contexto antes de cerrar (una vez por archivo,
+        # prefiriendo el contexto completo al liviano y al de cobertura)
+        saved = set()
+        for key, (lang, lite, variant, proxy) in sorted(
+            self._context_params.items(), key=lambda item: (item[1][1], item[1][2] is not None)
+        ):
+            path = self._storage_state_path(lang, proxy)
+            if not path or path in saved or key not in self._contexts:
+                continue
+            saved.add(path)
+            try:
+                await self.save_storage_state(lang, lite, variant, proxy)
+            except Exception as e:
+                logger.error(f"Error guardando storage_state de '{key}': {str(e)}")
+        
+        # Cada paso se intenta aunque falle el anterior, para no dejar procesos colgados
+        pages = list(self._open_pages) + [page for pages in self._warm_pages.values() for page in pages]
+        pages += list(self._fetch_pages.values())
+        self._open_pages.clear()
+        self._warm_pages.clear()
+        self._fetch_pages.clear()
+        for resource in pages + list(self._contexts.values()) + ([self._browser] if self._browser else []):
+            try:
+                await resource.close()
+            except Exception as e:
+                logger.warning(f"Error cerrando {type(resource).__name__}: {str(e)}")
+        self._contexts.clear()
+        self._context_params.clear()
+        self._browser = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.warning(f"Error deteniendo el driver de Playwright: {str(e)}")
+            self._playwright = None
+        if self.profiler:
+            await self.profiler.stop()
+
+    def resources(self) -> Dict[str, Any]:
+        """
+        Recursos abiertos en este momento, para vigilar fugas en servicios de larga duración
+        
+        Returns:
+            Dict con 'contexts', 'pages' (todas las de los contextos), 'warm_pages',
+            'fetch_pages' (páginas de larga vida de in_page_fetch),
+            'inflight' (consultas en curso), 'background_tasks', 'browser', 'driver',
+            'closed' y 'child_processes' (procesos descendientes; None fuera de Linux)
+        """
+        pages = 0
         for context in self._contexts.values():
-            await context.close()
-        if self._browser:
-            await self._browser.close()
+            try:
+                pages += len(context.pages)
+            except Exception:
+                pass
+        children = descendant_pids()
+        return {
+            'contexts': len(self._contexts),
+            'pages': pages,
+            'warm_pages': sum(len(pages) for pages in self._warm_pages.values()),
+            'fetch_pages': len(self._fetch_pages),
+            'inflight': len(self._inflight),
+            'background_tasks': len(self._background_tasks),
+            'browser': self._browser is not None,
+            'driver': self._playwright is not None,
+            'closed': self._closed,
+            'child_processes': len(children) if children is not None else None
+        }
 
 # Crear una función helper para uso síncrono
 def get_weather_sync(city: str, lang: str = 'en', temp_unit: str = 'C', wind_unit: str = 'kmh') -> Dict[str, Any]:
     """Versión síncrona del scraper para compatibilidad"""
-    import asyncio
-    scraper = WeatherScraper()
-    return asyncio.run(scraper.get_weather(city, lang, temp_unit, wind_unit))
\ No newline at end of file
+    async def _run() -> Dict[str, Any]:
+        async with WeatherScraper() as scraper:
+            return await scraper.get_weather(city, lang, temp_unit, wind_unit)
+    return asyncio.run(_run())
\ No newline at end of file
@@ -18,10 +18,14 @@ setuptools.setup(
     python_requires=">=3.9",
     license_files=("LICENSE",),
     install_requires=[
-        "playwright>=1.41.0",
+        "playwright>=1.49.0",  # canal chromium-headless-shell (perfil headless-shell)
         "beautifulsoup4>=4.10.0",
         "html5lib>=1.1",  # Parser alternativo para BS4
         "lxml>=4.9.0",    # Parser alternativo para BS4
         "nest-asyncio>=1.5.8"  # Agregamos nest-asyncio
-    ]
+    ],
+    extras_require={
+        # Exportación columnar de resultados masivos
+        "bulk": ["numpy>=1.21", "pandas>=1.3", "pyarrow>=8.0"]
+    }
 )
\ No newline at end of file
@@ -0,0 +1,68 @@
+import pytest
+
+from google_weather.bulk import WeatherResultSet
+from google_weather.units import convert_temperature, format_readings, parse_wind
+
+READINGS = [
+    {'location': 'New York, NY', 'temperature_f': 50.0, 'condition': 'Cloudy',
+     'humidity': '40%', 'wind_value': 10.0, 'wind_is_mph': True, 'wind_text': '10 mph'},
+    {'location': 'Paris, France', 'temperature_f': 68.0, 'condition': 'Sunny',
+     'humidity': '55%', 'wind_value': 16.0, 'wind_is_mph': False, 'wind_text': '16 km/h'},
+]
+
+
+def test_format_readings_units():
+    """Test that raw readings are formatted like get_weather results"""
+    result = format_readings(READINGS[1], 'C', 'kmh')
+    assert result == {
+        'location': 'Paris, France',
+        'temperature': '20.0°C',
+        'condition': 'Sunny',
+        'humidity': '55%',
+        'wind': '16.0 km/h'
+    }
+    assert format_readings(READINGS[1], 'K', 'mph')['temperature'] == '293.1°K'
+    assert format_readings(READINGS[1], 'F', 'mph')['wind'] == '9.9 mph'
+    assert format_readings(READINGS[0], 'F', 'mph')['wind'] == '10.0 mph'
+
+
+def test_parse_wind_and_invalid_unit():
+    """Test wind parsing and temperature unit validation"""
+    assert parse_wind('16 km/h') == (16.0, False)
+    assert parse_wind('7 mph') == (7.0, True)
+    assert parse_wind('calm') == (None, False)
+    with pytest.raises(ValueError):
+        convert_temperature(50.0, 'X')
+
+
+def test_result_set_vectorized_conversions():
+    """Test columnar export and vectorized unit conversions"""
+    np = pytest.importorskip('numpy')
+    results = WeatherResultSet.from_readings(READINGS + [Exception('failed')], cities=['NYC', 'Paris', 'Nowhere'])
+    assert len(results) == 2
+
+    np.testing.assert_allclose(results.temperature('C'), [10.0, 20.0])
+    np.testing.assert_allclose(results.temperature('K'), [283.15, 293.15])
+    np.testing.assert_allclose(results.wind('mph'), [10.0, 16.0 * 0.621371])
+    np.testing.assert_allclose(results.wind('kmh'), [10.0 / 0.621371, 16.0])
+    np.testing.assert_allclose(results.humidity(), [40.0, 55.0])
+
+    # Las columnas crudas comparten memoria con el contenedor
+    assert not results.temperature('F').flags.owndata
+
+
+def test_result_set_exports(tmp_path):
+    """Test pandas, Arrow and Parquet exports"""
+    pytest.importorskip('pandas')
+    pq = pytest.importorskip('pyarrow.parquet')
+    results = WeatherResultSet.from_readings(READINGS, cities=['NYC', 'Paris'], lang='en')
+
+    df = results.to_pandas(temp_unit='C')
+    assert list(df['city']) == ['NYC', 'Paris']
+    assert df['temperature'].round(1).tolist() == [10.0, 20.0]
+
+    path = tmp_path / 'weather.parquet'
+    results.to_parquet(str(path), temp_unit='F', wind_unit='mph')
+    table = pq.read_table(str(path))
+    assert table.column('temperature').to_pylist() == [50.0, 68.0]
+    assert table.column('lang').to_pylist() == ['en', 'en']
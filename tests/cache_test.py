@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from google_weather.cache import AliasIndex, WeatherCache, normalize_query
+from google_weather.weather import WeatherScraper
+
+
+def test_normalize_query():
+    """Test that trivial variations normalize to the same key"""
+    assert normalize_query('New York') == 'new york'
+    assert normalize_query('  NEW   york, ') == 'new york'
+    assert normalize_query('new+york') == 'new york'
+
+
+def test_alias_index_learn_and_resolve(tmp_path):
+    """Test that learned aliases resolve to the canonical location and persist"""
+    path = tmp_path / 'aliases.json'
+    index = AliasIndex(str(path))
+    assert index.resolve('NYC', 'en') is None
+
+    index.learn('NYC', 'en', 'New York, NY')
+    index.learn('new york city', 'en', 'New York, NY')
+
+    assert index.resolve('nyc', 'en') == 'New York, NY'
+    assert index.resolve('New York City', 'en') == 'New York, NY'
+    # La propia ubicación canónica también queda registrada
+    assert index.resolve('new york, ny', 'en') == 'New York, NY'
+    # Los alias son por idioma
+    assert index.resolve('NYC', 'es') is None
+
+    index.flush()
+    reloaded = AliasIndex(str(path))
+    assert reloaded.resolve('NYC', 'en') == 'New York, NY'
+    assert json.loads(path.read_text(encoding='utf-8'))['en:nyc'] == 'New York, NY'
+
+
+def test_alias_index_batches_writes(tmp_path):
+    """Test that new aliases are written in batches rather than one file rewrite each"""
+    path = tmp_path / 'aliases.json'
+    index = AliasIndex(str(path), save_every=4, save_interval=3600)
+    index.learn('NYC', 'en', 'New York, NY')
+    assert not path.exists()
+
+    # Volver a aprender un alias conocido no cuenta como cambio
+    index.learn('NYC', 'en', 'New York, NY')
+    index.learn('Big Apple', 'en', 'New York, NY')
+    assert not path.exists()
+    index.learn('LA', 'en', 'Los Angeles, CA')
+    assert len(json.loads(path.read_text(encoding='utf-8'))) == 5
+
+    index.learn('SF', 'en', 'San Francisco, CA')
+    assert len(json.loads(path.read_text(encoding='utf-8'))) == 5
+    index.flush()
+    assert len(json.loads(path.read_text(encoding='utf-8'))) == 7
+
+    # Pasado el intervalo, el siguiente alias nuevo se guarda enseguida
+    index.save_interval = 0
+    index.learn('Philly', 'en', 'Philadelphia, PA')
+    assert len(json.loads(path.read_text(encoding='utf-8'))) == 9
+
+
+@pytest.mark.asyncio
+async def test_scraper_learns_aliases_only_when_useful(tmp_path):
+    """Test that aliases are skipped without a cache or a file, and flushed on close"""
+    async def fetch(city, lang, deadline=None, variant=None):
+        return {'location': 'New York, NY'}
+
+    scraper = WeatherScraper()
+    scraper._fetch_weather = fetch
+    await scraper.get_readings('NYC')
+    assert len(scraper.aliases) == 0
+
+    path = tmp_path / 'aliases.json'
+    scraper = WeatherScraper(alias_path=str(path))
+    scraper._fetch_weather = fetch
+    await scraper.get_readings('NYC')
+    assert len(scraper.aliases) == 2 and not path.exists()
+    await scraper.close()
+    assert json.loads(path.read_text(encoding='utf-8'))['en:nyc'] == 'New York, NY'
+
+
+def test_weather_cache_expiration():
+    """Test that cached results expire after the TTL"""
+    cache = WeatherCache(ttl=0)
+    cache.set('key', {'temperature': '20.0°C'})
+    assert cache.get('key') is None
+
+    cache = WeatherCache(ttl=60)
+    cache.set('key', {'temperature': '20.0°C'})
+    result = cache.get('key')
+    assert result == {'temperature': '20.0°C'}
+    # Se devuelve una copia
+    result['temperature'] = 'x'
+    assert cache.get('key')['temperature'] == '20.0°C'
@@ -0,0 +1,195 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from google_weather.cluster import Coordinator, HashRing, RemoteLookupError, Worker
+from google_weather.errors import BlockedError
+
+CITIES = [f"City {i}" for i in range(40)]
+
+# Trabajador real en otro proceso; no responde nunca las ciudades 'Hang*' ni, si es el nodo 'hung', ninguna
+WORKER_SCRIPT = '''
+import asyncio, sys
+from google_weather.cluster import Worker
+
+class Scraper:
+    async def get_readings(self, city, lang='en', timeout=None):
+        if city.startswith('Hang') or sys.argv[2] == 'hung':
+            await asyncio.sleep(3600)
+        return {'location': city, 'node': sys.argv[2]}
+
+asyncio.run(Worker(Scraper(), sys.argv[1], sys.argv[2]).run())
+'''
+
+
+class FakeScraper:
+    """Scraper de reemplazo que registra qué ciudades consultó el nodo"""
+
+    def __init__(self, delay: float = 0.0, hang: bool = False):
+        self.delay = delay
+        self.hang = hang
+        self.cities = []
+
+    async def get_readings(self, city, lang='en', timeout=None):
+        self.cities.append(city)
+        if self.hang:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(self.delay)
+        if city == 'Blocked':
+            raise BlockedError("CAPTCHA")
+        if city == 'Broken':
+            raise ValueError("sin widget")
+        return {'location': city, 'temperature_f': 68.0}
+
+
+async def _start_worker(coordinator, node_id, scraper, concurrency=4):
+    task = asyncio.ensure_future(Worker(scraper, coordinator.address, node_id, concurrency).run())
+    await coordinator.wait_for_nodes(len(coordinator.nodes) + 1, timeout=5)
+    return task
+
+
+def test_hash_ring_moves_few_keys():
+    """Test that adding a node only moves the keys it takes over"""
+    ring = HashRing()
+    for node in ('a', 'b', 'c'):
+        ring.add(node)
+    keys = [f"en|city {i}" for i in range(1000)]
+    before = {key: ring.node_for(key) for key in keys}
+    assert set(before.values()) == {'a', 'b', 'c'}
+
+    ring.add('d')
+    after = {key: ring.node_for(key) for key in keys}
+    moved = [key for key in keys if before[key] != after[key]]
+    assert all(after[key] == 'd' for key in moved)
+    assert 150 < len(moved) < 350
+
+    ring.remove('d')
+    assert {key: ring.node_for(key) for key in keys} == before
+
+
+@pytest.mark.asyncio
+async def test_cities_go_to_their_ring_owner():
+    """Test that results stream back and each city runs on its owner node"""
+    coordinator = Coordinator()
+    await coordinator.start()
+    scrapers = {node: FakeScraper() for node in ('a', 'b', 'c')}
+    tasks = [await _start_worker(coordinator, node, scraper) for node, scraper in scrapers.items()]
+    try:
+        streamed = {}
+        async for city, readings in coordinator.stream(CITIES + ['Blocked', 'Broken']):
+            streamed[city] = readings
+        assert streamed['City 7'] == {'location': 'City 7', 'temperature_f': 68.0}
+        assert isinstance(streamed['Blocked'], BlockedError)
+        assert isinstance(streamed['Broken'], RemoteLookupError)
+        assert streamed['Broken'].kind == 'ValueError'
+
+        for node, scraper in scrapers.items():
+            assert scraper.cities
+            assert all(coordinator.ring.node_for(f"en|{city.lower()}") == node for city in scraper.cities)
+    finally:
+        await coordinator.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_failed_node_work_is_requeued():
+    """Test that lookups in flight on a lost node finish on the remaining nodes"""
+    coordinator = Coordinator()
+    await coordinator.start()
+    healthy = FakeScraper()
+    stuck = FakeScraper(hang=True)
+    healthy_task = await _start_worker(coordinator, 'healthy', healthy)
+    stuck_task = await _start_worker(coordinator, 'stuck', stuck)
+    try:
+        lookup = asyncio.ensure_future(coordinator.get_readings_many(CITIES))
+        while not stuck.cities:
+            await asyncio.sleep(0.01)
+        stuck_task.cancel()
+
+        results = await asyncio.wait_for(lookup, timeout=5)
+        assert [r['location'] for r in results] == CITIES
+        assert coordinator.requeued > 0
+        assert coordinator.nodes == ['healthy']
+    finally:
+        await coordinator.close()
+        await asyncio.gather(healthy_task, stuck_task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_joining_node_takes_pending_work():
+    """Test that queued lookups rebalance onto a node that joins mid-run"""
+    coordinator = Coordinator()
+    await coordinator.start()
+    first = FakeScraper(delay=0.02)
+    second = FakeScraper(delay=0.02)
+    tasks = [await _start_worker(coordinator, 'first', first, concurrency=1)]
+    try:
+        lookup = asyncio.ensure_future(coordinator.get_readings_many(CITIES))
+        await asyncio.sleep(0.05)
+        tasks.append(await _start_worker(coordinator, 'second', second, concurrency=1))
+
+        results = await asyncio.wait_for(lookup, timeout=5)
+        assert len(results) == len(CITIES)
+        assert second.cities
+        assert all(coordinator.ring.node_for(f"en|{city.lower()}") == 'second' for city in second.cities)
+    finally:
+        await coordinator.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _spawn_worker(coordinator, node_id):
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parents[1]))
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, '-c', WORKER_SCRIPT, coordinator.address, node_id, env=env
+    )
+    await coordinator.wait_for_nodes(len(coordinator.nodes) + 1, timeout=30)
+    return process
+
+
+@pytest.mark.asyncio
+async def test_hung_node_job_moves_to_another_node():
+    """Test that a job a worker process never answers is retried on another node after its deadline"""
+    coordinator = Coordinator(job_deadline=0.3)
+    await coordinator.start()
+    processes = []
+    try:
+        processes.append(await _spawn_worker(coordinator, 'hung'))
+        processes.append(await _spawn_worker(coordinator, 'spare'))
+        # Ciudades cuyo dueño en el anillo es el nodo colgado
+        city, hang_city = (
+            next(f"{prefix} {i}" for i in range(1000) if coordinator.ring.node_for(f"en|{prefix.lower()} {i}") == 'hung')
+            for prefix in ('City', 'Hang')
+        )
+        # 'Hang' tampoco responde en 'spare': agota sus intentos y falla con un error claro
+        coordinator.max_attempts = 2
+        results = await asyncio.wait_for(coordinator.get_readings_many([city, hang_city]), timeout=10)
+        assert results[0] == {'location': city, 'node': 'spare'}
+        assert isinstance(results[1], RemoteLookupError)
+        assert results[1].kind == 'Deadline'
+        assert coordinator.stats()['expired'] == 3
+    finally:
+        await coordinator.close()
+        for process in processes:
+            await asyncio.wait_for(process.wait(), timeout=10)
+
+
+@pytest.mark.asyncio
+async def test_close_and_missing_nodes_fail_pending_jobs():
+    """Test that queued jobs fail when no node connects and when the coordinator closes"""
+    coordinator = Coordinator(node_wait=0.05)
+    await coordinator.start()
+    with pytest.raises(RemoteLookupError) as error:
+        await asyncio.wait_for(coordinator.submit('Madrid'), timeout=5)
+    assert error.value.kind == 'NoNodes'
+
+    worker = await _start_worker(coordinator, 'stuck', FakeScraper(hang=True))
+    lookup = coordinator.submit('Madrid')
+    await asyncio.sleep(0.05)
+    await coordinator.close()
+    with pytest.raises(RemoteLookupError) as error:
+        await asyncio.wait_for(lookup, timeout=5)
+    assert (error.value.kind, error.value.node) == ('Closed', 'stuck')
+    await asyncio.gather(worker, return_exceptions=True)
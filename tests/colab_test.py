@@ -0,0 +1,85 @@
+import pytest
+
+import google_weather.colab as colab_module
+from google_weather.colab import ColabWeatherClient
+
+
+class FakeScraper:
+    """Scraper de reemplazo: registra los lotes y cuántas veces se cerró"""
+
+    def __init__(self, debug=False, **options):
+        self.options = options
+        self.batches = []
+        self.closes = 0
+
+    async def get_weather(self, city, lang='en', temp_unit='C', wind_unit='kmh'):
+        return {'location': city, 'lang': lang}
+
+    async def get_weather_many(self, cities, lang='en', temp_unit=None, wind_unit=None,
+                               concurrency=4, timeout=None, on_result=None, limiter=None):
+        self.batches.append((list(cities), concurrency))
+        results = []
+        for city in cities:
+            result = ValueError("sin widget") if city == 'Broken' else {'location': city, 'temperature': '20.0°C'}
+            if on_result:
+                on_result(city, result)
+            results.append(result)
+        return results
+
+    async def close(self):
+        self.closes += 1
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(colab_module, 'WeatherScraper', FakeScraper)
+    return ColabWeatherClient(concurrency=3, cache_ttl=60)
+
+
+def test_get_weather_many_keeps_order_and_failures(client, capsys):
+    """Test that batch results follow the input order and keep failures as values"""
+    results = client.get_weather_many(['Madrid', 'Broken', 'Lima', 'Madrid'], lang='es')
+
+    assert list(results) == ['Madrid', 'Broken', 'Lima']
+    assert results['Lima']['location'] == 'Lima'
+    assert isinstance(results['Broken'], ValueError)
+    # Una ciudad repetida se consulta una sola vez
+    assert client.scraper.batches == [(['Madrid', 'Broken', 'Lima'], 3)]
+    assert client.scraper.options == {'cache_ttl': 60}
+    assert capsys.readouterr().out.endswith('Clima: 3/3\n')
+
+    client.get_weather_many(['Quito'], concurrency=1, progress=False)
+    assert client.scraper.batches[-1] == (['Quito'], 1)
+    assert capsys.readouterr().out == ''
+
+
+def test_progress_counts_results(monkeypatch, client):
+    """Test that the progress bar advances once per result and reports failures"""
+    bars = []
+
+    class Bar(colab_module._TextProgress):
+        def __init__(self, total, desc):
+            self.postfix = None
+            self.closed = False
+            super().__init__(total, desc)
+            bars.append(self)
+
+        def set_postfix_str(self, text):
+            self.postfix = text
+
+        def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(colab_module, '_progress_bar', Bar)
+    client.get_weather_many(['Madrid', 'Broken', 'Lima'])
+    assert (bars[0].total, bars[0].n, bars[0].postfix, bars[0].closed) == (3, 3, 'errores: 1', True)
+
+
+def test_close_is_idempotent_and_context_manager_closes(monkeypatch):
+    """Test that close() releases the scraper once and the context manager calls it"""
+    monkeypatch.setattr(colab_module, 'WeatherScraper', FakeScraper)
+    with ColabWeatherClient() as weather:
+        assert weather.get_weather('Paris', lang='fr') == {'location': 'Paris', 'lang': 'fr'}
+    assert weather.scraper.closes == 1
+    weather.close()
+    assert weather.scraper.closes == 1
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from google_weather.concurrency import AdaptiveLimiter
+from google_weather.errors import BlockedError
+from google_weather.scheduler import FairScheduler
+from google_weather.weather import WeatherScraper
+
+
+def test_additive_increase_when_healthy_and_saturated():
+    """Test that a saturated, healthy window raises the limit by one"""
+    limiter = AdaptiveLimiter(initial=4, window=5, target_p95=1.0)
+    limiter.observe_in_flight(4)
+    for _ in range(5):
+        limiter.record(0.2)
+    assert limiter.limit == 5
+    assert limiter.history[-1]['reason'] == 'healthy'
+
+    # Sin saturar el límite no se sube
+    for _ in range(5):
+        limiter.record(0.2)
+    assert limiter.limit == 5
+    assert limiter.history[-1]['reason'] == 'underused'
+
+
+def test_multiplicative_decrease_on_degradation():
+    """Test that latency, errors and blocks halve the limit"""
+    limiter = AdaptiveLimiter(initial=16, window=4, target_p95=1.0, min_limit=2)
+    for _ in range(4):
+        limiter.record(3.0)
+    assert limiter.limit == 8
+    assert limiter.history[-1]['reason'] == 'latency'
+
+    for _ in range(3):
+        limiter.record(0.1)
+    limiter.record(0.1, ok=False, blocked=True)
+    assert limiter.limit == 4
+    assert limiter.history[-1]['reason'] == 'blocked'
+
+    for _ in range(4):
+        limiter.record(0.1, ok=False)
+    assert limiter.limit == 2
+    for _ in range(4):
+        limiter.record(0.1, ok=False)
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_respects_and_feeds_limiter():
+    """Test that the batch path never exceeds the adaptive limit and reports outcomes"""
+    scraper = WeatherScraper()
+    limiter = AdaptiveLimiter(initial=2, window=100)
+    running = 0
+    peak = 0
+
+    async def lookup(city, lang='en', timeout=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if city == 'blocked':
+            raise BlockedError('captcha')
+        return {'location': city}
+
+    scraper.get_readings = lookup
+    results = await scraper.get_readings_many(['a', 'b', 'c', 'blocked', 'd'], limiter=limiter)
+
+    assert peak == 2
+    assert isinstance(results[3], BlockedError)
+    assert len(limiter._samples) == 5
+    assert sum(1 for s in limiter._samples if s[2]) == 1
+
+
+@pytest.mark.asyncio
+async def test_scheduler_uses_limiter():
+    """Test that the scheduler dispatches up to the adaptive limit"""
+    running = 0
+    peak = 0
+
+    class FakeScraper:
+        async def get_weather(self, city, lang='en', temp_unit=None, wind_unit=None, timeout=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {'location': city}
+
+    limiter = AdaptiveLimiter(initial=3, window=100)
+    scheduler = FairScheduler(FakeScraper(), concurrency=1, limiter=limiter)
+    await asyncio.gather(*(scheduler.get_weather(f'c{i}') for i in range(9)))
+    assert peak == 3
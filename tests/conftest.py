@@ -1,5 +1,9 @@
+import asyncio
+
 import pytest
 
+import google_weather.weather as weather_module
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for each test case."""
@@ -7,4 +11,203 @@ def event_loop():
     policy = asyncio.get_event_loop_policy()
     loop = policy.new_event_loop()
     yield loop
-    loop.close() 
\ No newline at end of file
+    loop.close()
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+    async def text_content(self):
+        return self.text
+
+
+class FakePage:
+    """
+    Página de reemplazo con un marcado fijo (selector -> texto).
+
+    goto() espera a `driver.navigation` y luego llama a `driver.on_goto(page, url)`,
+    que puede cambiar `url`, `elements` o `html`, o lanzar un error de navegación.
+    Sin `driver.hang_waits`, wait_for_selector() falla enseguida si el selector no
+    está; con él, agota su timeout como Playwright.
+    """
+
+    def __init__(self, context=None, elements=None):
+        self.context = context
+        self.elements = dict(elements or {})
+        self.html = '<html><body></body></html>'
+        self.url = 'about:blank'
+        self.gotos = []
+        self.queries = []
+        self.waits = []
+        self.evaluations = []
+        self.active = 0
+        self.max_active = 0
+        self.closed = False
+
+    @property
+    def driver(self):
+        return self.context.browser.driver if self.context is not None else None
+
+    async def goto(self, url, **options):
+        self.gotos.append(url)
+        if self.driver is not None:
+            await self.driver.navigation.wait()
+            self.url = url
+            if self.driver.on_goto:
+                self.driver.on_goto(self, url)
+        else:
+            self.url = url
+
+    async def query_selector(self, selector):
+        self.queries.append(selector)
+        return FakeElement(self.elements[selector]) if selector in self.elements else None
+
+    async def wait_for_selector(self, selector, state='attached', timeout=None):
+        self.waits.append(selector)
+        if any(part.strip() in self.elements for part in selector.split(',')):
+            return FakeElement(self.elements.get(selector.split(',')[0].strip()))
+        if self.driver is not None and self.driver.hang_waits:
+            await asyncio.sleep((timeout or 30000) / 1000)
+        raise TimeoutError(f"Timeout {timeout}ms esperando {selector}")
+
+    async def evaluate(self, script, args=None):
+        self.evaluations.append(args)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            driver = self.driver
+            if driver is None or driver.evaluate is None:
+                return None
+            await asyncio.sleep(driver.evaluate_delay)
+            return driver.evaluate(self, script, args)
+        finally:
+            self.active -= 1
+
+    async def content(self):
+        return self.html
+
+    async def screenshot(self, **options):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+        if self.context is not None and self in self.context.pages:
+            self.context.pages.remove(self)
+
+
+class FakeContext:
+    """Contexto de reemplazo; como en Playwright, `pages` solo lista las páginas abiertas"""
+
+    def __init__(self, browser=None, options=None):
+        self.browser = browser
+        self.options = options or {}
+        self.pages = []
+        self.new_pages = 0
+        self.routes = []
+        self.fail_storage_state = False
+        self.storage_state_calls = 0
+        self.closed = False
+
+    async def new_page(self):
+        page = FakePage(self)
+        if self.browser is not None and self.browser.driver.markup:
+            page.elements = dict(self.browser.driver.markup(self))
+        self.pages.append(page)
+        self.new_pages += 1
+        return page
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    async def add_init_script(self, script):
+        pass
+
+    async def storage_state(self):
+        self.storage_state_calls += 1
+        if self.fail_storage_state:
+            raise RuntimeError('Target closed')
+        return {'cookies': [{'name': 'CONSENT', 'value': 'YES'}], 'origins': []}
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    """Navegador de reemplazo; para uno compartido, close() solo corta la conexión (como Playwright)"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.contexts = []
+        self.closed = False
+
+    async def new_context(self, **options):
+        context = FakeContext(self, options)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeDriver:
+    """
+    Reemplaza a async_playwright(): registra arranques, paradas y cómo se obtuvo
+    el navegador (launch, connect o connect_over_cdp).
+
+    `markup(context)` da el marcado inicial de cada página nueva, `on_goto` y
+    `evaluate(page, script, args)` personalizan las páginas (ver FakePage).
+    """
+
+    def __init__(self, fail_launch=False):
+        self.fail_launch = fail_launch
+        self.starts = 0
+        self.stops = 0
+        self.calls = []
+        self.launch_options = []
+        self.executable_path = None
+        self.navigation = asyncio.Event()
+        self.navigation.set()
+        self.markup = None
+        self.on_goto = None
+        self.evaluate = None
+        self.evaluate_delay = 0.0
+        self.hang_waits = False
+        self.browser = FakeBrowser(self)
+        self.chromium = self
+
+    def __call__(self):
+        return self
+
+    async def start(self):
+        self.starts += 1
+        return self
+
+    async def stop(self):
+        self.stops += 1
+
+    async def launch(self, **options):
+        self.calls.append(('launch', None))
+        self.launch_options.append(options)
+        if self.fail_launch:
+            raise RuntimeError("no se pudo lanzar Chromium")
+        return self.browser
+
+    async def connect(self, endpoint):
+        self.calls.append(('connect', endpoint))
+        return self.browser
+
+    async def connect_over_cdp(self, endpoint):
+        self.calls.append(('connect_over_cdp', endpoint))
+        return self.browser
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    """Driver de Playwright de reemplazo instalado en google_weather.weather"""
+    driver = FakeDriver()
+    monkeypatch.setattr(weather_module, 'async_playwright', driver)
+    return driver
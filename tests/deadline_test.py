@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from google_weather.deadline import Deadline
+from google_weather.errors import WeatherTimeoutError
+from google_weather.weather import WeatherScraper
+
+
+def test_deadline_without_limit():
+    """Test that an unlimited deadline keeps Playwright defaults"""
+    deadline = Deadline()
+    assert deadline.remaining() is None
+    assert deadline.timeout_ms() is None
+    assert deadline.timeout_ms(5000) == 5000
+    assert not deadline.expired()
+
+
+def test_deadline_caps_timeouts():
+    """Test that timeouts never exceed the remaining budget"""
+    deadline = Deadline(1.0)
+    assert deadline.timeout_ms(5000) <= 1000
+    assert deadline.timeout_ms(10) == 10
+
+
+def test_deadline_expired_reports_phase():
+    """Test that an expired deadline reports the phase that ran out of time"""
+    deadline = Deadline(0)
+    with pytest.raises(WeatherTimeoutError) as exc_info:
+        deadline.enter('navigation')
+    assert exc_info.value.phase == 'navigation'
+    assert 'Error getting weather' in str(exc_info.value)
+
+
+@pytest.mark.asyncio
+async def test_get_weather_timeout_cancels_lookup():
+    """Test that get_weather stops a slow lookup when the budget runs out"""
+    scraper = WeatherScraper()
+    cancelled = []
+
+    async def slow_fetch(city, lang, deadline):
+        deadline.enter('widget')
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(city)
+            raise
+
+    scraper._fetch_weather = slow_fetch
+    with pytest.raises(WeatherTimeoutError) as exc_info:
+        await scraper.get_weather('Paris', timeout=0.05)
+    assert exc_info.value.phase == 'widget'
+    assert cancelled == ['Paris']
+
+
+@pytest.mark.asyncio
+async def test_get_weather_many_shares_budget():
+    """Test that a batch returns results and timeouts in order"""
+    scraper = WeatherScraper()
+
+    async def fetch(city, lang, deadline):
+        deadline.enter('widget')
+        if city == 'Slow':
+            await asyncio.sleep(10)
+        return {
+            'location': city,
+            'temperature_f': 68.0,
+            'condition': 'Sunny',
+            'humidity': '50%',
+            'wind_value': 10.0,
+            'wind_is_mph': False,
+            'wind_text': '10 km/h'
+        }
+
+    scraper._fetch_weather = fetch
+    results = await scraper.get_weather_many(['Paris', 'Slow', 'Rome'], temp_unit='C', concurrency=2, timeout=0.1)
+    assert results[0]['location'] == 'Paris'
+    assert results[0]['temperature'] == '20.0°C'
+    assert isinstance(results[1], WeatherTimeoutError)
+    assert results[2]['location'] == 'Rome'
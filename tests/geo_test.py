@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from google_weather.geo import SpatialIndex, encode_geohash, haversine_km
+from google_weather.weather import WeatherScraper
+
+READINGS = {
+    'location': 'Madrid, Spain',
+    'temperature_f': 68.0,
+    'condition': 'Sunny',
+    'humidity': '40%',
+    'wind_text': '10 km/h',
+    'wind_value': 10.0,
+    'wind_is_mph': False
+}
+
+
+def test_geohash_and_distance():
+    """Test geohash encoding against known values and haversine distances"""
+    assert encode_geohash(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    assert encode_geohash(-34.6037, -58.3816, 5) == '69y7p'
+    # Madrid - Barcelona ~505 km
+    assert haversine_km(40.4168, -3.7038, 41.3874, 2.1686) == pytest.approx(505, abs=5)
+
+
+def test_nearest_within_radius_across_cells():
+    """Test that the nearest fresh entry is found even in a neighbouring cell"""
+    index = SpatialIndex(ttl=60, precision=5)
+    index.add(40.4168, -3.7038, dict(READINGS, location='Madrid'))
+    index.add(40.4500, -3.7000, dict(READINGS, location='Chamartín'))
+    index.add(41.3874, 2.1686, dict(READINGS, location='Barcelona'))
+
+    distance, readings = index.nearest(40.4200, -3.7050, radius_km=5)
+    assert readings['location'] == 'Madrid'
+    assert distance < 1
+
+    assert index.nearest(40.6, -3.7, radius_km=5) is None
+    # Un radio grande cruza muchas celdas
+    assert index.nearest(40.9, -0.7, radius_km=300)[1]['location'] in ('Madrid', 'Chamartín', 'Barcelona')
+    assert (index.hits, index.misses) == (2, 1)
+
+
+def test_expired_entries_are_dropped():
+    """Test that entries older than the TTL are not returned"""
+    index = SpatialIndex(ttl=0.01)
+    index.add(40.4168, -3.7038, READINGS)
+    time.sleep(0.02)
+    assert index.nearest(40.4168, -3.7038, 5) is None
+    assert len(index) == 0
+
+
+def test_wide_radius_scans_occupied_cells():
+    """Test that a radius covering more cells than the index holds does not enumerate the grid"""
+    index = SpatialIndex(ttl=60, precision=5)
+    index.add(40.4168, -3.7038, dict(READINGS, location='Madrid'))
+    index.add(48.8566, 2.3522, dict(READINGS, location='Paris'))
+
+    started = time.monotonic()
+    distance, readings = index.nearest(45.0, 0.0, radius_km=1000)
+    assert time.monotonic() - started < 0.05
+    assert readings['location'] == 'Paris'
+    assert index.nearest(45.0, 0.0, radius_km=100) is None
+
+
+def test_sweep_drops_entries_never_queried_again():
+    """Test that expired entries in cells no query touches are swept on add"""
+    index = SpatialIndex(ttl=0.01)
+    index.add(40.4168, -3.7038, READINGS)
+    index.add(-34.6037, -58.3816, READINGS)
+    time.sleep(0.02)
+    index.add(35.6762, 139.6503, READINGS)
+    assert len(index) == 1
+    assert len(index._cells) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_weather_at_scrapes_only_on_miss():
+    """Test that nearby coordinates are answered from the index"""
+    scraper = WeatherScraper()
+    queries = []
+
+    async def get_readings(city, lang='en', timeout=None):
+        queries.append(city)
+        return READINGS
+
+    scraper.get_readings = get_readings
+
+    first = await scraper.get_weather_at(40.4168, -3.7038, temp_unit='C')
+    assert first['temperature'] == '20.0°C'
+    assert first['distance_km'] == 0
+
+    nearby = await scraper.get_weather_at(40.43, -3.71, radius_km=5, temp_unit='C')
+    assert nearby['location'] == 'Madrid, Spain'
+    assert 0 < nearby['distance_km'] < 5
+
+    await scraper.get_weather_at(41.3874, 2.1686)
+    assert queries == ['40.4168,-3.7038', '41.3874,2.1686']
+
+    with pytest.raises(ValueError):
+        await scraper.get_weather_at(91, 0)
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from google_weather.errors import WeatherTimeoutError
+from google_weather.hedging import HedgePolicy
+from google_weather.weather import WeatherScraper
+
+READINGS = {
+    'location': 'Madrid',
+    'temperature_f': 68.0,
+    'condition': 'Sunny',
+    'humidity': '40%',
+    'wind_text': '10 km/h',
+    'wind_value': 10.0,
+    'wind_is_mph': False
+}
+
+
+def test_policy_delay_and_budget():
+    """Test that the hedge delay follows recent latency and hedges stay within budget"""
+    policy = HedgePolicy(percentile=90, budget=0.1, min_samples=10, min_delay=0.05)
+    assert policy.delay() is None
+
+    for latency in [0.01] * 9 + [1.0]:
+        policy.record_latency(latency)
+    assert policy.delay() == 0.05
+
+    policy.requests = 10
+    assert policy.try_fire()
+    assert not policy.try_fire()
+    policy.requests = 20
+    assert policy.try_fire()
+    assert policy.hedges_fired == 2
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_over_stalled_primary():
+    """Test that a stalled lookup is hedged on a separate context and the loser is cancelled"""
+    policy = HedgePolicy(min_samples=1, min_delay=0.01, budget=1.0)
+    policy.record_latency(0.01)
+    scraper = WeatherScraper(hedge=policy)
+    variants = []
+    cancelled = []
+
+    async def fetch(city, lang, deadline=None, variant=None):
+        variants.append(variant)
+        if variant is None:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(variant)
+                raise
+        return dict(READINGS, location=f"{city} ({variant})")
+
+    scraper._fetch_weather = fetch
+    readings = await scraper.get_readings('Madrid', timeout=5)
+
+    assert readings['location'] == 'Madrid (hedge)'
+    assert variants == [None, 'hedge']
+    await asyncio.sleep(0)
+    assert cancelled == [None]
+    assert policy.snapshot()['hedges_won'] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_budget():
+    """Test that the primary lookup runs alone once the hedge budget is spent"""
+    policy = HedgePolicy(min_samples=1, min_delay=0.01, budget=0.0)
+    policy.record_latency(0.01)
+    scraper = WeatherScraper(hedge=policy)
+    variants = []
+
+    async def fetch(city, lang, deadline=None, variant=None):
+        variants.append(variant)
+        await asyncio.sleep(0.05)
+        return READINGS
+
+    scraper._fetch_weather = fetch
+    await scraper.get_readings('Madrid')
+
+    assert variants == [None]
+    assert policy.hedges_fired == 0
+
+
+@pytest.mark.asyncio
+async def test_attempts_track_their_own_phase():
+    """Test that the hedge does not overwrite the phase of the primary attempt"""
+    policy = HedgePolicy(min_samples=1, min_delay=0.01, budget=1.0)
+    policy.record_latency(0.01)
+    scraper = WeatherScraper(hedge=policy)
+    hedged = asyncio.Event()
+    phases = []
+
+    async def fetch(city, lang, deadline=None, variant=None):
+        if variant is None:
+            deadline.enter('location')
+            await hedged.wait()
+            phases.append(deadline.phase)
+        else:
+            deadline.enter('extraction')
+            hedged.set()
+        await asyncio.sleep(10)
+
+    scraper._fetch_weather = fetch
+    with pytest.raises(WeatherTimeoutError) as exc_info:
+        await scraper.get_readings('Madrid', timeout=0.2)
+
+    # El error informa la fase del intento original, que no vio la del de cobertura
+    assert phases == ['location']
+    assert exc_info.value.phase == 'location'
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from google_weather.errors import BlockedError
+from google_weather.weather import WeatherScraper
+
+FIELDS = {
+    'widget': ['#wob_wc', '<div id="wob_wc">'],
+    'location': ['.BBwThe', 'Results for Paris, France'],
+    'temperature': ['#wob_tm', '68'],
+    'condition': ['#wob_dc', 'Sunny'],
+    'humidity': ['#wob_hm', '55%'],
+    'wind': ['#wob_tws', '16 km/h'],
+}
+
+
+def _scraper(driver, responses):
+    driver.evaluate = lambda page, script, args: responses(args)
+    driver.evaluate_delay = 0.01
+    scraper = WeatherScraper(in_page_fetch=True, base_url='https://search.test')
+
+    async def fetch_page(city, lang, deadline=None, lite=False, variant=None):
+        navigations.append(city)
+        return {'location': city}
+
+    navigations = []
+    scraper._fetch_weather_page = fetch_page
+    return scraper, navigations
+
+
+def _fetch_page(driver):
+    context = driver.browser.contexts[0]
+    assert context.options['java_script_enabled']
+    return context, context.pages[0]
+
+
+def _ok(args):
+    return {'status': 200, 'url': args['url'], 'fields': dict(FIELDS), 'html': None}
+
+
+@pytest.mark.asyncio
+async def test_parallel_lookups_share_one_page(driver):
+    """Test that concurrent lookups run from one page without navigating"""
+    scraper, navigations = _scraper(driver, _ok)
+    results = await asyncio.gather(*(scraper.get_readings(city) for city in ['Paris', 'Lyon', 'Nice', 'Lille']))
+    context, page = _fetch_page(driver)
+
+    assert all(result['location'] == 'Paris, France' for result in results)
+    assert results[0]['wind_text'] == '16 km/h'
+    assert (context.new_pages, page.gotos) == (1, ['https://search.test/?hl=en'])
+    assert page.max_active == 4
+    assert navigations == []
+    assert page.evaluations[0]['url'] == 'https://search.test/search?q=weather+in+Paris&hl=en'
+    assert len(scraper.selectors.events) == 1
+
+    # Las cadenas enviadas al navegador siguen las variantes ganadoras
+    await scraper.get_readings('Paris')
+    assert page.evaluations[-1]['chains']['wind'][0] == '#wob_tws'
+    assert scraper.resources()['fetch_pages'] == 1
+    assert scraper.fetch_stats == {'attempts': 5, 'fallbacks': 0}
+
+
+@pytest.mark.asyncio
+async def test_missing_widget_falls_back_to_navigation(driver):
+    """Test that a response without the widget is retried with a full navigation"""
+    def respond(args):
+        fields = dict(FIELDS, widget=None) if 'Tokyo' in args['url'] else dict(FIELDS)
+        return {'status': 200, 'url': args['url'], 'fields': fields, 'html': None}
+
+    scraper, navigations = _scraper(driver, respond)
+    assert (await scraper.get_readings('Paris'))['location'] == 'Paris, France'
+    context, page = _fetch_page(driver)
+    assert (await scraper.get_readings('Tokyo'))['location'] == 'Tokyo'
+    assert navigations == ['Tokyo']
+    assert scraper.fetch_fallback_rate == 0.5
+
+    # Una página cerrada (p. ej. un crash del renderer) se reemplaza
+    page.closed = True
+    await scraper.get_readings('Paris')
+    assert context.new_pages == 2
+
+
+@pytest.mark.asyncio
+async def test_captcha_is_not_retried(driver):
+    """Test that a redirect to the CAPTCHA page raises instead of navigating"""
+    scraper, navigations = _scraper(
+        driver,
+        lambda args: {'status': 200, 'url': 'https://search.test/sorry/index', 'fields': {}, 'html': None}
+    )
+    with pytest.raises(BlockedError):
+        await scraper.get_readings('Paris')
+    assert navigations == []
+    assert scraper.resources()['inflight'] == 0
@@ -0,0 +1,93 @@
+import subprocess
+import sys
+
+import pytest
+
+import google_weather.launch as launch_module
+import google_weather.weather as weather_module
+from google_weather.launch import benchmark, chromium_args, descendant_pids, launch_options, process_tree_rss
+from google_weather.weather import WeatherScraper
+
+from conftest import FakeDriver
+
+
+def test_profiles_merge_disabled_features():
+    """Test that every profile passes a single --disable-features flag"""
+    for profile in ('default', 'low-memory', 'headless-shell'):
+        args = chromium_args(profile)
+        features = [arg for arg in args if arg.startswith('--disable-features=')]
+        assert len(features) == 1
+        assert 'IsolateOrigins,site-per-process' in features[0]
+    assert '--renderer-process-limit=2' in chromium_args('low-memory')
+    assert 'Translate' in chromium_args('low-memory')[2]
+
+    options = launch_options('headless-shell', headless=False)
+    assert (options['headless'], options['channel']) == (True, 'chromium-headless-shell')
+    assert 'channel' not in launch_options('default')
+
+    with pytest.raises(ValueError):
+        launch_options('tiny')
+    with pytest.raises(ValueError):
+        WeatherScraper(launch_profile='tiny')
+
+
+def test_process_tree_accounting():
+    """Test that spawned children are found and their memory is counted"""
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        assert child.pid in descendant_pids()
+        assert process_tree_rss() > 0
+        assert process_tree_rss(include_self=True) > process_tree_rss()
+    finally:
+        child.kill()
+        child.wait()
+    assert child.pid not in descendant_pids()
+
+
+@pytest.mark.asyncio
+async def test_scraper_launches_with_profile(monkeypatch):
+    """Test that the scraper hands the profile's options to Chromium"""
+    driver = FakeDriver(fail_launch=True)
+    monkeypatch.setattr(weather_module, 'async_playwright', driver)
+    scraper = WeatherScraper(launch_profile='low-memory')
+    with pytest.raises(RuntimeError):
+        await scraper._launch_browser()
+    assert driver.launch_options[0]['args'] == chromium_args('low-memory')
+    assert driver.launch_options[0]['proxy'] is None
+
+
+@pytest.mark.asyncio
+async def test_benchmark_reports_each_profile(monkeypatch):
+    """Test the benchmark report shape with a scraper that needs no browser"""
+    created = []
+
+    class FakeScraper:
+        def __init__(self, launch_profile, **options):
+            self.launch_profile = launch_profile
+            self.lookups = 0
+            created.append(self)
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            pass
+
+        async def warmup(self, langs):
+            return {'browser': 0.5, 'total': 0.7}
+
+        async def get_readings(self, city, lang):
+            self.lookups += 1
+            if self.lookups == 3:
+                raise ValueError("Faltan datos del clima")
+            return {}
+
+    monkeypatch.setattr(weather_module, 'WeatherScraper', FakeScraper)
+    reports = await benchmark(['default', 'low-memory'], lookups=4, settle=0)
+    assert [report['profile'] for report in reports] == ['default', 'low-memory']
+    assert [scraper.launch_profile for scraper in created] == ['default', 'low-memory']
+    report = reports[0]
+    assert (report['launch_seconds'], report['errors']) == (0.5, 1)
+    assert report['lookup_p50'] is not None and report['first_lookup_seconds'] >= 0
+    assert isinstance(report['rss_steady_mb'], float)
+    assert launch_module._format_report(report).startswith('default')
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+import google_weather.weather as weather_module
+from google_weather.weather import WeatherScraper
+
+from conftest import FakeDriver
+
+
+@pytest.mark.asyncio
+async def test_context_manager_tears_everything_down(driver):
+    """Test that leaving the async context stops the driver and closes every resource"""
+    async with WeatherScraper() as scraper:
+        await scraper._get_context('en')
+        await scraper._get_context('es')
+        resources = scraper.resources()
+        assert (resources['contexts'], resources['browser'], resources['driver']) == (2, True, True)
+        assert isinstance(resources['child_processes'], int)
+
+    assert driver.browser.closed
+    assert all(context.closed for context in driver.browser.contexts)
+    assert (driver.starts, driver.stops) == (1, 1)
+    resources = scraper.resources()
+    assert (resources['contexts'], resources['browser'], resources['driver'], resources['closed']) == (0, False, False, True)
+
+    # Cerrar de nuevo no hace nada y el scraper no se puede reutilizar
+    await scraper.close()
+    assert driver.stops == 1
+    with pytest.raises(RuntimeError):
+        await scraper._get_context('en')
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_inflight_lookups(driver):
+    """Test that close() cancels lookups in progress, closes their pages and fails the callers without cancelling them"""
+    scraper = WeatherScraper()
+    searching = asyncio.Event()
+
+    async def perform_search(page, city, lang, deadline=None, lite=False):
+        searching.set()
+        await asyncio.sleep(3600)
+
+    scraper._perform_search = perform_search
+    lookup = asyncio.ensure_future(scraper.get_readings('Madrid'))
+    await searching.wait()
+    resources = scraper.resources()
+    assert (resources['inflight'], resources['pages']) == (1, 1)
+
+    await asyncio.wait_for(scraper.close(), timeout=5)
+    with pytest.raises(RuntimeError):
+        await lookup
+    assert not lookup.cancelled()
+    context = driver.browser.contexts[0]
+    assert context.pages == []
+    assert scraper.resources()['inflight'] == 0
+
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_cancels_its_lookup(driver):
+    """Test that cancelling the caller cancels the page work it started"""
+    scraper = WeatherScraper()
+    searching = asyncio.Event()
+
+    async def perform_search(page, city, lang, deadline=None, lite=False):
+        searching.set()
+        await asyncio.sleep(3600)
+
+    scraper._perform_search = perform_search
+    lookup = asyncio.ensure_future(scraper.get_readings('Madrid'))
+    await searching.wait()
+    lookup.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await lookup
+    await asyncio.sleep(0)
+    assert driver.browser.contexts[0].pages == []
+    assert scraper.resources()['inflight'] == 0
+    await scraper.close()
+
+@pytest.mark.asyncio
+async def test_failed_launch_stops_driver(monkeypatch):
+    """Test that a browser launch failure does not leave the driver running"""
+    driver = FakeDriver(fail_launch=True)
+    monkeypatch.setattr(weather_module, 'async_playwright', driver)
+    scraper = WeatherScraper()
+    with pytest.raises(RuntimeError):
+        await scraper._get_context('en')
+    assert (driver.starts, driver.stops) == (1, 1)
+    assert not scraper.resources()['driver']
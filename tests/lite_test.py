@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from google_weather.errors import WeatherTimeoutError
+from google_weather.weather import WeatherScraper
+
+READINGS = {
+    'location': 'Paris, France', 'temperature_f': 68.0, 'condition': 'Sunny',
+    'humidity': '55%', 'wind_value': 16.0, 'wind_is_mph': False, 'wind_text': '16 km/h'
+}
+
+FULL_MARKUP = {
+    '#wob_wc': '', '.BBwThe': 'Results for Paris, France', '#wob_tm': '68',
+    '#wob_dc': 'Sunny', '#wob_hm': '55%', '#wob_ws': '16 km/h'
+}
+
+
+@pytest.mark.asyncio
+async def test_lite_mode_falls_back_to_full_context():
+    """Test that an incomplete lite page is retried on the full context and counted"""
+    scraper = WeatherScraper(lite=True)
+    calls = []
+
+    async def fetch_page(city, lang, deadline=None, lite=False, variant=None):
+        calls.append(lite)
+        if lite and city == 'Tokyo':
+            raise Exception("Error getting weather: Widget not found")
+        return dict(READINGS)
+
+    scraper._fetch_weather_page = fetch_page
+    await scraper.get_readings('Paris')
+    await scraper.get_readings('Tokyo')
+
+    assert calls == [True, True, False]
+    assert scraper.lite_stats == {'attempts': 2, 'fallbacks': 1}
+    assert scraper.lite_fallback_rate == 0.5
+
+
+@pytest.mark.asyncio
+async def test_incomplete_lite_page_falls_back_without_waiting(driver):
+    """Test that a lite page missing the widget falls back at once, keeping the budget for the full context"""
+    driver.hang_waits = True
+    driver.markup = lambda context: {} if context.options['java_script_enabled'] is False else FULL_MARKUP
+    scraper = WeatherScraper(lite=True)
+
+    started = time.monotonic()
+    readings = await scraper.get_readings('Paris', timeout=2)
+    assert time.monotonic() - started < 1
+    assert readings['location'] == 'Paris, France'
+    assert scraper.lite_stats == {'attempts': 1, 'fallbacks': 1}
+    lite_context, full_context = driver.browser.contexts
+    assert lite_context.options['java_script_enabled'] is False
+    assert full_context.options['java_script_enabled'] is True
+
+
+@pytest.mark.asyncio
+async def test_lite_mode_does_not_fall_back_on_timeout():
+    """Test that running out of time in lite mode is not retried"""
+    scraper = WeatherScraper(lite=True)
+
+    async def fetch_page(city, lang, deadline=None, lite=False, variant=None):
+        raise WeatherTimeoutError('navigation', 1)
+
+    scraper._fetch_weather_page = fetch_page
+    with pytest.raises(WeatherTimeoutError):
+        await scraper.get_readings('Paris')
+    assert scraper.lite_stats['fallbacks'] == 0
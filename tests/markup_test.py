@@ -0,0 +1,88 @@
+import pytest
+
+from google_weather.markup import SelectorRegistry, selector_xpath
+from google_weather.offline import extract_html
+from google_weather.weather import WeatherScraper
+
+from conftest import FakePage
+
+
+def test_registry_remembers_winner_per_locale(tmp_path):
+    """Test fallback ordering, per-locale winners, drift events and persistence"""
+    events = []
+    path = tmp_path / 'selectors.json'
+    registry = SelectorRegistry(path=str(path), on_drift=events.append)
+    assert registry.candidates('location', 'es')[0] == '.BBwThe'
+
+    registry.record('location', 'es', '.BBwThe')
+    assert events == []
+    registry.record('location', 'es', '#wob_loc')
+    assert registry.candidates('location', 'es') == ['#wob_loc', '.BBwThe', '.wob_loc']
+    assert registry.candidates('location', 'en')[0] == '.BBwThe'
+    assert (events[0]['previous'], events[0]['selector']) == ('.BBwThe', '#wob_loc')
+
+    registry.record('humidity', 'es', None)
+    assert events[-1]['selector'] is None
+    assert registry.snapshot()['misses'] == {'humidity': 1}
+
+    # La ganadora sobrevive a un reinicio
+    assert SelectorRegistry(path=str(path)).preferred('location', 'es') == '#wob_loc'
+
+    registry.register('location', '.new-loc', position=0)
+    assert registry.chains['location'][0] == '.new-loc'
+    assert registry.combined('location', 'en') == '.new-loc, .BBwThe, #wob_loc, .wob_loc'
+    with pytest.raises(ValueError):
+        SelectorRegistry(chains={'wind': []})
+
+
+def test_selector_xpath():
+    """Test conversion of simple CSS selectors for lxml"""
+    assert selector_xpath('#wob_tm') == "//*[@id='wob_tm']"
+    assert selector_xpath('#wob_dcp span') == "//*[@id='wob_dcp']//span"
+    assert 'q8U8x' in selector_xpath('span.wob_t.q8U8x')
+    assert selector_xpath('[data-x]') is None
+
+
+@pytest.mark.asyncio
+async def test_drifted_markup_costs_one_extra_probe():
+    """Test that a markup variant is found without waiting and preferred on the next lookup"""
+    scraper = WeatherScraper()
+    old_markup = {'#wob_loc': 'Results for Madrid', '#wob_tm': '68', '#wob_tws': '16 km/h'}
+
+    page = FakePage(elements=old_markup)
+    assert await scraper._extract_location(page, 'en') == 'Madrid'
+    assert await scraper._extract_temperature(page, lang='en') == 68.0
+    assert (await scraper._probe_field(page, 'wind', 'en')).text == '16 km/h'
+    assert page.waits == []
+    assert page.queries == ['.BBwThe', '#wob_loc', '#wob_tm', '#wob_ws', '#wob_tws']
+    assert [event['field'] for event in scraper.selectors.events] == ['location', 'wind']
+
+    page = FakePage(elements=old_markup)
+    await scraper._extract_location(page, 'en')
+    await scraper._probe_field(page, 'wind', 'en')
+    assert page.queries == ['#wob_loc', '#wob_tws']
+    assert len(scraper.selectors.events) == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_field_waits_on_every_variant():
+    """Test that an absent field waits once on the combined selector list"""
+    scraper = WeatherScraper()
+    page = FakePage(elements={})
+    with pytest.raises(TimeoutError):
+        await scraper._extract_location(page, 'en')
+    assert page.waits == ['.BBwThe, #wob_loc, .wob_loc']
+    assert scraper.selectors.events[-1]['selector'] is None
+
+
+def test_offline_extraction_uses_fallbacks():
+    """Test that saved pages with an older markup variant still extract"""
+    page = """<html lang="en"><body>
+    <div id="wob_loc">Madrid, Spain</div>
+    <span id="wob_tm">68</span>
+    <div id="wob_dcp"><span>Sunny</span></div>
+    <span id="wob_hm">40%</span>
+    <span id="wob_tws">16 km/h</span>
+    </body></html>"""
+    readings = extract_html(page)
+    assert (readings['location'], readings['condition'], readings['wind_text']) == ('Madrid, Spain', 'Sunny', '16 km/h')
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from google_weather.deadline import Deadline
+from google_weather.errors import BlockedError
+from google_weather.navigation import NAVIGATION_PROFILES, NavigationStats
+from google_weather.weather import WeatherScraper
+
+
+def test_navigation_report():
+    """Test that the report separates time-to-widget from time-to-load"""
+    stats = NavigationStats()
+    stats.record('load', 'en', True, 2.0, 1.9)
+    stats.record('load', 'en', True, 2.2, 2.1)
+    stats.record('commit', 'en', True, 0.6, None)
+    stats.record('commit', 'en', False)
+
+    report = stats.report()
+    assert report['load:en']['count'] == 2
+    assert report['load:en']['load_p50'] in (1.9, 2.1)
+    assert report['load:en']['widget_before_load'] == 0
+    assert report['commit:en']['success_rate'] == 0.5
+    assert report['commit:en']['widget_p50'] == 0.6
+    assert report['commit:en']['widget_before_load'] == 1
+
+
+def test_best_profile_requires_reliability():
+    """Test that the fastest profile is chosen only if it stays reliable"""
+    stats = NavigationStats()
+    for _ in range(20):
+        stats.record('load', 'es', True, 2.0, 2.0)
+        stats.record('commit', 'es', True, 0.5, None)
+        stats.record('domcontentloaded', 'es', True, 0.3, None)
+    # domcontentloaded es el más rápido pero falla demasiado
+    for _ in range(5):
+        stats.record('domcontentloaded', 'es', False)
+
+    assert stats.best_profile('es') == 'commit'
+    assert stats.best_profile('fr') is None
+
+
+async def _search_page(driver, profile):
+    scraper = WeatherScraper(base_url='https://search.test', navigation_profile=profile)
+    context = await scraper._get_context('en')
+    return scraper, await context.new_page()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('profile', sorted(NAVIGATION_PROFILES))
+async def test_search_finds_widget_under_each_profile(driver, profile):
+    """Test that every navigation profile waits for the widget and records the navigation"""
+    driver.markup = lambda context: {'#wob_wc': ''}
+    scraper, page = await _search_page(driver, profile)
+
+    await scraper._perform_search(page, 'Paris', 'en', Deadline(5))
+    assert page.gotos == ['https://search.test/search?q=weather+in+Paris&hl=en']
+    assert scraper.navigation_stats.report()[f'{profile}:en']['success_rate'] == 1.0
+    await scraper.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('profile', sorted(NAVIGATION_PROFILES))
+async def test_search_detects_block_page_under_each_profile(driver, profile):
+    """Test that a redirect to the CAPTCHA page raises BlockedError at once under every profile"""
+    driver.hang_waits = True
+
+    def block(page, url):
+        page.url = 'https://search.test/sorry/index'
+
+    driver.on_goto = block
+    scraper, page = await _search_page(driver, profile)
+
+    started = time.monotonic()
+    with pytest.raises(BlockedError):
+        await scraper._perform_search(page, 'Paris', 'en', Deadline(5))
+    assert time.monotonic() - started < 1
+    await scraper.close()
@@ -0,0 +1,77 @@
+import csv
+import json
+
+import pytest
+
+from google_weather.offline import extract_archive, extract_html
+from google_weather.parsing import build_readings, clean_location, map_condition
+
+PAGE = """<html lang="{lang}"><body>
+<div class="BBwThe x">
+   {location}
+</div>
+<span id="wob_tm">{temp}</span>
+<div id="wob_dc">{condition}</div>
+<span id="wob_hm">40%</span>
+<span id="wob_ws">{wind}</span>
+</body></html>"""
+
+
+def _page(lang='en', location='Results for Madrid, Spain', temp='68', condition='Mostly sunny', wind='10 mph'):
+    return PAGE.format(lang=lang, location=location, temp=temp, condition=condition, wind=wind)
+
+
+def test_shared_field_logic():
+    """Test location cleaning, condition mapping and validation shared with the scraper"""
+    assert clean_location('Resultados para Madrid, España ') == 'Madrid, España'
+    assert map_condition('Mostly sunny', 'en') == 'Sunny'
+    assert map_condition('Foggy night', 'en') == 'Foggy night'
+    with pytest.raises(ValueError):
+        build_readings({'location': 'Madrid', 'temperature': '200'}, 'en')
+    with pytest.raises(ValueError, match='humidity'):
+        build_readings({'location': 'Madrid', 'temperature': '68', 'condition': 'Sunny', 'wind': '1 mph'}, 'en')
+
+
+def test_extract_html():
+    """Test that saved (indented) pages yield the same readings as a live lookup"""
+    readings = extract_html(_page(lang='es', location='Resultados para Madrid, España', wind='16 km/h'))
+    assert readings == {
+        'location': 'Madrid, España',
+        'temperature_f': 68.0,
+        'condition': 'Mostly sunny',
+        'humidity': '40%',
+        'wind_text': '16 km/h',
+        'wind_value': 16.0,
+        'wind_is_mph': False,
+        'lang': 'es'
+    }
+    assert extract_html(_page())['condition'] == 'Sunny'
+
+
+def test_extract_archive_with_process_pool(tmp_path):
+    """Test parallel extraction of a directory into JSONL and CSV with a throughput report"""
+    archive = tmp_path / 'debug_responses'
+    (archive / 'nested').mkdir(parents=True)
+    for i in range(40):
+        (archive / f"page_{i:02d}.html").write_text(_page(temp=str(50 + i)), encoding='utf-8')
+    (archive / 'nested' / 'es.html').write_text(_page(lang='es', wind='16 km/h'), encoding='utf-8')
+    (archive / 'blocked.html').write_text('<html><body>unusual traffic</body></html>', encoding='utf-8')
+    (archive / 'notes.txt').write_text('ignored', encoding='utf-8')
+
+    output = tmp_path / 'out.jsonl'
+    report = extract_archive(archive, output, workers=2, batch_size=4)
+    assert (report['files'], report['ok'], report['errors']) == (42, 41, 1)
+    assert report['pages_per_second'] > 0
+
+    records = {json.loads(line)['file'].split('debug_responses/')[1]: json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()}
+    assert records['page_18.html']['temperature'] == '68.0°F'
+    assert records['page_18.html']['wind'] == '10.0 mph'
+    # Las unidades por defecto siguen al idioma de la página
+    assert records['nested/es.html']['temperature'] == '20.0°C'
+    assert not records['blocked.html']['ok']
+    assert 'Faltan datos' in records['blocked.html']['error']
+
+    csv_output = tmp_path / 'out.csv'
+    extract_archive([archive / 'page_00.html'], csv_output, temp_unit='K', workers=1)
+    rows = list(csv.DictReader(csv_output.open(encoding='utf-8')))
+    assert rows[0]['temperature'] == '283.1°K'
@@ -0,0 +1,67 @@
+import asyncio
+import pstats
+import time
+import tracemalloc
+
+import pytest
+
+from google_weather.profiling import Profiler
+from google_weather.weather import WeatherScraper
+
+
+def busy_parse(seconds):
+    """Simula trabajo de CPU que bloquea el event loop"""
+    end = time.monotonic() + seconds
+    total = 0
+    while time.monotonic() < end:
+        total += sum(range(100))
+    return total
+
+
+@pytest.mark.asyncio
+async def test_profiler_captures_cpu_lag_and_dumps(tmp_path):
+    """Test that sampling finds a blocking hot spot, measures loop lag and dumps standard formats"""
+    profiler = Profiler(str(tmp_path), sample_interval=0.002, cprofile=True, lag_interval=0.02)
+    async with profiler:
+        await asyncio.sleep(0.05)
+        busy_parse(0.2)
+        await asyncio.sleep(0.05)
+
+        assert 'busy_parse' in profiler.collapsed_stacks()
+        summary = profiler.summary()
+        assert summary['loop_lag_max'] >= 0.1
+        assert summary['samples'] > 0
+
+        files = profiler.dump()
+
+    assert not profiler.running
+    collapsed = files['collapsed'].read_text(encoding='utf-8')
+    busy = [line for line in collapsed.splitlines() if 'busy_parse' in line]
+    assert busy and all(int(line.rsplit(' ', 1)[1]) > 0 for line in busy)
+    assert any('busy_parse' in func[2] for func in pstats.Stats(str(files['pstats'])).stats)
+    assert tracemalloc.Snapshot.load(str(files['tracemalloc'])).traces
+    assert files['allocations'].read_text(encoding='utf-8')
+    # Cada volcado empieza una ventana nueva
+    assert 'busy_parse' not in profiler.collapsed_stacks()
+
+
+@pytest.mark.asyncio
+async def test_scraper_tracks_lookups(tmp_path):
+    """Test that a scraper with a profiler starts it and records every lookup"""
+    async def fetch(city, lang, deadline=None, variant=None):
+        await asyncio.sleep(0.01)
+        return {'location': city, 'payload': ['x' * 100 for _ in range(100)]}
+
+    profiler = Profiler(str(tmp_path))
+    scraper = WeatherScraper(profiler=profiler)
+    scraper._fetch_weather = fetch
+
+    await scraper.get_readings('Madrid', lang='es')
+    await scraper.get_readings('Lima', lang='es')
+    assert profiler.running
+    assert [lookup['label'] for lookup in profiler.lookups] == ['es:Madrid', 'es:Lima']
+    assert all(lookup['allocated'] is not None for lookup in profiler.lookups)
+
+    await scraper.close()
+    assert not profiler.running
+    assert profiler.summary()['lookups'] == 2
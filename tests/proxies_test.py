@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from google_weather.errors import BlockedError
+from google_weather.proxies import ProxyPool
+from google_weather.weather import WeatherScraper
+
+from conftest import FakePage
+
+
+async def _start_origin():
+    """Servidor HTTP de origen que responde 204 a todo"""
+    async def handle(reader, writer):
+        await reader.readuntil(b'\r\n\r\n')
+        writer.write(b'HTTP/1.1 204 No Content\r\nConnection: close\r\n\r\n')
+        await writer.drain()
+        writer.close()
+    return await asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+async def _start_forwarding_proxy(requests):
+    """Proxy HTTP de reenvío mínimo: GET con URL absoluta hacia el origen"""
+    async def handle(reader, writer):
+        head = await reader.readuntil(b'\r\n\r\n')
+        method, url, version = head.split(b'\r\n')[0].decode().split()
+        requests.append(url)
+        host_port = url.split('/')[2]
+        host, port = host_port.split(':')
+        upstream_reader, upstream_writer = await asyncio.open_connection(host, int(port))
+        path = '/' + url.split('/', 3)[3]
+        upstream_writer.write(f"{method} {path} {version}\r\nHost: {host_port}\r\nConnection: close\r\n\r\n".encode())
+        await upstream_writer.drain()
+        writer.write(await upstream_reader.read())
+        await writer.drain()
+        upstream_writer.close()
+        writer.close()
+    return await asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+def _port(server) -> int:
+    return server.sockets[0].getsockname()[1]
+
+
+def test_block_quarantines_and_traffic_shifts():
+    """Test that a blocked endpoint stops receiving traffic until its cooldown ends"""
+    pool = ProxyPool(['http://10.0.0.1:3128', 'http://10.0.0.2:3128'], cooldown=60)
+    bad, good = pool.endpoints
+    pool.record(bad, 1.0, ok=False, blocked=True)
+
+    assert bad.quarantined()
+    assert {pool.choose().name for _ in range(50)} == {good.name}
+    assert pool.snapshot()[bad.name]['strikes'] == 1
+
+
+def test_recovery_after_cooldown():
+    """Test that an endpoint gets one trial after cooldown and returns on success"""
+    pool = ProxyPool(['http://10.0.0.1:3128', 'http://10.0.0.2:3128'], cooldown=0)
+    bad, good = pool.endpoints
+    pool.record(bad, 1.0, ok=False, blocked=True)
+
+    # Una sola consulta de prueba a la vez
+    assert pool.choose() is bad
+    assert pool.choose() is good
+    # La prueba falla: cuarentena más larga
+    pool.record(bad, 1.0, ok=False)
+    assert bad.strikes == 2
+
+    assert pool.choose() is bad
+    pool.record(bad, 0.5)
+    assert bad.strikes == 0
+    assert pool.snapshot()[bad.name]['samples'] == 0
+
+
+def test_score_prefers_fast_healthy_endpoints():
+    """Test that latency and errors lower an endpoint's share of traffic"""
+    pool = ProxyPool(['http://10.0.0.1:3128', 'http://10.0.0.2:3128'], latency_reference=1.0, min_samples=100)
+    slow, fast = pool.endpoints
+    for _ in range(10):
+        pool.record(slow, 4.0)
+        pool.record(fast, 0.2)
+    pool.record(slow, 4.0, ok=False)
+
+    assert pool.score(fast) > 3 * pool.score(slow)
+    picks = [pool.choose() for _ in range(500)]
+    assert picks.count(fast) > picks.count(slow) * 2
+
+
+@pytest.mark.asyncio
+async def test_probe_through_local_forwarding_proxy():
+    """Test health probes against local forwarding proxies standing in for real ones"""
+    origin = await _start_origin()
+    requests = []
+    proxy = await _start_forwarding_proxy(requests)
+    url = f"http://127.0.0.1:{_port(origin)}/generate_204"
+    pool = ProxyPool([f"http://127.0.0.1:{_port(proxy)}", 'http://127.0.0.1:1'], cooldown=0.01)
+    working, dead = pool.endpoints
+    try:
+        assert await pool.probe(working, url, timeout=2)
+        assert requests == [url]
+        assert not await pool.probe(dead, url, timeout=2)
+        assert dead.error_rate == 1.0
+
+        pool.record(working, 1.0, ok=False, blocked=True)
+        await asyncio.sleep(0.02)
+        assert await pool.probe_quarantined(url, timeout=2) == {working.name: True}
+        assert working.strikes == 0
+    finally:
+        proxy.close()
+        origin.close()
+
+
+@pytest.mark.asyncio
+async def test_scraper_binds_contexts_to_endpoints():
+    """Test that each endpoint gets its own context and blocks shift traffic away"""
+    pool = ProxyPool(['http://10.0.0.1:3128', 'http://10.0.0.2:3128'], cooldown=60)
+    bad, good = pool.endpoints
+    scraper = WeatherScraper(proxies=pool)
+    contexts = {}
+
+    class _FakeContext:
+        def __init__(self, proxy):
+            self.proxy = proxy
+
+        async def new_page(self):
+            page = FakePage(elements={'#wob_dc': 'Sunny', '#wob_hm': '40%', '#wob_ws': '10 km/h'})
+            page.proxy = self.proxy
+            return page
+
+    async def get_context(lang, lite=False, variant=None, proxy=None):
+        key = scraper._context_key(lang, lite, variant, proxy)
+        return contexts.setdefault(key, _FakeContext(proxy))
+
+    async def perform_search(page, city, lang, deadline, lite=False):
+        if page.proxy is bad:
+            raise BlockedError("CAPTCHA")
+
+    async def extract_location(page, lang, deadline=None):
+        return 'Madrid'
+
+    async def extract_temperature(page, deadline=None, lang='en'):
+        return 68.0
+
+    scraper._get_context = get_context
+    scraper._perform_search = perform_search
+    scraper._extract_location = extract_location
+    scraper._extract_temperature = extract_temperature
+
+    outcomes = []
+    for _ in range(30):
+        try:
+            outcomes.append((await scraper.get_readings('Madrid'))['location'])
+        except BlockedError:
+            outcomes.append('blocked')
+
+    assert outcomes.count('blocked') <= 1
+    assert bad.quarantined()
+    assert set(contexts) <= {'en:proxy=10.0.0.1:3128', 'en:proxy=10.0.0.2:3128'}
+    assert len(good.samples) >= 29
@@ -0,0 +1,272 @@
+import asyncio
+import time
+
+import pytest
+
+from google_weather.cache import MemoryBackend
+from google_weather.errors import WeatherTimeoutError
+from google_weather.redis_cache import RedisBackend, _read_reply
+from google_weather.weather import WeatherScraper
+
+READINGS = {
+    'location': 'Madrid, España',
+    'temperature_f': 68.0,
+    'condition': 'Soleado',
+    'humidity': '40%',
+    'wind_text': '10 km/h',
+    'wind_value': 10.0,
+    'wind_is_mph': False
+}
+
+
+class StandInRedis:
+    """Servidor RESP mínimo en memoria (GET, SET NX/PX, DEL, PING, SELECT)"""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+        self.server = None
+        self.delay = 0.0
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"redis://127.0.0.1:{port}/1"
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    def _get(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self.data[key]
+            return None
+        return value
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                args = [arg.decode('utf-8') for arg in await _read_reply(reader)]
+                self.commands.append(args[0])
+                reply = self._execute(args)
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write(reply)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _execute(self, args) -> bytes:
+        command = args[0].upper()
+        if command == 'PING':
+            return b'+PONG\r\n'
+        if command == 'SELECT':
+            return b'+OK\r\n'
+        if command == 'GET':
+            value = self._get(args[1])
+            if value is None:
+                return b'$-1\r\n'
+            data = value.encode('utf-8')
+            return b'$%d\r\n%s\r\n' % (len(data), data)
+        if command == 'SET':
+            options = [arg.upper() for arg in args[3:]]
+            if 'NX' in options and self._get(args[1]) is not None:
+                return b'$-1\r\n'
+            expires_at = None
+            if 'PX' in options:
+                expires_at = time.monotonic() + int(args[3 + options.index('PX') + 1]) / 1000
+            self.data[args[1]] = (args[2], expires_at)
+            return b'+OK\r\n'
+        if command == 'DEL':
+            return b':%d\r\n' % int(self.data.pop(args[1], None) is not None)
+        return b'-ERR unknown command\r\n'
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_roundtrip_and_locks():
+    """Test get/set with TTL and SET NX PX locks against a local RESP server"""
+    server = StandInRedis()
+    url = await server.start()
+    backend = RedisBackend(url, ttl=0.2, lock_ttl=0.2)
+    try:
+        assert await backend.ping()
+        assert await backend.get('es|Madrid') is None
+        await backend.set('es|Madrid', READINGS)
+        assert await backend.get('es|Madrid') == READINGS
+        assert 'google_weather:es|Madrid' in server.data
+
+        token = await backend.acquire_lock('es|Madrid')
+        assert token is not None
+        assert await backend.acquire_lock('es|Madrid') is None
+        # Solo el dueño puede liberar el candado
+        await backend.release_lock('es|Madrid', 'otro')
+        assert await backend.acquire_lock('es|Madrid') is None
+        await backend.release_lock('es|Madrid', token)
+        assert await backend.acquire_lock('es|Madrid') is not None
+
+        await asyncio.sleep(0.25)
+        assert await backend.get('es|Madrid') is None
+        assert await backend.acquire_lock('es|Madrid') is not None
+    finally:
+        await backend.close()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_command_does_not_leak_its_reply():
+    """Test that a command cancelled mid-flight does not hand its reply to the next one"""
+    server = StandInRedis()
+    url = await server.start()
+    backend = RedisBackend(url)
+    try:
+        await backend.set('a', {'location': 'A'})
+        await backend.set('b', {'location': 'B'})
+        server.delay = 0.1
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(backend.get('a'), timeout=0.02)
+        server.delay = 0.0
+        await asyncio.sleep(0.15)
+        assert await backend.get('b') == {'location': 'B'}
+        assert await backend.get('a') == {'location': 'A'}
+    finally:
+        await backend.close()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_across_nodes():
+    """Test that several nodes sharing the backend scrape a city only once"""
+    server = StandInRedis()
+    url = await server.start()
+    fetches = 0
+
+    async def fetch(city, lang, deadline=None, variant=None):
+        nonlocal fetches
+        fetches += 1
+        await asyncio.sleep(0.1)
+        return READINGS
+
+    nodes = []
+    for _ in range(4):
+        scraper = WeatherScraper(cache_backend=RedisBackend(url), single_flight=True, single_flight_poll=0.02)
+        scraper._fetch_weather = fetch
+        nodes.append(scraper)
+    try:
+        results = await asyncio.gather(*(node.get_readings('madrid', lang='es', timeout=5) for node in nodes))
+        assert results == [READINGS] * 4
+        assert fetches == 1
+        assert sum(node.cache_stats['waits'] for node in nodes) == 3
+        # Cada consulta cuenta una sola vez: tres esperaron y encontraron las lecturas
+        assert sum(node.cache_stats['hits'] for node in nodes) == 3
+        assert sum(node.cache_stats['misses'] for node in nodes) == 1
+
+        # Otro nodo reutiliza las lecturas aunque no conozca el alias
+        assert await nodes[0].get_readings('Madrid ', lang='es') == READINGS
+        assert fetches == 1
+    finally:
+        for node in nodes:
+            await node.cache.close()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_backend_failure_does_not_fail_lookup():
+    """Test that an unreachable backend degrades to scraping without a cache"""
+    async def fetch(city, lang, deadline=None, variant=None):
+        return READINGS
+
+    scraper = WeatherScraper(cache_backend=RedisBackend('redis://127.0.0.1:1/0'), single_flight=True)
+    scraper._fetch_weather = fetch
+    assert await scraper.get_readings('Madrid', lang='es') == READINGS
+    assert scraper.cache_stats['errors'] > 0
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_is_default_cache():
+    """Test that cache_ttl keeps using an in-process backend"""
+    scraper = WeatherScraper(cache_ttl=60)
+    assert isinstance(scraper.cache, MemoryBackend)
+    token = await scraper.cache.acquire_lock('k')
+    assert await scraper.cache.acquire_lock('k') is None
+    await scraper.cache.release_lock('k', token)
+    assert await scraper.cache.acquire_lock('k') is not None
+
+
+@pytest.mark.asyncio
+async def test_lock_released_between_polls_does_not_scrape_again():
+    """Test that a waiter who gets the lock after the owner published reuses the readings"""
+    class RacingBackend(MemoryBackend):
+        """El dueño publica y suelta el candado justo después de la lectura del que espera"""
+
+        def __init__(self):
+            super().__init__(60)
+            self.gets = 0
+
+        async def get(self, key):
+            self.gets += 1
+            value = await super().get(key)
+            if self.gets == 2:
+                await super().set(key, READINGS)
+                await self.release_lock(key, owner)
+            return value
+
+    backend = RacingBackend()
+    owner = await backend.acquire_lock('es|?madrid')
+    fetches = 0
+
+    async def fetch(city, lang, deadline=None, variant=None):
+        nonlocal fetches
+        fetches += 1
+        return READINGS
+
+    scraper = WeatherScraper(cache_backend=backend, single_flight=True, single_flight_poll=0.01)
+    scraper._fetch_weather = fetch
+    assert await scraper.get_readings('madrid', lang='es', timeout=5) == READINGS
+    assert fetches == 0
+    assert (scraper.cache_stats['hits'], scraper.cache_stats['misses']) == (1, 0)
+    assert await backend.acquire_lock('es|?madrid') is not None
+
+
+@pytest.mark.asyncio
+async def test_slow_backend_is_bounded_by_the_deadline():
+    """Test that backend calls cannot outlast the lookup's timeout"""
+    class SlowBackend(MemoryBackend):
+        def __init__(self, slow):
+            super().__init__(60)
+            self.slow = slow
+
+        async def get(self, key):
+            if 'get' in self.slow:
+                await asyncio.sleep(3600)
+            return await super().get(key)
+
+        async def set(self, key, value):
+            if 'set' in self.slow:
+                await asyncio.sleep(3600)
+            await super().set(key, value)
+
+    async def fetch(city, lang, deadline=None, variant=None):
+        return READINGS
+
+    # Una escritura lenta no retiene las lecturas ya obtenidas más allá del presupuesto
+    scraper = WeatherScraper(cache_backend=SlowBackend({'set'}))
+    scraper._fetch_weather = fetch
+    started = time.monotonic()
+    assert await scraper.get_readings('Madrid', lang='es', timeout=0.2) == READINGS
+    assert time.monotonic() - started < 1
+    assert scraper.cache_stats['errors'] == 1
+
+    # Una lectura lenta agota el presupuesto y la consulta falla a tiempo
+    scraper = WeatherScraper(cache_backend=SlowBackend({'get'}))
+    scraper._fetch_weather = fetch
+    started = time.monotonic()
+    with pytest.raises(WeatherTimeoutError):
+        await scraper.get_readings('Madrid', lang='es', timeout=0.2)
+    assert time.monotonic() - started < 1
+    assert scraper.cache_stats['errors'] == 1
@@ -0,0 +1,106 @@
+import pytest
+
+from google_weather.replay import PageArchive
+from google_weather.weather import WeatherScraper
+
+SEARCH_URL = 'https://www.google.com/search?q=weather+in+Paris&hl=en'
+WIDGET_HTML = '<div id="wob_wc"><span id="wob_tm">68</span></div>'
+
+
+class FakeRequest:
+    def __init__(self, url, navigation=True):
+        self.url = url
+        self.navigation = navigation
+
+    def is_navigation_request(self):
+        return self.navigation
+
+
+class FakeRoute:
+    """Registra cómo el scraper resolvió la petición (fulfill o abort)"""
+
+    def __init__(self, url, navigation=True):
+        self.request = FakeRequest(url, navigation)
+        self.fulfilled = None
+        self.aborted = False
+
+    async def fulfill(self, status=200, content_type=None, body=None):
+        self.fulfilled = (status, body)
+
+    async def abort(self):
+        self.aborted = True
+
+
+async def _replay_handler(tmp_path):
+    """Crea un scraper en modo replay y devuelve el manejador de rutas de su contexto"""
+    scraper = WeatherScraper(archive_dir=str(tmp_path / 'archive'), archive_mode='replay')
+    context = await scraper._get_context('en')
+    assert context.options['java_script_enabled'] is False
+    [(pattern, handler)] = context.routes
+    assert pattern == '**/*'
+    return scraper, handler
+
+
+def test_archive_save_and_load(tmp_path):
+    """Test that recorded pages are served back by query key"""
+    archive = PageArchive(str(tmp_path / 'archive'))
+    url = 'https://www.google.com/search?q=weather+in+New+York&hl=en'
+    archive.save(url, '<div id="wob_wc"></div>')
+
+    assert url in archive
+    assert archive.load(url) == '<div id="wob_wc"></div>'
+    assert archive.load('https://www.google.com/search?q=weather+in+Paris&hl=en') is None
+
+    # El índice se recarga desde disco
+    reloaded = PageArchive(str(tmp_path / 'archive'))
+    assert len(reloaded) == 1
+    assert reloaded.load(url) == '<div id="wob_wc"></div>'
+
+
+def test_query_key_ignores_encoding():
+    """Test that the browser-encoded URL maps to the same key as the built one"""
+    built = 'https://www.google.com/search?q=météo+à+Paris&hl=fr'
+    encoded = 'https://www.google.com/search?q=m%C3%A9t%C3%A9o+%C3%A0+Paris&hl=fr'
+    assert PageArchive.query_key(built) == PageArchive.query_key(encoded)
+    assert PageArchive.query_key(built) != PageArchive.query_key(built.replace('hl=fr', 'hl=en'))
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_recorded_pages(driver, tmp_path):
+    """Test that replay fulfills recorded searches, 404s unrecorded ones and aborts subresources"""
+    PageArchive(str(tmp_path / 'archive')).save(SEARCH_URL, WIDGET_HTML)
+    scraper, handler = await _replay_handler(tmp_path)
+
+    recorded = FakeRoute(SEARCH_URL.replace('weather+in+Paris', 'weather%20in%20Paris'))
+    await handler(recorded)
+    assert recorded.fulfilled == (200, WIDGET_HTML)
+
+    unrecorded = FakeRoute(SEARCH_URL.replace('Paris', 'Lima'))
+    await handler(unrecorded)
+    assert unrecorded.fulfilled[0] == 404 and not unrecorded.aborted
+
+    subresource = FakeRoute('https://www.google.com/images/logo.png', navigation=False)
+    await handler(subresource)
+    assert subresource.aborted and subresource.fulfilled is None
+    await scraper.close()
+
+
+@pytest.mark.asyncio
+async def test_record_mode_writes_archive(driver, tmp_path):
+    """Test that a lookup in record mode saves the search page for later replay"""
+    driver.markup = lambda context: {
+        '#wob_wc': '', '.BBwThe': 'Results for Paris, France', '#wob_tm': '68',
+        '#wob_dc': 'Sunny', '#wob_hm': '55%', '#wob_ws': '16 km/h'
+    }
+
+    def serve(page, url):
+        page.html = WIDGET_HTML
+
+    driver.on_goto = serve
+    scraper = WeatherScraper(archive_dir=str(tmp_path / 'archive'), archive_mode='record')
+    assert (await scraper.get_readings('Paris'))['location'] == 'Paris, France'
+    await scraper.close()
+
+    archive = PageArchive(str(tmp_path / 'archive'))
+    assert len(archive) == 1
+    assert archive.load(SEARCH_URL) == WIDGET_HTML
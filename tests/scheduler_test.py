@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from google_weather.errors import WeatherTimeoutError
+from google_weather.scheduler import FairScheduler, QueueFullError
+
+
+class FakeScraper:
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.order = []
+
+    async def get_weather(self, city, lang='en', temp_unit=None, wind_unit=None, timeout=None):
+        self.order.append(city)
+        await asyncio.sleep(self.delay)
+        return {'location': city}
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_jump_bulk_queue():
+    """Test that interactive lookups are served before queued bulk work"""
+    scraper = FakeScraper()
+    scheduler = FairScheduler(scraper, concurrency=1)
+
+    bulk = [asyncio.ensure_future(scheduler.get_weather(f'bulk{i}', priority='bulk')) for i in range(4)]
+    await asyncio.sleep(0)
+    interactive = asyncio.ensure_future(scheduler.get_weather('Madrid', lang='es', priority='interactive'))
+    await asyncio.gather(*bulk, interactive)
+
+    # bulk0 ya estaba en curso; Madrid pasa delante del resto
+    assert scraper.order[:2] == ['bulk0', 'Madrid']
+
+
+@pytest.mark.asyncio
+async def test_fair_share_between_tenants():
+    """Test that flows of the same class are interleaved by weight"""
+    scraper = FakeScraper()
+    scheduler = FairScheduler(scraper, concurrency=1, tenant_weights={'batch': 1, 'web': 1})
+
+    tasks = [asyncio.ensure_future(scheduler.get_weather(f'a{i}', tenant='batch')) for i in range(4)]
+    await asyncio.sleep(0)
+    tasks += [asyncio.ensure_future(scheduler.get_weather(f'b{i}', tenant='web')) for i in range(2)]
+    await asyncio.gather(*tasks)
+
+    assert scraper.order == ['a0', 'b0', 'a1', 'b1', 'a2', 'a3']
+
+
+@pytest.mark.asyncio
+async def test_admission_control_and_timing():
+    """Test bounded queues and separate queue/scrape timings"""
+    scraper = FakeScraper(delay=0.05)
+    scheduler = FairScheduler(scraper, concurrency=1, max_queue=1)
+
+    first = asyncio.ensure_future(scheduler.get_weather('Paris', with_timing=True))
+    second = asyncio.ensure_future(scheduler.get_weather('Rome', with_timing=True))
+    await asyncio.sleep(0)
+    with pytest.raises(QueueFullError):
+        await scheduler.get_weather('Lima')
+
+    result, timing = await second
+    await first
+    assert result == {'location': 'Rome'}
+    assert timing['queue_wait'] >= 0.04
+    assert timing['scrape_time'] >= 0.04
+
+    stats = scheduler.stats()['normal']
+    assert stats['rejected'] == 1
+    assert stats['completed'] == 2
+
+
+@pytest.mark.asyncio
+async def test_budget_exhausted_in_queue():
+    """Test that a request whose budget runs out while queued reports the queue phase"""
+    scraper = FakeScraper(delay=0.1)
+    scheduler = FairScheduler(scraper, concurrency=1)
+
+    first = asyncio.ensure_future(scheduler.get_weather('Paris'))
+    await asyncio.sleep(0)
+    with pytest.raises(WeatherTimeoutError) as exc_info:
+        await scheduler.get_weather('Rome', timeout=0.05)
+    assert exc_info.value.phase == 'queue'
+    await first
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_fires_without_waiting_for_a_slot():
+    """Test that a queued request times out on its own budget, not when the slot frees up"""
+    scraper = FakeScraper(delay=1.0)
+    scheduler = FairScheduler(scraper, concurrency=1, max_queue=1)
+
+    first = asyncio.ensure_future(scheduler.get_weather('Paris'))
+    await asyncio.sleep(0)
+    started = asyncio.get_running_loop().time()
+    with pytest.raises(WeatherTimeoutError) as exc_info:
+        await scheduler.get_weather('Rome', timeout=0.05)
+    assert exc_info.value.phase == 'queue'
+    assert asyncio.get_running_loop().time() - started < 0.5
+
+    # Las consultas vencidas o canceladas no ocupan lugar en la admisión
+    assert scheduler.queued == 0
+    cancelled = asyncio.ensure_future(scheduler.get_weather('Lima'))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    assert scheduler.queued == 0
+    queued = asyncio.ensure_future(scheduler.get_weather('Quito'))
+    await first
+    assert await queued == {'location': 'Quito'}
+    assert scraper.order == ['Paris', 'Quito']
@@ -0,0 +1,129 @@
+import os
+import socket
+import sys
+
+import pytest
+
+import google_weather.server as server_module
+from google_weather.server import launch_browser_server
+from google_weather.weather import WeatherScraper
+
+from conftest import FakeDriver
+
+# Chromium de reemplazo: responde /json/version en el puerto de depuración,
+# o termina / nunca responde según FAKE_CHROMIUM
+FAKE_CHROMIUM = '''#!{python}
+import http.server, json, os, sys, time
+
+mode = os.environ.get('FAKE_CHROMIUM', 'ok')
+port = int(next(arg for arg in sys.argv if arg.startswith('--remote-debugging-port=')).split('=')[1])
+if mode == 'exit':
+    sys.exit(3)
+if mode == 'hang':
+    time.sleep(3600)
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({{'webSocketDebuggerUrl': 'ws://127.0.0.1:%d/devtools/browser/x' % port}}).encode()
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+http.server.HTTPServer(('127.0.0.1', port), Handler).serve_forever()
+'''
+
+
+@pytest.fixture
+def fake_chromium(tmp_path):
+    path = tmp_path / 'chromium'
+    path.write_text(FAKE_CHROMIUM.format(python=sys.executable), encoding='utf-8')
+    path.chmod(0o755)
+    return str(path)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('endpoint_type, method, endpoint', [
+    ('cdp', 'connect_over_cdp', 'http://127.0.0.1:9222'),
+    ('playwright', 'connect', 'ws://127.0.0.1:3000/browser'),
+])
+async def test_endpoint_type_selects_connect_method(driver, endpoint_type, method, endpoint):
+    """Test that each endpoint type connects with the matching Playwright method"""
+    scraper = WeatherScraper(browser_endpoint=endpoint, endpoint_type=endpoint_type)
+    await scraper._get_context('en')
+    await scraper.close()
+    assert driver.calls == [(method, endpoint)]
+
+    with pytest.raises(ValueError):
+        WeatherScraper(browser_endpoint=endpoint, endpoint_type='websocket')
+
+
+@pytest.mark.asyncio
+async def test_close_leaves_shared_browser_running(driver, fake_chromium):
+    """Test that closing a scraper disconnects from a shared browser without stopping it"""
+    server = await launch_browser_server(port=_free_port(), executable_path=fake_chromium, startup_timeout=10)
+    try:
+        scraper = WeatherScraper(browser_endpoint=server.endpoint)
+        context = await scraper._get_context('en')
+        await scraper.close()
+
+        assert driver.calls == [('connect_over_cdp', server.endpoint)]
+        assert context.closed and driver.browser.closed
+        assert driver.stops == 1
+        assert server.process.poll() is None
+    finally:
+        server.close()
+    assert server.process.poll() is not None
+    assert not os.path.exists(server.user_data_dir)
+
+
+@pytest.mark.asyncio
+async def test_server_startup_passes_profile_flags(monkeypatch, fake_chromium):
+    """Test that the server finds Playwright's Chromium, waits for CDP and launches with the profile flags"""
+    driver = FakeDriver()
+    driver.executable_path = fake_chromium
+    monkeypatch.setattr(server_module, 'async_playwright', driver)
+    port = _free_port()
+    server = await launch_browser_server(port=port, profile='low-memory')
+    try:
+        assert driver.stops == 1
+        assert server.endpoint == f"http://127.0.0.1:{port}"
+        args = server.process.args
+        assert args[0] == fake_chromium
+        assert f'--remote-debugging-port={port}' in args and '--headless=new' in args
+        assert '--renderer-process-limit=2' in args
+    finally:
+        server.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('mode, message', [('exit', 'terminó al iniciar'), ('hang', 'no respondió')])
+async def test_failed_startup_cleans_up(monkeypatch, fake_chromium, mode, message):
+    """Test that a browser that exits or never answers is stopped and its profile removed"""
+    monkeypatch.setenv('FAKE_CHROMIUM', mode)
+    profiles, spawned = [], []
+    mkdtemp, popen = server_module.tempfile.mkdtemp, server_module.subprocess.Popen
+
+    def record_mkdtemp(**options):
+        profiles.append(mkdtemp(**options))
+        return profiles[-1]
+
+    def record_popen(*args, **kwargs):
+        spawned.append(popen(*args, **kwargs))
+        return spawned[-1]
+
+    monkeypatch.setattr(server_module.tempfile, 'mkdtemp', record_mkdtemp)
+    monkeypatch.setattr(server_module.subprocess, 'Popen', record_popen)
+
+    with pytest.raises(Exception, match=message):
+        await launch_browser_server(port=_free_port(), executable_path=fake_chromium, startup_timeout=1)
+    assert spawned[0].poll() is not None
+    assert profiles and not os.path.exists(profiles[0])
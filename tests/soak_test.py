@@ -0,0 +1,85 @@
+import asyncio
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from google_weather.offline import extract_html
+from google_weather.soak import MockResultsServer, SoakRun, SoakThresholds, open_fds
+from google_weather.watch import JsonlSink
+
+
+class FakeScraper:
+    """Consultas instantáneas que pueden dejar páginas abiertas o volverse lentas"""
+
+    def __init__(self, leak_pages=False, slowdown=0.0):
+        self.leak_pages = leak_pages
+        self.slowdown = slowdown
+        self.pages = 0
+        self.inflight = 0
+        self.calls = 0
+
+    async def get_readings(self, city, lang='en', timeout=None):
+        self.calls += 1
+        self.inflight += 1
+        try:
+            await asyncio.sleep(0.005 + self.slowdown * self.calls)
+            if self.leak_pages:
+                self.pages += 1
+            return {'location': city}
+        finally:
+            self.inflight -= 1
+
+    def resources(self):
+        return {'contexts': 1, 'pages': self.pages, 'warm_pages': 0, 'inflight': self.inflight, 'child_processes': 2}
+
+
+@pytest.mark.asyncio
+async def test_mock_server_serves_widget():
+    """Test that the mock server returns pages the shared extraction logic accepts"""
+    async with MockResultsServer() as server:
+        def _get(path):
+            with urllib.request.urlopen(server.url + path, timeout=5) as response:
+                return response.read().decode('utf-8')
+
+        page = await asyncio.to_thread(_get, '/search?q=clima+en+Buenos+Aires&hl=es')
+        readings = extract_html(page)
+        assert (readings['location'], readings['lang']) == ('Buenos Aires', 'es')
+        assert await asyncio.to_thread(_get, '/search?q=clima+en+Buenos+Aires&hl=es') == page
+        with pytest.raises(urllib.error.HTTPError):
+            await asyncio.to_thread(_get, '/sorry/')
+        assert server.requests == 3
+    assert open_fds() > 0
+
+
+@pytest.mark.asyncio
+async def test_stable_run_passes(tmp_path):
+    """Test a fixed-rate run with no leaks: samples are written and no threshold trips"""
+    output = tmp_path / 'soak.jsonl'
+    sink = JsonlSink(output)
+    run = SoakRun(FakeScraper(), ['Madrid', 'Lima'], duration=0.6, rate=50, sample_interval=0.2, warmup=0, sink=sink)
+    report = await run.run()
+    sink.close()
+
+    assert report['ok'], report['violations']
+    assert 20 <= report['lookups'] <= 31
+    assert report['growth']['leaked_pages'] == 0
+    samples = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert len(samples) >= 3
+    assert samples[-1]['inflight'] == 0 and samples[-1]['rss_mb'] > 0
+
+
+@pytest.mark.asyncio
+async def test_leaks_and_drift_fail_the_run():
+    """Test that leaked pages and latency drift are reported as violations"""
+    scraper = FakeScraper(leak_pages=True, slowdown=0.002)
+    thresholds = SoakThresholds(max_latency_drift=0.5)
+    run = SoakRun(scraper, ['Madrid'], duration=0.8, rate=40, sample_interval=0.2, warmup=0.1, thresholds=thresholds)
+    report = await run.run()
+
+    assert not report['ok']
+    assert any('páginas abiertas' in violation for violation in report['violations'])
+    assert any('latencia' in violation for violation in report['violations'])
+    assert report['growth']['latency'] > 0.5
+    assert report['growth']['child_processes'] == 0
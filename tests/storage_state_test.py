@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+
+from google_weather.proxies import ProxyEndpoint
+from google_weather.weather import WeatherScraper
+
+from conftest import FakeContext
+
+
+def _add_context(scraper, lang, lite=False, variant=None, proxy=None, fail=False):
+    context = FakeContext()
+    context.fail_storage_state = fail
+    key = scraper._context_key(lang, lite, variant, proxy)
+    scraper._contexts[key] = context
+    scraper._context_params[key] = (lang, lite, variant, proxy)
+    return context
+
+
+@pytest.mark.asyncio
+async def test_storage_state_saved_per_locale(tmp_path):
+    """Test that the session is saved per locale and refreshed only when due"""
+    scraper = WeatherScraper(storage_state_dir=str(tmp_path), storage_state_refresh=3600)
+    context = FakeContext()
+    scraper._contexts['es'] = context
+
+    path = await scraper.save_storage_state('es')
+    assert path == tmp_path / 'es-ES.json'
+    assert json.loads(path.read_text(encoding='utf-8'))['cookies'][0]['name'] == 'CONSENT'
+
+    # Recién guardado: no se vuelve a programar hasta que venza el intervalo
+    scraper._refresh_storage_state('es')
+    assert not scraper._background_tasks
+    assert context.storage_state_calls == 1
+
+
+def test_storage_state_disabled_in_replay(tmp_path):
+    """Test that replay mode never touches persisted sessions"""
+    scraper = WeatherScraper(
+        storage_state_dir=str(tmp_path / 'state'),
+        archive_dir=str(tmp_path / 'archive'),
+        archive_mode='replay'
+    )
+    assert scraper._storage_state_path('en') is None
+
+
+@pytest.mark.asyncio
+async def test_lite_context_session_is_saved(tmp_path):
+    """Test that a scraper with lite=True persists the session of its lite context"""
+    scraper = WeatherScraper(storage_state_dir=str(tmp_path), lite=True)
+    context = _add_context(scraper, 'en', lite=True)
+
+    scraper._refresh_storage_state('en', lite=True)
+    await asyncio.gather(*scraper._background_tasks)
+    assert (tmp_path / 'en-US.json').exists()
+    assert context.storage_state_calls == 1
+
+    # Un idioma sin contexto completo se guarda igual desde el liviano
+    assert await scraper.save_storage_state('en') == tmp_path / 'en-US.json'
+
+    (tmp_path / 'en-US.json').unlink()
+    await scraper.close()
+    assert (tmp_path / 'en-US.json').exists()
+
+
+@pytest.mark.asyncio
+async def test_proxy_contexts_save_their_own_session(tmp_path):
+    """Test that each proxy context is saved to its own file, on refresh and on close"""
+    scraper = WeatherScraper(storage_state_dir=str(tmp_path))
+    first, second = ProxyEndpoint('10.0.0.1:8080'), ProxyEndpoint('10.0.0.2:8080', name='dc/2')
+    _add_context(scraper, 'es', proxy=first)
+    _add_context(scraper, 'es', proxy=second)
+
+    scraper._refresh_storage_state('es', proxy=first)
+    await asyncio.gather(*scraper._background_tasks)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['es-ES.10.0.0.1_8080.json']
+
+    await scraper.close()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['es-ES.10.0.0.1_8080.json', 'es-ES.dc_2.json']
+
+
+@pytest.mark.asyncio
+async def test_failed_save_is_retried(tmp_path):
+    """Test that a failed save does not count as a fresh session"""
+    scraper = WeatherScraper(storage_state_dir=str(tmp_path))
+    context = _add_context(scraper, 'en', fail=True)
+
+    scraper._refresh_storage_state('en')
+    await asyncio.gather(*scraper._background_tasks)
+    assert scraper._storage_saved_at == {}
+
+    context.fail_storage_state = False
+    scraper._refresh_storage_state('en')
+    await asyncio.gather(*scraper._background_tasks)
+    assert context.storage_state_calls == 2
+    assert (tmp_path / 'en-US.json').exists()
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from google_weather.weather import WeatherScraper
+
+from conftest import FakeElement
+
+
+def _stub_lookup(scraper):
+    """Reemplaza la búsqueda y la extracción; devuelve las páginas usadas"""
+    used = []
+
+    async def perform_search(page, city, lang, deadline=None, lite=False):
+        used.append(page)
+
+    async def extract_location(page, lang, deadline=None):
+        return 'Madrid, Spain'
+
+    async def extract_temperature(page, deadline=None, lang='en'):
+        return 68.0
+
+    async def probe_field(page, field, lang):
+        return FakeElement({'condition': 'Sunny', 'humidity': '40%', 'wind': '10 km/h'}[field])
+
+    scraper._perform_search = perform_search
+    scraper._extract_location = extract_location
+    scraper._extract_temperature = extract_temperature
+    scraper._probe_field = probe_field
+    return used
+
+
+@pytest.mark.asyncio
+async def test_warmup_reports_each_stage(driver):
+    """Test that warmup launches the browser, opens a context per locale and primes pages"""
+    scraper = WeatherScraper(base_url='https://search.test')
+    report = await scraper.warmup(['en', 'es'], pages_per_lang=2)
+
+    assert set(report) == {'browser', 'context:en', 'context:es', 'pages:en', 'pages:es', 'total'}
+    assert report['total'] >= report['browser']
+    assert scraper.warmup_report is report
+    assert scraper.resources()['warm_pages'] == 4
+    assert [page.gotos for page in driver.browser.contexts[1].pages] == [['https://search.test/?hl=es']] * 2
+    await scraper.close()
+
+
+@pytest.mark.asyncio
+async def test_first_lookup_uses_warm_page_and_replenishes(driver):
+    """Test that a lookup takes the warm page and a new warm page replaces it"""
+    scraper = WeatherScraper(base_url='https://search.test')
+    used = _stub_lookup(scraper)
+    await scraper.warmup(['en'])
+    context = driver.browser.contexts[0]
+    warm_page = context.pages[0]
+
+    assert (await scraper.get_readings('Madrid'))['location'] == 'Madrid, Spain'
+    assert used == [warm_page]
+    assert warm_page.closed
+
+    # El reemplazo se abre en segundo plano, en blanco: solo warmup() visita la portada
+    await asyncio.gather(*scraper._background_tasks)
+    assert scraper.resources()['warm_pages'] == 1
+    replacement = scraper._warm_pages['en'][0]
+    assert replacement is not warm_page and replacement.gotos == []
+
+    await scraper.get_readings('Lima')
+    assert used[-1] is replacement
+    await scraper.close()
+    assert all(page.closed for page in context.pages)
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_background_warmup(driver):
+    """Test that close() cancels a warm-up still running in the background"""
+    driver.navigation.clear()
+    scraper = WeatherScraper(warmup_langs=['en', 'es'])
+    while not any(context.pages and context.pages[0].gotos for context in driver.browser.contexts):
+        await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(scraper.close(), timeout=5)
+    assert scraper._warmup_task.cancelled()
+    assert scraper.warmup_report is None
+    assert driver.browser.closed and driver.stops == 1
+    assert all(context.closed for context in driver.browser.contexts)
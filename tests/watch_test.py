@@ -0,0 +1,105 @@
+import io
+import json
+
+import pytest
+
+from google_weather.concurrency import AdaptiveLimiter
+from google_weather.watch import JsonlSink
+from google_weather.weather import WeatherScraper
+
+
+def _readings(temp_f=68.0, condition='Sunny', humidity='40%', wind_value=10.0):
+    return {
+        'location': 'Madrid, Spain',
+        'temperature_f': temp_f,
+        'condition': condition,
+        'humidity': humidity,
+        'wind_text': f"{wind_value} km/h",
+        'wind_value': wind_value,
+        'wind_is_mph': False
+    }
+
+
+class _Feed:
+    """Devuelve una secuencia fija de lecturas por ciudad en cada sondeo"""
+
+    def __init__(self, scraper, sequences):
+        self.sequences = {city: list(values) for city, values in sequences.items()}
+        self.limiters = []
+
+        async def get_readings_many(cities, lang='en', concurrency=4, timeout=None, limiter=None):
+            self.limiters.append(limiter)
+            return [self.sequences[city].pop(0) for city in cities]
+
+        scraper.get_readings_many = get_readings_many
+
+
+def test_thresholds_and_drift():
+    """Test that changes below the threshold are suppressed until they accumulate"""
+    watcher = WeatherScraper().watch(['Madrid'], temperature=0.5, humidity=5)
+
+    initial = watcher.update('Madrid', _readings(68.0))
+    assert initial['initial'] and initial['changes']['temperature'] == {'old': None, 'new': 20.0}
+
+    # +0.3 °C: sin evento
+    assert watcher.update('Madrid', _readings(68.54, humidity='43%')) is None
+    # La deriva acumulada llega a +0.6 °C respecto de lo emitido
+    event = watcher.update('Madrid', _readings(69.08, humidity='43%'))
+    assert event['changes'] == {'temperature': {'old': 20.0, 'new': 20.6}}
+    assert not event['initial']
+
+    event = watcher.update('Madrid', _readings(69.08, condition='Cloudy', humidity='46%'))
+    assert event['changes'] == {
+        'condition': {'old': 'Sunny', 'new': 'Cloudy'},
+        'humidity': {'old': 40.0, 'new': 46.0}
+    }
+    assert watcher.stats == {'polls': 0, 'readings': 4, 'events': 3, 'errors': 0}
+
+
+@pytest.mark.asyncio
+async def test_async_iterator_yields_only_changes():
+    """Test that iterating the watcher yields compact events and skips failures"""
+    scraper = WeatherScraper()
+    _Feed(scraper, {
+        'Madrid': [_readings(68.0), _readings(68.0), _readings(75.0)],
+        'Lima': [_readings(60.0), RuntimeError('sin widget'), _readings(60.0, wind_value=25.0)]
+    })
+    watcher = scraper.watch(['Madrid', 'Lima'], interval=0, emit_initial=False)
+
+    events = []
+    async for event in watcher:
+        events.append(event)
+        if len(events) == 2:
+            break
+
+    assert [(e['city'], list(e['changes'])) for e in events] == [('Madrid', ['temperature']), ('Lima', ['wind'])]
+    assert watcher.stats['errors'] == 1
+    assert watcher.suppressed_rate == pytest.approx(1 - 2 / 5)
+
+
+@pytest.mark.asyncio
+async def test_jsonl_sink():
+    """Test that run() writes one JSON line per change event"""
+    scraper = WeatherScraper()
+    _Feed(scraper, {'Madrid': [_readings(68.0), _readings(68.0), _readings(68.0, condition='Rain')]})
+    stream = io.StringIO()
+
+    await scraper.watch(['Madrid'], interval=0).run(JsonlSink(stream), polls=3)
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == 2
+    assert lines[0]['initial']
+    assert lines[1]['changes'] == {'condition': {'old': 'Sunny', 'new': 'Rain'}}
+
+
+@pytest.mark.asyncio
+async def test_polls_share_the_limiter():
+    """Test that every poll runs its batch through the watcher's limiter"""
+    scraper = WeatherScraper()
+    feed = _Feed(scraper, {'Madrid': [_readings(68.0), _readings(75.0)]})
+    limiter = AdaptiveLimiter(initial=2)
+    watcher = scraper.watch(['Madrid'], interval=0, limiter=limiter)
+
+    await watcher.poll()
+    await watcher.poll()
+    assert feed.limiters == [limiter, limiter]